@@ -0,0 +1,128 @@
+# AddressCLI.py
+# Cleans the addresses of an excel file from the command line, without the GUI, for scheduled batch runs
+# e.g. python AddressCLI.py Addresses.xlsx --sheet Sheet1 --workers 4
+# Addresses saved with --sqlite are written to excel again without cleaning, e.g. python AddressCLI.py Addresses.db
+
+# IMPORTS ###
+# I/O and DEBUGGING
+from timeit import default_timer as timer
+import os.path
+import argparse
+import sys
+# ADDRESS CLEANING
+import AddressCleaner as cleaner
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description="Cleans the addresses of an excel file in the template format")
+    parser.add_argument("input", help="excel, CSV or TSV file with AddressLine1, AddressLine2 and Province columns, "
+                                      "or a .db file of cleaned addresses to write again without cleaning them")
+    parser.add_argument("--sheet", help="sheet to clean, defaults to the first sheet")
+    parser.add_argument("--output", help="file to write, .xlsx, .csv, .tsv or .db (SQLite), defaults to the input name "
+                                         "ending in Cleaned")
+    parser.add_argument("--rules", default="Rules.txt", help="rules file, defaults to Rules.txt")
+    parser.add_argument("--workers", type=int, default=1, help="number of processes used to clean addresses")
+    parser.add_argument("--chunk-size", type=int, default=2000, help="rows sent to a process at a time")
+    parser.add_argument("--dedup", action="store_true", help="clean repeated addresses only once")
+    parser.add_argument("--incremental", action="store_true",
+                        help="only clean the rows that changed since the last run, the cleaned rows are kept in a "
+                             ".rows file beside the output")
+    parser.add_argument("--batch", action="store_true",
+                        help="score the words of every 2000 rows together with NumPy before cleaning them")
+    parser.add_argument("--profile", action="store_true", help="time the stages of cleaning and show the calls of each")
+    parser.add_argument("--profile-json", help="JSON file to save the time of each stage to, implies --profile")
+    parser.add_argument("--cprofile", help="file to save cProfile stats to, for pstats or snakeviz, implies --profile")
+    parser.add_argument("--fast-xlsx", action="store_true",
+                        help="write excel files straight as XML instead of with openpyxl, faster for millions of rows")
+    sinks = parser.add_mutually_exclusive_group()
+    sinks.add_argument("--sqlite", help="SQLite database to save the cleaned addresses to as well, with their parts and "
+                                        "flags, replaced if it exists")
+    sinks.add_argument("--debug", action="store_true",
+                       help="write the flags and the original address of each row as well, like Debug Write in the GUI")
+    options = parser.parse_args(args)
+
+    start = timer()
+    stats = cleaner.FlagStats()
+    profiling = options.profile or options.profile_json is not None or options.cprofile is not None
+    if profiling:
+        cleaner.startProfiling(options.cprofile)
+    cleaner.load_rules(cleaner.suffixes, cleaner.extras, cleaner.shortStreets, options.rules)
+    cleaner.rulesChanged()
+    if options.batch and not cleaner.useBatchScoring():
+        print("NumPy is not installed, words are scored one at a time")
+    stats.lap("Loading rules")
+
+    name, extension = os.path.splitext(options.input)
+    workbook = None
+    if extension.lower() in cleaner.RESULT_STORE_EXTENSIONS: # cleaned already, only written again
+        extension = ".xlsx"
+    elif extension.lower() in cleaner.CSV_DELIMITERS: # read as the scan goes, written back as the same type
+        workbook = sheet = cleaner.CsvSheet(options.input)
+    else:
+        extension = ".xlsx"
+        try: # the first sheet without --sheet, only the columns cleaned are read
+            workbook = sheet = cleaner.XlsxSheet(options.input, options.sheet, cleaner.SCAN_COLUMNS)
+        except KeyError:
+            print("Worksheet", options.sheet, "does not exist in", options.input)
+            return 1
+    if options.debug: # always an excel file
+        extension = ".xlsx"
+    outFileName = options.output or name + "Cleaned" + extension
+    store = None
+    if options.incremental and workbook is not None: # beside the name asked for, write adds " - Copy" to the name
+        store = cleaner.RowStore(os.path.splitext(outFileName)[0] + ".rows")
+    results = None
+    if options.sqlite is not None:
+        results = cleaner.ResultStore(options.sqlite)
+    stats.lap("Loading file")
+
+    if workbook is None:
+        addresses = cleaner.ResultStore.read(options.input)
+    elif options.workers > 1:
+        addresses = cleaner.scanParallel(sheet, options.workers, options.chunk_size, options.dedup, store=store)
+    else:
+        addresses = cleaner.scanRows(sheet, options.dedup, store=store) # written as they are cleaned
+    try:
+        if options.debug:
+            count, outFileName = cleaner.debugWrite(addresses, outFileName, stats, options.fast_xlsx)
+            stats.lap("Writing")
+        else:
+            count, outFileName = cleaner.write(outFileName, addresses, stats, results, options.fast_xlsx)
+    except BaseException:
+        if results is not None:
+            results.discard()
+        raise
+    finally:
+        if workbook is not None:
+            workbook.close()
+        stages = cleaner.stopProfiling()
+    if store is not None:
+        store.save()
+    if results is not None:
+        results.save(stats)
+    took = timer() - start
+
+    print(count, "cleaned addresses written to", os.path.abspath(outFileName))
+    if results is not None:
+        print("Saved to", os.path.abspath(results.fileName))
+    if store is not None:
+        print(store.summary())
+    print("Took {:.2f} seconds ({:.0f} rows/sec)".format(took, count / took if took > 0 else 0))
+    if stages is None:
+        for stage, seconds in stats.times.items():
+            print("  {:<23} {:>10.2f}".format(stage, seconds))
+    else:
+        print("  " + stages.text(stats).replace("\n", "\n  "))
+        if options.profile_json is not None:
+            stages.save(options.profile_json, stats)
+            print("Stage times saved to", os.path.abspath(options.profile_json))
+        if options.cprofile is not None:
+            print("cProfile stats saved to", os.path.abspath(options.cprofile))
+    print("Flags ({} valid, {} invalid and unchanged):".format(stats.valid, stats.unchanged))
+    for category, name, rows in stats.counts():
+        print("  {:<10} {:<12} {:>10}".format(category, name, rows))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,3886 @@
+# AddressCleaner.py
+# Address cleaning engine used by the GUI (Address.py) and the command line (AddressCLI.py)
+# Importing it has no side effects: the rules are empty until load_rules is called, and openpyxl and the process pool
+# are only imported once an excel file is written or rows are cleaned in parallel
+# Structures addresses, applies rules of consistency, flags addresses that aren't consistent
+# Albert Quon
+# Created: 2020/05/06
+# Last modified: 2020/08/25
+
+# IMPORTS ###
+# I/O and DEBUGGING
+from timeit import default_timer as timer
+import os.path
+import json
+import csv
+import re
+import zipfile
+import posixpath
+import hashlib
+import marshal
+from collections import OrderedDict
+from bisect import bisect_right
+from xml.etree.ElementTree import iterparse, XML, ParseError
+
+
+
+def scan(sheet, dedup=False, progress=None, store=None, index=None):
+    """
+    # go through all the addresses, check the province, flag if not consistent
+    :param sheet: the spreadsheet
+    :param dedup: Clean rows with the same AddressLine1, AddressLine2 and Province only once
+    :param progress: Called with the number of rows done every PROGRESS_ROWS rows, can raise to stop the scan
+    :param store: RowStore of the last run, rows that did not change since are not cleaned again
+    :param index: RuleIndex to add the rows to, for previews of rule changes
+    :return: all addresses
+    """
+    clean = cleanRow if store is None else store.cleanRow
+    if index is not None:
+        clean = index.watch(clean, store)
+    addresses = []
+    provCol = findCol("Province", sheet["1"])
+    scanCol = findCol("AddressLine1", sheet["1"])
+    scanColB = findCol("AddressLine2", sheet["1"])
+
+    # DATA VALIDATION - check if the address is valid itself
+    # structure the address and its ext info to be readable by the program
+    # then standardize it through the rules and validate
+
+    rows = sheet.iter_rows(min_row=2, max_row=sheet.max_row) #start below the headers then up to sheet.max_row
+    if batchScoring:
+        rows = scoredRows(rows, scanCol, scanColB)
+
+    if not dedup:
+        for row in rows:
+            addresses.append(clean(scanCol, scanColB, provCol, row))
+            if progress is not None and len(addresses) % PROGRESS_ROWS == 0:
+                progress(len(addresses))
+        return addresses
+
+    cleaned = {} # cleaned address of each distinct row
+    cleanTime = 0
+    for row in rows:
+        # the same values structureAddress reads from the row
+        key = (str(row[scanCol].value), str(row[scanColB].value), row[provCol].value)
+        if key not in cleaned:
+            rowStart = timer()
+            cleaned[key] = clean(scanCol, scanColB, provCol, row)
+            cleanTime += timer() - rowStart
+        addresses.append(cleaned[key].copy()) # addresses are changed after scanning, each row gets its own
+        if progress is not None and len(addresses) % PROGRESS_ROWS == 0:
+            progress(len(addresses))
+
+    duplicates = len(addresses) - len(cleaned)
+    if len(addresses) > 0 and len(cleaned) > 0:
+        print("{} of {} rows were duplicates ({:.1f}%), saved about {:.2f} seconds".format(
+            duplicates, len(addresses), duplicates / len(addresses) * 100, cleanTime / len(cleaned) * duplicates))
+    return addresses
+
+
+def scanRows(sheet, dedup=False, dedupSize=100000, progress=None, store=None, index=None):
+    """
+    Same as scan, but each address is given as soon as its row is cleaned instead of keeping every address,
+    so write can save rows while the sheet is still being read
+    :param sheet: the spreadsheet
+    :param dedup: Clean rows that were recently seen only once
+    :param dedupSize: Most distinct rows remembered for dedup
+    :param progress: Called with the number of rows done every PROGRESS_ROWS rows, can raise to stop the scan
+    :param store: RowStore of the last run, it keeps every address for the next run
+    :param index: RuleIndex to add the rows to, for previews of rule changes
+    :return: generator of the addresses
+    """
+    clean = cleanRow if store is None else store.cleanRow
+    if index is not None:
+        clean = index.watch(clean, store)
+    provCol = findCol("Province", sheet["1"])
+    scanCol = findCol("AddressLine1", sheet["1"])
+    scanColB = findCol("AddressLine2", sheet["1"])
+    recent = LRUCache(dedupSize) # only the most recent rows are kept so memory does not grow with the sheet
+    rows = sheet.iter_rows(min_row=2, max_row=sheet.max_row)
+    if batchScoring:
+        rows = scoredRows(rows, scanCol, scanColB)
+
+    done = 0
+    for row in rows:
+        done += 1
+        if progress is not None and done % PROGRESS_ROWS == 0:
+            progress(done)
+        if not dedup:
+            yield clean(scanCol, scanColB, provCol, row)
+            continue
+
+        key = (str(row[scanCol].value), str(row[scanColB].value), row[provCol].value)
+        address = recent.get(key)
+        if address is None:
+            address = clean(scanCol, scanColB, provCol, row)
+            recent.put(key, address)
+        yield address.copy()
+
+
+def cleanRow(scanCol, scanColB, provCol, row):
+    """
+    Structures and validates the address of a row along with its external info
+    :param scanCol: Column of addresses
+    :param scanColB: Column of external info
+    :param provCol: Column of provinces
+    :param row: Row to clean
+    :return: Address object
+    """
+    address = structureAddress(scanCol, provCol, row) # structure the string to an address object
+    address.province = str(row[provCol].value or "").strip()
+
+    # special case for "FERME PHYSIQUE" as they can be seen as a valid address and should be left alone
+    if "FERME PHYSIQUE" not in address.street and not "INVALID" in address.flag.address:
+        extAddress = structureAddress(scanColB, provCol, row)
+        if "INVALID" not in extAddress.flag.address:
+            validate(extAddress)
+        validate(address)
+
+        if len(extAddress.original) != 0 and extAddress.original is not None:
+            if len(address.extra) == 0:
+                address.extra = " ".join(extAddress.original)
+            elif address.extra != " ".join(extAddress.original):
+                address.extra = " ".join(extAddress.original) + ", " + address.extra
+        if len(address.extra) > 40: # attempt to reduce character length
+            address.extra = trimExtInfo(address.extra)
+
+    elif "INVALID" in address.flag.address: # invalid addresses
+        extAddress = structureAddress(scanColB, provCol, row)
+
+        if len(extAddress.original) != 0:
+            if len(address.extra) == 0:
+                address.extra = " ".join(extAddress.original)
+            elif address.extra != " ".join(extAddress.original):
+                address.extra = " ".join(extAddress.original) + ", " + address.extra
+        if len(address.extra) > 40: # attempt to reduce character length
+            address.extra = trimExtInfo(address.extra)
+
+    return address
+
+
+def scanParallel(sheet, workers=None, chunkSize=2000, dedup=False, progress=None, store=None, index=None):
+    """
+    Same as scan, but the rows are cleaned by a pool of processes
+    :param sheet: the spreadsheet
+    :param workers: Number of processes, defaults to the number of CPUs
+    :param chunkSize: Number of rows sent to a process at a time
+    :param dedup: Clean rows with the same AddressLine1, AddressLine2 and Province only once
+    :param progress: Called with the number of rows done after each chunk, can raise to stop the scan
+    :param store: RowStore of the last run, only rows that changed since are sent to the processes
+    :param index: RuleIndex to add the rows to, their words are only found by the first preview
+    :return: all addresses, in the order of the rows
+    """
+    provCol = findCol("Province", sheet["1"])
+    scanCol = findCol("AddressLine1", sheet["1"])
+    scanColB = findCol("AddressLine2", sheet["1"])
+
+    # only the cell values are sent to the processes
+    values = ((row[scanCol], row[scanColB], row[provCol]) for row in
+              sheet.iter_rows(min_row=2, max_row=sheet.max_row, values_only=True))
+    if index is None:
+        return cleanValues(values, workers, chunkSize, dedup, progress, store)
+    values = list(values)
+    addresses = cleanValues(values, workers, chunkSize, dedup, progress, store)
+    index.addRows(values, addresses)
+    return addresses
+
+
+def cleanValues(values, workers=None, chunkSize=2000, dedup=False, progress=None, store=None):
+    """
+    Cleans rows of values with a pool of processes
+    :param values: (AddressLine1, AddressLine2, Province) of each row
+    :param workers: Number of processes, defaults to the number of CPUs
+    :param chunkSize: Number of rows sent to a process at a time
+    :param dedup: Clean rows with the same values only once
+    :param progress: Called with the number of rows done after each chunk, can raise to stop the scan
+    :param store: RowStore of the last run, only rows that changed since are cleaned
+    :return: all addresses, in the order of the rows
+    """
+    if store is not None:
+        return store.cleanValues(values, workers, chunkSize, dedup, progress)
+
+    rowKeys = [] # distinct row each row refers to
+    if dedup:
+        distinct = {}
+        for line1, line2, prov in values:
+            key = (str(line1), str(line2), prov)
+            if key not in distinct:
+                distinct[key] = (line1, line2, prov)
+            rowKeys.append(key)
+        values = list(distinct.values())
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    addresses = []
+    # each process starts with the rules of this session, including rules that have not been saved
+    pool = ProcessPoolExecutor(max_workers=workers, initializer=initWorker,
+                               initargs=(suffixes, extras, shortStreets, profiler is not None, batchScoring))
+    try:
+        if profiler is None:
+            chunks = pool.map(cleanChunk, chunkRows(values, chunkSize))
+        else: # the stages of each chunk are timed in its process and added to the stages of this one
+            chunks = (profiler.merge(chunk) for chunk in pool.map(profileChunk, chunkRows(values, chunkSize)))
+        for chunk in chunks:
+            addresses.extend(chunk)
+            if progress is not None:
+                progress(len(addresses))
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True) # chunks not started yet are dropped if the scan is stopped
+
+    if not dedup:
+        return addresses
+    cleaned = dict(zip(distinct, addresses))
+    if len(rowKeys) > 0:
+        print("{} of {} rows were duplicates ({:.1f}%)".format(len(rowKeys) - len(cleaned), len(rowKeys),
+                                                            (len(rowKeys) - len(cleaned)) / len(rowKeys) * 100))
+    return [cleaned[key].copy() for key in rowKeys]
+
+
+def chunkRows(rows, chunkSize):
+    """
+    Splits rows into lists of at most chunkSize rows
+    :param rows: Any iterable of rows
+    :param chunkSize: Most rows in a list
+    """
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= chunkSize:
+            yield chunk
+            chunk = []
+    if len(chunk) > 0:
+        yield chunk
+
+
+def initWorker(suffixRules, extraRules, shortRules, profiling=False, batch=False):
+    """
+    Sets up the rules of a process in the pool of scanParallel
+    :param suffixRules: Suffix rules
+    :param extraRules: External info rules
+    :param shortRules: Suffixes with alternate versions
+    :param profiling: Time the stages of cleaning, the chunks are then cleaned with profileChunk
+    :param batch: Score the words of each chunk in a batch, see useBatchScoring
+    """
+    # copied first, forked processes are given the same objects as the rules of the process that started them
+    suffixRules = dict(suffixRules)
+    shortRules = dict(shortRules)
+    suffixes.clear()
+    suffixes.update(suffixRules)
+    extras[:] = list(extraRules)
+    shortStreets.clear()
+    shortStreets.update(shortRules)
+    rulesChanged()
+    useBatchScoring(batch)
+    if profiling:
+        startProfiling().stopCProfile(False) # forked processes are given the profiler of the process that started them
+
+
+def cleanChunk(rows):
+    """
+    Cleans a chunk of rows in a process of the pool
+    :param rows: (AddressLine1, AddressLine2, Province) of each row
+    :return: Address object of each row
+    """
+    cells = [(ValueCell(line1), ValueCell(line2), ValueCell(prov)) for line1, line2, prov in rows]
+    if batchScoring:
+        scoreWords(rowWords(cells, 0, 1))
+    addresses = []
+    for row in cells:
+        addresses.append(cleanRow(0, 1, 2, row))
+    return addresses
+
+
+def profileChunk(rows):
+    """
+    Same as cleanChunk, for processes that are profiling
+    :param rows: (AddressLine1, AddressLine2, Province) of each row
+    :return: Address object of each row, StageTimer of the chunk
+    """
+    profiler.reset()
+    return cleanChunk(rows), profiler
+
+
+def startProfiling(profileFile=None):
+    """
+    Times the stages of cleaning until stopProfiling is called. The functions of each stage are replaced by timed
+    versions, so nothing is timed while profiling is off
+    :param profileFile: File to save cProfile stats of this thread to, or None
+    :return: StageTimer of the run
+    """
+    global profiler
+
+    if profiler is None:
+        profiler = StageTimer()
+        for stage, names in PROFILED_STAGES:
+            for name in names:
+                profiledFunctions[name] = globals()[name]
+                globals()[name] = profiler.timed(stage, profiledFunctions[name])
+    if profileFile is not None:
+        profiler.startCProfile(profileFile)
+    return profiler
+
+
+def stopProfiling():
+    """
+    Puts back the functions timed by startProfiling and saves the cProfile stats
+    :return: StageTimer of the run, None if profiling was not started
+    """
+    global profiler
+
+    stages = profiler
+    if stages is not None:
+        globals().update(profiledFunctions)
+        profiledFunctions.clear()
+        profiler = None
+        stages.stopCProfile()
+    return stages
+
+
+def recordWords(clean, *args):
+    """
+    Calls a cleaning function, keeping every word given a profile while it runs. The factors that depend on the rules
+    are only found through profiles, so these are the only words a change to the rules can change the address of
+    :param clean: Function cleaning a row, such as cleanRow
+    :param args: Arguments of the function
+    :return: Result of the function, set of the words
+    """
+    global getProfile
+
+    profile = getProfile
+    words = set()
+
+    def recordedProfile(word):
+        words.add(word)
+        return profile(word)
+
+    getProfile = recordedProfile
+    try:
+        return clean(*args), words
+    finally:
+        getProfile = profile
+
+
+def useBatchScoring(on=True):
+    """
+    Scores the words of rows in batches with NumPy before the rows are cleaned, see BatchScorer
+    :param on: Turn batch scoring on or off
+    :return: Boolean value if batch scoring is on, it stays off if NumPy is not installed
+    """
+    global batchScoring
+    from importlib.util import find_spec
+
+    batchScoring = on and find_spec("numpy") is not None # imported by BatchScorer when the first batch is scored
+    return batchScoring
+
+
+def scoreWords(words):
+    """
+    Scores words with a BatchScorer and remembers their profiles, so structureAddress finds their factors instead of
+    scoring one word at a time. Words already remembered are not scored again
+    :param words: Any iterable of words
+    :return: Number of words scored
+    """
+    global batchScorer
+    if batchScorer is None or batchScorer.rules is not compiledRules:
+        batchScorer = BatchScorer(compiledRules)
+    new = [word for word in set(words) if (rulesVersion, word) not in tokenCache]
+    suffixPairs, extFactors = batchScorer.score(new)
+    for word, suffixPair, extFactor in zip(new, suffixPairs, extFactors):
+        tokenCache.put((rulesVersion, word), TokenProfile(word, suffixPair, extFactor))
+    return len(new)
+
+
+def rowWords(rows, scanCol, scanColB):
+    """
+    Finds the words of rows as structureAddress first splits them, words it breaks apart later are scored when they
+    are profiled
+    :param rows: Rows of cells
+    :param scanCol: Column of addresses
+    :param scanColB: Column of external info
+    :return: generator of the words
+    """
+    for row in rows:
+        for col in (scanCol, scanColB):
+            yield from str(row[col].value).rstrip().replace("None", "").split()
+
+
+def scoredRows(rows, scanCol, scanColB):
+    """
+    Gives the rows of a sheet, the words of every BATCH_ROWS rows are scored with scoreWords before they are given
+    :param rows: Rows of cells
+    :param scanCol: Column of addresses
+    :param scanColB: Column of external info
+    :return: generator of the same rows
+    """
+    for chunk in chunkRows(rows, BATCH_ROWS):
+        scoreWords(rowWords(chunk, scanCol, scanColB))
+        yield from chunk
+
+
+def findCol(column, sheet):
+    """
+    Finds the column in a spreadsheet with a given name
+    :param column: Column name to be found
+    :param sheet: Excel worksheet
+    :return: Column of the name given
+    """
+    for cell in sheet:
+        if cell.value == column:
+            col = sheet.index(cell)
+            return col
+    return -1
+
+
+def structureAddress(scanCol, provCol, row):
+    """
+    Formats the address into an address object. Rejects addresses that cannot be interpreted or have special cases.
+    :param row: Row to scan
+    :param scanCol: Column of addresses
+    :param provCol: Column of provinces
+    :return: Address object
+    """
+
+    address = str(row[scanCol].value).rstrip().replace("None", "").split()
+
+    combine = "".join(address)
+    junction = ("/" in combine and not (any(len(word) < 2 for word in combine.split("/")))) or (
+                "JUNCTION" in address) or ("JUNC" in address) or\
+               ("&" in combine and not any(len(word) < 2 for word in "".join(address).split("&"))) or\
+               "CORNEROF" in combine or "AND" in address # 'AND' in address may be unreliable
+    directions = "KM" in address
+    #gps = ("N" in address and "W" in address) or ("LONG" in address and "LAT" in address)
+
+    if len(address) < 2 or junction or directions:  # if it is not a valid address; cannot be one 'word' only or be a intersection
+        if len(address) > 0:
+            if not address[0].isalnum() and len(address[0]) == 1:
+                address.pop(0)
+        temp = Address(address)
+        temp.flag.addAddrFlag("INVALID")
+        return temp
+
+    else:  # at least a number and word
+        newAddress = Address(address)
+
+        prov = row[provCol].value.strip()
+        newAddress.french = prov == "QC"
+        address = newAddress.original
+        # special case
+        if "FERME" in address and "PHYSIQUE" in address:
+            newAddress.street = " ".join(address)
+            return newAddress
+
+        # Clean the address, make it easy to read ###################
+        # BREAK APART COMMAS, BREAK APART PERIODS
+        # DETACH DASHES FROM ORDINAL NUMBERS
+        # address is cleaned of punctuation that can lead to misinterpretation of each section of the address
+        splitTokens(address)
+
+        leftBrac = rightBrac = -1
+        extra = number = street = direction = suffixNumber = ""
+
+        # check if brackets exist in the address, and add it to the ext info
+        for i in range(len(address)):
+            if "(" in address[i] or "[" in address[i]:
+                leftBrac = i
+            if (")" in address[i] or "]" in address[i]) and leftBrac != -1:
+                rightBrac = i
+        if leftBrac != rightBrac != -1:
+            for i in range(leftBrac, rightBrac + 1):
+                extra = " ".join([extra, address[leftBrac]])
+                address.pop(leftBrac)
+        if not directions: # after symbols are seperated, check if it can be interpreted as directions
+            for i in range(len(address)):
+                if i < len(address) - 1:
+                    if (address[i] == "MILE" or address[i] == "KM" or address[i] == "MILES") and directionFactor(
+                            address[i + 1]) and not directions:
+                        directions = True
+
+        if len(address) == 0 or "AND" in address or (address[0] == "NE" and "".join(c for c in address[1] if c.isalnum()))\
+                or directions:
+            temp = Address(address)
+            temp.flag.addAddrFlag("INVALID")
+            return temp
+
+        # check if the first part of the address is a symbol
+        if not address[0].isalnum() and not (
+                any(letter.isalpha() for letter in address[0]) or any(num.isdigit() for num in address[0])):
+            address.pop(0)
+
+        # Attach dashes and symbols
+        first = [address[0]]
+        for i in range(1, len(address)):
+            if (len(address[i]) == 1 and not address[i].isalnum()) or (any(first[-1][-1] == sym for sym in ["-"])):
+                first[-1] += address[i]
+            else:
+                first.append(address[i])
+
+        # make sure the address is upper case to avoid comparison inconsistencies
+        for i in range(len(first)):
+            if not first[i].isupper() and any(letter.isalpha() for letter in first[i]):
+                newAddress.flag.addAddrFlag("FORMAT")
+                first[i] = first[i].upper()
+
+        address = first
+        newAddress.original = address
+
+        suffixFactors = []
+        fullSuffixes = []
+        extFactors = []
+        dirFactors = []
+        wordCounter = 0
+        #************* Assign the direction, street, suffix, and extra info ********************************************
+        if newAddress.french:  # determines if more emphasis is put onto the first few words or the last
+            frenchFactor = -1
+        else:
+            frenchFactor = 1
+
+        for i in range(len(address)):  # go through parts of the address, determine factors
+            # assign factors based on the location of the part of the address and its characteristics
+            profile = getProfile(address[i])
+            numberFactor = profile.numerics
+            wordFactor = profile.letters
+
+            # ordinal numbers are not considered numbers
+            if profile.ordinal:
+                numberFactor = 0
+
+            if numberFactor == wordFactor == 0:  # character is a symbol
+                suffFactor = extFactor = 0
+                dirFactor = False
+                if address[i - 1] in number:
+                    number += address[i]
+                elif address[i - 1] in street:
+                    street += address[i]
+                else:
+                    if len(number) == 0:
+                        number = address[i]
+                    else:
+                        number += address[i]
+            else:
+                if numberFactor > wordFactor:  # if the current word is a number
+                    suffFactor = extFactor = 0
+                    dirFactor = False
+                    fullSuffixes.append("")
+
+                    if i > 0:  # if the number is not at the beginning of the address
+                        if any(word in address[i - 1] for word in
+                               ["HWY", "HIGHWAY", "ROUTE", "RTE", "RR", "R.R.", "PTH"]) or address[i - 1] == "NO." or\
+                                address[i - 1] == "NO":
+                            extFactor = 0
+                        elif extFactors[-1] > 1.4 and not getProfile(address[i - 1]).noSymbols.isdigit():
+                            if i > 1:
+                                if not getProfile(address[i - 2]).ordinal:
+                                    extFactor = 1.3
+                            else:
+                                extFactor = 1.3
+
+                else:  # the current word is a word
+                    # determine if its a direction, belongs in an address, or is external info
+                    suffixPair = profile.suffixPair
+                    suffFactor = suffixPair[0] * 1.15 ** (wordCounter * frenchFactor)
+                    dirFactor = profile.direction
+                    extFactor = profile.extFactor * 1.15 ** wordCounter
+                    fullSuffixes.append(suffixPair[1])  # keep note of the actual suffix assigned
+                    wordCounter += 1
+                    if address[i] == "MAIN":
+                        if i > 0:
+                            if address[i - 1] == "STATION" or address[i - 1] == "STN":
+                                extFactor = extFactors[i - 1]
+                        if i < len(address) - 1:
+                            if address[i + 1] == "STATION" or address[i + 1] == "STN":
+                                extFactor = 2
+                    if (profile.noSymbols == "ST" or profile.noSymbols == "STE") and (
+                            wordCounter == 1 or suffixFactors[-1] >= 1) and i != len(address)-1:
+                        suffFactor = extFactor = 0
+
+            extFactors.append(extFactor)
+            suffixFactors.append(suffFactor)
+            dirFactors.append(dirFactor)
+        #print(address)
+        #print(extFactors)
+        #print(suffixFactors)
+        #print(dirFactors)
+
+        # determine the suffix
+        suffIndex = suffixFactors.index(max(suffixFactors))
+
+        if dirFactors[suffIndex]:
+            suffixFactors[suffIndex] = 0
+        suffIndex = suffixFactors.index(max(suffixFactors))
+        # assign the suffix
+        if suffixFactors[suffIndex] >= 1:
+            suffix = address[suffIndex]
+            extFactors[suffIndex] = 0
+            altSuffix = fullSuffixes[suffIndex]
+            # some suffixes are translated between french to english and vice versa, this is to prevent confusion
+            if any(altSuffix in frSuffix for frSuffix in ["RUE", "PROMENADE", "CHEMIN"]):
+                newAddress.french = True
+            if any(altSuffix in engSuffix for engSuffix in ["STREET", "DRIVE", "ROAD", "SIDEROAD", "CRESCENT"]):
+                newAddress.french = False
+        else:
+            suffix = altSuffix = ""
+            suffIndex = -1
+
+        # assign street, name, extra info, and, if possible, direction
+        for i in range(len(address)):
+            profile = getProfile(address[i])
+            numberFactor = profile.digits
+            wordFactor = profile.letters
+            if profile.ordinal: # ordinal numbers are not numbers, thus, should be in the street or ext info
+                if i < len(address) - 1:
+                    if extFactors[i + 1] > 1.3:
+                        extra = " ".join([extra, address[i]])
+                    else:
+                        street = " ".join([street, address[i]])
+                else:
+                    street = " ".join([street, address[i]])
+
+            elif numberFactor > wordFactor: # join numbers with highways and rural roads
+                if extFactors[i] >= 1.1:
+                    extra = " ".join([extra, address[i]])
+                elif i > 0:
+                    if suffIndex + 1 == i and (not newAddress.french or altSuffix == "ROUTE") and suffIndex != -1:
+                        suffixNumber = address[i]
+                    elif i > suffIndex != -1:
+                        extra = " ".join([extra, address[i]])
+                    elif any(word in address[i - 1] for word in
+                             ["HWY", "HIGHWAY", "ROUTE", "RTE", "RR", "R.R.", "PTH"]) or address[i - 1] == "NO." or\
+                            address[i - 1] == "NO":
+                        street = " ".join([street, address[i]])
+                        suffIndex = i
+                    else:
+                        number = " ".join([number, address[i]])
+                else:
+                    number = " ".join([number, address[i]])
+            else:
+                if dirFactors[i]:
+                    noSym = profile.alphas
+                    if i < suffIndex != -1 or suffIndex == -1:
+                        if len(noSym) == 1:
+                            multiDirect = {"N":["NORTH", "NORD"], "E":["EAST", "EST"], "S":["SOUTH", "SUD"], "W":"WEST",
+                                           "O":"OUEST"}
+                            for letter in multiDirect:
+                                if noSym == letter:
+                                    if letter == "W" or letter == "O":
+                                        address[i] = multiDirect[letter]
+                                    elif newAddress.french:
+                                        address[i] = multiDirect[letter][1]
+                                    else:
+                                        address[i] = multiDirect[letter][0]
+
+                        street = " ".join([street, address[i]])
+
+                    else:
+                        if len(direction) == 2 or len(direction) > 5:
+                            extra = " ".join([extra, address[i]])
+                        elif i < len(address) - 1:
+                            if "TOWER" == address[i + 1] or "MALL" == address[i + 1]:
+                                extra = " ".join([extra, address[i]])
+                        if address[i] not in extra:
+                            if i > 0:
+                                if dirFactors[i - 1] or (len(direction) < 2 or len(direction) <= 5):
+                                    direction = "".join([direction, noSym])
+                                else:
+                                    extra = " ".join([extra, address[i]])
+                            else:
+                                direction = "".join([direction, noSym])
+                else:
+                    exception = any(
+                        address[i] == word for word in ["STATION", "PORT", "DOCK", "PORTE", "TOWER"]) and i < suffIndex != 0
+                    # exception exists in case the street name is mistaken as ext info if it is before the suffix
+                    if (extFactors[i] >= 1.1 or (
+                            i > suffIndex != -1 and not newAddress.french and altSuffix != "PLACE")) and not exception:
+                        extra = " ".join([extra, address[i]])
+                    elif i != suffIndex:
+                        street = " ".join([street, address[i]])
+
+        street = street.strip()
+        extra = extra.strip()
+        number = number.strip()
+
+        # special case
+        if street == "ST":
+            street = street + "||STREET"
+
+        # suffix is actually the street
+        if len(street) == 0 and len(suffix) != 0:
+            street = suffix + "||" + altSuffix
+            suffix = altSuffix = ""
+        joined = "".join(address)
+
+        # special case
+        if joined.find(suffix) != -1 and joined.find(street) != -1 and len(suffix) > 0 and len(street) > 0:
+            if joined.find(suffix) < joined.find(street) and "PLACE" == altSuffix:
+                newAddress.french = True
+
+        newAddress.ordinal = any(getProfile(word).ordinal for word in street.split())
+        newAddress.street = street
+        newAddress.original = address
+        newAddress.number = number
+        newAddress.suffix = suffix
+        newAddress.suffixNumber = suffixNumber
+        newAddress.direction = direction
+        newAddress.extra = extra.rstrip()
+        newAddress.altSuffix = altSuffix
+
+        return newAddress
+
+
+def splitTokens(address):
+    """
+    Breaks apart words joined by commas, periods, slashes and dashes, a "-" on its own between two words is removed
+    :param address: Words of the address, the list is changed in place
+    :return: The same list
+    """
+    i = 0
+    length = len(address)
+
+    while i < length:
+        if address[i].isalnum(): # most words, none of the checks below can change them
+            i += 1
+            continue
+
+        if "," in address[i] and len(address[i].split(",")) > 2 and len(address[i]) > 3 and not any(
+                len(w) <= 1 for w in address[i].split(",")):
+            array = address[i].split(",")
+            address.pop(i)
+            for j in range(len(array)):
+                address.insert(i + j, array[j])
+            length += len(array) - 1
+
+        if "." in address[i] and len(address[i].split(".")) > 1 and len(address[i]) > 3 and not any(
+                len(w) <= 1 for w in address[i].split(".")):
+            array = address[i].split(".")
+            address.pop(i)
+            for j in range(len(array)):
+                address.insert(i + j, array[j])
+            length += len(array) - 1
+
+        if "\\" in address[i] and len(address[i].split("\\")) > 1 and len(address[i]) > 3 and not any(
+                len(w) <= 1 and w.isalpha() for w in address[i].split("\\")):
+            array = address[i].split("\\")
+            address.pop(i)
+            for j in range(len(array)):
+                address.insert(i + j, array[j])
+            length += len(array) - 1
+
+        if "/" in address[i] and len(address[i].split("/")) > 1 and len(address[i]) > 3 and not any(
+                len(w) <= 1 and w.isalpha() for w in address[i].split("/")):
+            array = address[i].split("/")
+            address.pop(i)
+            for j in range(len(array)):
+                address.insert(i + j, array[j])
+            length += len(array) - 1
+
+        if "-" in address[i] and len(address[i].split('-')) == 2 and not\
+                any(not checkNumbers(w) for w in address[i].split('-')) and (
+                any(checkOrdinal(w) for w in address[i].split("-")) or i > 0):
+            array = address[i].split("-")
+            address.pop(i)
+            for j in range(len(array)):
+                address.insert(i + j, array[j])
+            length += len(array) - 1
+
+        if address[i] == "-" and len(address) - 1 > i > 0:
+            noSym = "".join(letter for letter in address[i - 1] + address[i + 1] if letter.isalnum())
+            if not noSym.isdigit() or not noSym.isalpha():
+                address.pop(i)
+            length -= 1
+
+        i += 1
+    return address
+
+
+def getProfile(word):
+    """
+    Finds the properties of a word, each distinct word is only classified once until the rules change
+    :param word: The word
+    :return: TokenProfile of the word
+    """
+    key = (rulesVersion, word)
+    profile = tokenCache.get(key)
+    if profile is None:
+        profile = TokenProfile(word)
+        tokenCache.put(key, profile)
+    return profile
+
+
+def calcSuffixFactor(word, index=None):
+    """
+    Determines how likely a word is to be a suffix
+    :param word: Word to be added
+    :param index: SuffixIndex of other rules than the rules in use
+    :return: Highest factor with the suffix that has the highest factor
+    """
+    word = suffixWord(word)
+    if word is None:
+        return (0, "")
+    return (suffixIndex if index is None else index).match(word)
+
+
+def suffixWord(word):
+    """
+    Finds the word compared to the suffix rules, shared by calcSuffixFactor and BatchScorer
+    :param word: The word
+    :return: The word without symbols, or None if the word cannot be a suffix
+    """
+    if ("," not in word and "-" not in word and "." not in word) and not word.isalnum():
+        # symbols that aren't used to abbreviate
+        return None
+
+    word = removeSymbols(word)
+
+    # if the word is only a letter, it is impossible to determine if it represents a suffix
+    if len(word) <= 1:
+        return None
+    return word
+
+
+def calcExtFactor(word):
+    """
+    Determines how likely a word is external info for an address, remembering the factor until the rules change
+    :param word: The word
+    :return: The highest external factor found
+    """
+    key = (rulesVersion, word)
+    extFactor = extCache.get(key)
+    if extFactor is None:
+        extFactor = scoreExtFactor(word)
+        extCache.put(key, extFactor)
+    return extFactor
+
+
+def scoreExtFactor(word, rules=None):
+    """
+    Scores a word against the external info rules, use calcExtFactor to avoid scoring the same word again
+    :param word: The word
+    :param rules: CompiledRules of other rules than the rules in use
+    :return: The highest external factor found
+    """
+    factor, word, symFactor = extSymbols(word)
+    if factor is not None:
+        return factor
+
+    extFactor = 0
+    letters = set(word)
+    for extra, extraLetters in (compiledRules if rules is None else rules).extraLetters:
+        k = j = 0
+        simFactor = consecFactor = 0
+        foreign = False
+        while j < len(word) and k < len(extra) and not foreign:
+            if word[j] == extra[k]:
+                if j == k and len(word) >= 3:
+                    consecFactor += 1.3 / len(word)
+                simFactor += 0.8 / len(word) + 1 / (2 * len(extra))
+                j += 1
+
+            k += 1
+
+        if not letters.issubset(extraLetters) or word[0] != extra[0]:
+            simFactor = consecFactor = 0
+
+        if extra == "SECTION":
+            if "C" not in word:
+                simFactor = consecFactor = 0
+        if extra == "MEZZANINE":
+            if "Z" not in word:
+                simFactor = consecFactor = 0
+        if extra == "PORTE" or extra == "PORT":
+            if "T" not in word:
+                simFactor = consecFactor = 0
+
+        extFactor = max(simFactor, consecFactor, symFactor, extFactor)
+
+
+    return extFactor
+
+
+def extSymbols(word):
+    """
+    Scores what is checked before the external info rules: ordinal numbers, symbols and outliers, shared by
+    scoreExtFactor and BatchScorer
+    :param word: The word
+    :return: The external factor if it is found without the rules or None, the word without symbols, symbol factor
+    """
+    # check if it's a case of 1st, 2nd, 3rd.
+    if len(word) >= 2:
+        if checkOrdinal(word):
+            return 0.92, word, 0  # was previously 0.9
+        if word == "ST":
+            return 0, word, 0
+    else:
+        if word.isalpha():
+            return 1.05, word, 0
+    symFactor = 0
+    for symbol in ",!@#$%&^*()-_+=/:[]0123456789.":
+        if symbol in word:
+            if symbol == "-" or symbol == "*":  #symbol == "." or symbol == "-"
+                if symbol == "*" and word.count(symbol) > 2:
+                    symFactor += 1.1 * (word.count(symbol) - 2)
+                symFactor += 0.5
+            elif symbol == ".":
+                if symFactor > 0:
+                    if word.count(symbol) >= 2:
+                        symFactor += 0.5 * (word.count(symbol))
+                    else:
+                        symFactor += 0.25
+                else:
+                    symFactor += 0.5
+            elif symbol == ",":
+                if len(word) > 5:
+                    symFactor += 0.9 / len(word)
+                else:
+                    symFactor += 0.9
+            elif symbol == "&":
+                symFactor += 0.5
+            else:
+                symFactor += 1.1
+    if symFactor > 0.5:
+        return symFactor, word, symFactor
+
+    word = removeSymbols(word)
+
+    if word == "LA" or word == "DE" or len(word) == 0 or word == "OF" or word == "ST": # outliers
+        return 0, word, symFactor
+    if word == "GD":
+        return 1.1, word, symFactor
+    if word == "RR":
+        return 0.8, word, symFactor
+    return None, word, symFactor
+
+
+def directionFactor(word):
+    """
+    Determines if the word can be a direction
+    :param word: The word to be determined
+    :return: Boolean value indicating if direction or not
+    """
+    word = "".join(letter for letter in word if letter.isalpha())
+
+    for direct in ["NORTH", "WEST", "EAST", "SOUTH", "NORD", "OUEST", "EST", "SUD", "SOUTHEAST",
+                   "SOUTHWEST", "NORTHEAST", "NORTHWEST", "NORDEST", "NORDOUEST",
+                   "SUDEST", "SUDOUEST"]:
+        if direct == word or word == direct[0]:
+            return True
+    for direct in ["N", "S"]:
+        for subDirect in ["E", "W"]:
+            if direct + subDirect == word:
+                return True
+    return direct == "O"
+
+
+def findPOFactor(street):
+    """
+    Finds an instance of "PO BOX, CP, or CASE POSTALE" in a string
+    :param street: The Street name
+    :return: Boolean value indicating if PO BOX or not
+    """
+    PO = "POBOX"
+    CP = "CP"
+    CasePost = "CASE POSTALE"
+    PObag = "POBAG"
+    street = street.replace(",", "").replace(".", "").replace(" ", "")
+    word = ""
+    extra = ""
+
+    for letter in street:
+        if letter.isalpha():
+            word += letter
+        else:
+            extra += letter
+
+    if extra.isdigit():
+        return PO in word or (CP == word) or CasePost in word or PObag in word or word == "BOX"
+    return False
+
+
+def removeSymbols(word, exception="", remove=""):
+    """
+    Removes symbols from a word
+    :param word: The word to be cleaned
+    :param exception: Any characters to be excepted
+    :param remove: Any characters that should be removed
+    :return: Cleaned word
+    """
+    if word.isalnum(): # nothing to remove
+        return word
+    table = symbolTables.get((exception, remove))
+    if table is None:
+        table = SymbolTable(exception, remove)
+        symbolTables[(exception, remove)] = table
+    return word.translate(table)
+
+
+def checkNumbers(word):
+    """
+    Checks if any digits exist in a string
+    :param word: The string
+    :return: Boolean value if digit exists
+    """
+    return any(c.isdigit() for c in word)
+
+
+def checkOrdinal(word):
+    """
+    Checks if a string can be an ordinal
+    :param word: The string
+    :return: Boolean value if string is an ordinal number
+    """
+    if not checkNumbers(word) or word.isdigit() or ("-" in word and word.strip("-") == word):
+        return False
+
+    word = removeSymbols(removeSymbols(word, "", "' -"))
+    letters = ""
+    for char in word:
+        if not char.isdigit():
+            letters += char
+
+    if len(letters) == 1:
+        return letters == "E"
+    elif len(letters) == 2:
+        return letters == "TH" or letters == "ER" or letters == "RE" or letters == "ND" or letters == "RD" or letters == "ST"
+    elif len(letters) > 2:
+        return "ERE" in letters or letters == "IER" or "ME" in letters or "ÈRE" in letters
+    else:
+        return False
+
+
+def validate(address):
+    """
+    Validate a given address based on the rules given and flag any inconsistencies
+    :param address: Address object
+    """
+
+    newDir = ""
+    newStreet = ""
+    newSuffix = ""
+
+    # category stores the errors for each location
+    # NUMBER #############################################
+
+    if getProfile(address.number).noSymbols != address.number:
+        address.flag.addNumFlag("SYM")
+        address.number = getProfile(address.number).noSymbols
+
+    if len(address.number) != 0:
+        if address.number[-1] == "-" or address.number[0] == "-":
+            address.number = address.number.strip("-")
+    else:
+        address.flag.addNumFlag("UNDEFINED")
+
+    # DIRECTION ##########################################
+
+    if not address.direction.isupper() and len(address.direction) > 0:
+        address.flag.addDirFlag("FORMAT")
+
+    if "." in address.direction or removeSymbols(removeSymbols(address.direction, "", "' -")) != address.direction:
+        address.flag.addDirFlag("SYM")
+        address.direction = removeSymbols(removeSymbols(address.direction, "", "' -"))
+
+    if address.direction in ["NORTH", "WEST", "EAST", "SOUTH", "NORD", "OUEST", "EST", "SUD", "SOUTHEAST",
+                             "SOUTHWEST", "NORTHEAST", "NORTHWEST", "NORDEST", "NORDOUEST", "SUDEST", "SUDOUEST"]:
+        address.flag.addDirFlag("LEN")
+
+    if "LEN" in address.flag.direction:
+        if "NORTH" in address.direction or "NORD" in address.direction:
+            newDir += "N"
+        elif "SOUTH" in address.direction or "SUD" in address.direction:
+            newDir += "S"
+        if "WEST" in address.direction:
+            newDir += "W"
+        elif "OUEST" in address.direction:
+            newDir += "O"
+        elif "EST" in address.direction or "EAST" in address.direction:
+            newDir += "E"
+    else:
+        for letter in address.direction:
+            if letter.isalpha():
+                newDir += letter
+
+    address.direction = newDir
+    # STREET #############################################
+
+    isPO = findPOFactor(address.extra) or findPOFactor(address.street)
+    name = address.street.split()
+
+    if "" in name:
+        address.flag.addStrFlag("FORMAT")
+
+    for symbol in ",.!#$%^&*()[]<>/~;=_+–":
+        for word in name:
+            if symbol in word:
+                address.flag.addStrFlag("SYM")
+                name[name.index(word)] = removeSymbols(word)
+
+    if len(name) >= 2:
+
+        for word in name:
+            stFlag = steFlag = False
+            for saint in ["ST", "STE", "SAINTE", "SAINT"]:
+                if saint in word and len(saint) > 3:
+                    address.flag.addStrFlag("ST/STE")
+                    if "-" in word:
+                        saintWord = word[:word.index("-")]
+                    else:
+                        saintWord = ""
+                    if not stFlag and (word == "SAINT" or saintWord == "SAINT"):
+                        stFlag = saint == "SAINT"
+                    if not steFlag and (word == "SAINTE" or saintWord == "SAINTE"):
+                        steFlag = saint == "SAINTE"
+                elif len(saint) <= 3 and saint in word:
+                    if "-" in word:
+                        saintWord = word[:word.index("-")]
+                    else:
+                        saintWord = ""
+                    if not stFlag and (word == "ST" or saintWord == "ST"):
+                        stFlag = saint == "ST"
+                    if not steFlag and (word == "STE" or saintWord == "STE"):
+                        steFlag = saint == "STE"
+
+            if stFlag:
+                newStreet += "ST. "
+                if "-" in word:
+                    newStreet += word.split("-")[-1] + " "
+            elif steFlag:
+                newStreet += "STE. "
+                if "-" in word:
+                    newStreet += word.split("-")[-1] + " "
+            else:
+                newStreet += word + " "
+
+    else:
+        # CASE that the address is a PO BOX
+        if isPO:
+            if address.external:
+                address.flag.addStrFlag("EXCESS")
+            elif "." in address.extra and len(address.street) == 0:
+                address.flag.addStrFlag("SYM")
+                address.extra = removeSymbols(address.extra)
+
+        if len(address.street) == 0 and not isPO:
+            address.flag.addStrFlag("UNDEFINED")
+
+        if "-" in address.street:
+            nameB = address.street.split("-")
+
+            for word in nameB:
+                stFlag = steFlag = False
+                for saint in ["ST", "STE", "SAINTE", "SAINT"]:
+                    if saint in word and len(saint) > 3:
+                        address.flag.addStrFlag("ST/STE")
+                        if not stFlag and word == "SAINT":
+                            stFlag = saint == "SAINT"
+                        if not steFlag and word == "SAINTE":
+                            steFlag = saint == "SAINTE"
+                    elif len(saint) <= 3 and saint in word:
+                        if not stFlag and word == "ST":
+                            stFlag = saint == "ST"
+                        if not steFlag and word == "STE":
+                            steFlag = saint == "STE"
+
+                if stFlag:
+                    newStreet += "ST. "
+                elif steFlag:
+                    newStreet += "STE. "
+                else:
+                    newStreet += word + "-"
+
+        if "||" in address.street:  # account for the case that a street was mistaken as a suffix
+
+            if address.street[:address.street.index("|")] == address.street[address.street.index("||") + 2:]:
+                newStreet = address.street[:address.street.index("|")]
+            else:
+                newStreet = address.street[address.street.index("||") + 2:]
+
+    if not address.street.isupper():
+        newStreet = newStreet.upper()
+        address.flag.addStrFlag("FORMAT")
+
+    if len(newStreet) != 0:
+        newStreet = newStreet.replace("HIGHWAY", "HWY").replace("HIWAY", "HWY")
+        temp = newStreet.split()
+        for word in temp:
+            if word == "RTE":
+                temp.insert(temp.index("RTE"), "ROUTE")
+                temp.remove("RTE")
+        newStreet = " ".join(temp)
+        address.street = newStreet.strip("-")
+    else:
+        temp = address.street.split()
+        for word in temp:
+            if word == "RTE":
+                temp.insert(temp.index("RTE"), "ROUTE")
+                temp.remove("RTE")
+        address.street = " ".join(temp)
+        address.street = address.street.replace("HIGHWAY", "HWY").replace("HIWAY", "HWY").strip("-")
+
+    # SUFFIX #############################################
+
+    if len(address.suffix) == 0 and "||" not in address.street and not isPO:
+        address.flag.addSufFlag("UNDEFINED")
+
+    if not address.suffix.isalpha() and len(address.suffix) != 0:
+        address.suffix = removeSymbols(address.suffix)
+        address.flag.addSufFlag("SYM")
+
+    # based on the suffix, determine if it should be short or not
+
+    if address.altSuffix in shortStreets:
+        if address.suffix != shortStreets[address.altSuffix] and (not (
+                address.street[-1].isalpha() and address.street[:-1].isdigit() and len(
+            address.street.split()) == 1) or getProfile(address.street).ordinal):
+            newSuffix += shortStreets[address.altSuffix]
+            address.flag.addSufFlag(address.altSuffix)
+        elif address.street[-1].isalpha() and address.street[:-1].isdigit() and len(
+                address.street.split()) == 1 and not getProfile(address.street).ordinal:
+            newSuffix += address.altSuffix
+    else:
+        if len(address.suffix) != len(address.altSuffix):
+            newSuffix += address.altSuffix
+            address.flag.addSufFlag(address.altSuffix)
+        else:
+            newSuffix += address.suffix
+
+    if address.french and len(address.street) != 0 and len(address.altSuffix) != 0 and len(address.number) != 0:
+        numIndex = -1
+        for i in range(len(address.original)):
+            if len(address.original[i]) > 0:
+                if address.original[i][-1] == address.number[-1]:
+                    numIndex = i
+        if numIndex != -1 and numIndex < len(address.original) - 1:
+            if getProfile(address.original[numIndex + 1]).noSymbols != address.suffix:
+                address.flag.addSufFlag("STRUCT")
+
+    if len(newSuffix) != 0:
+        address.suffix = newSuffix
+
+    # EXTERNAL INFO ######################################
+    if not address.extra.isnumeric() and (len(address.extra) > 1 or len(address.extra.split()) > 1) and (
+            isPO and address.external):
+        address.flag.addAddrFlag("EXCESS")
+
+    if isPO and len(address.street) == 0 == len(address.number) == len(address.suffix) == len(address.direction):
+        address.street = " ".join([address.extra, address.number])
+        address.number = ""
+        address.extra = ""
+
+    if len(address.extra) > 40: # attempt to trim ext. info
+        address.extra = trimExtInfo(address.extra)
+
+
+def trimExtInfo(extra):
+    """
+    Attempt to shorten external info to meet character limits
+    :param extra: External info string
+    :return: The external info string
+    """
+    new = ""
+    for word in extra:
+        if word == "FLOOR":
+            new += "FL"
+        elif word == "APARTMENT":
+            new += "APT"
+        elif checkOrdinal(word):
+            if "IEME" in word or "IE" in word or "IER" in word:
+                new += word[:word.find("I")] + "E"
+            elif "EME" in word:
+                new += word[:word.find("E")] + "E"
+        elif word == "BUREAU":
+            new += "BUR"
+        else:
+            new += word
+    new = new.replace("BUILDING", "BLDG").replace("APARTMENT", "APT").replace("NIVEAU", "NIV").replace("STATION", "STN").replace("PARK", "PK")
+    return new
+
+
+def save_rules(fileName="Rules.txt"):
+    """
+    Save the rules onto a text file
+    :param fileName: Rules file
+    """
+    with open(fileName, "w") as saveFile:
+        json.dump({"SUFFIXES":suffixes, "SUFF_PREF":shortStreets, "EXT":extras}, saveFile, indent=3, sort_keys=True,
+                  ensure_ascii=False)
+    compileRules(fileName) # so the next launch does not have to
+
+    print("Rules Saved")
+
+
+def load_rules(suffixes, extras, shortStreets, fileName="Rules.txt"):
+    """
+    Load the rules from txt file
+    :param suffixes: Suffix rules
+    :param extras: External info rules
+    :param shortStreets: Suffixes with alternate versions
+    :param fileName: Rules file
+    """
+    global loadedRules
+    loadedRules = compileRules(fileName)
+    suffixes.update(loadedRules.suffixes)
+    extras.extend(loadedRules.extras)
+    shortStreets.update(loadedRules.shortStreets)
+
+
+def compileRules(fileName="Rules.txt"):
+    """
+    Gives the compiled rules of a rules file, read from the file beside it ending in .compiled when it was compiled
+    from the same text, otherwise compiled from the text and saved there for the next time
+    :param fileName: Rules file
+    :return: CompiledRules of the file
+    """
+    with open(fileName, "rb") as jsonFile:
+        text = jsonFile.read()
+    rulesHash = hashlib.sha256(text).hexdigest()
+    compiledName = os.path.splitext(fileName)[0] + ".compiled"
+
+    try: # only plain values, unlike pickle loading a file put beside the rules cannot run anything
+        with open(compiledName, "rb") as compiledFile:
+            state = marshal.loads(compiledFile.read()) # load reads the file in many small reads
+        if state["formatVersion"] == COMPILED_VERSION and state["rulesHash"] == rulesHash:
+            compiled = CompiledRules.__new__(CompiledRules)
+            compiled.__setstate__(state)
+            return compiled
+    except Exception: # missing, or written by another version of the program
+        pass
+
+    try:
+        rules = json.loads(text.decode("utf-8"))
+    except UnicodeDecodeError: # saved on Windows, e.g. the shipped Rules.txt
+        rules = json.loads(text.decode("cp1252"))
+    compiled = CompiledRules(rules["SUFFIXES"], rules["EXT"], rules["SUFF_PREF"], rulesHash)
+    try:
+        with open(compiledName, "wb") as compiledFile:
+            marshal.dump(compiled.__getstate__(), compiledFile)
+    except OSError: # the folder can be read only, the rules are compiled again next time
+        pass
+    return compiled
+
+
+def rulesFingerprint():
+    """
+    Hash of the rules used by the factors since the last call to rulesChanged, saved rules or not
+    :return: sha256 hex digest, the same rules in the same order always give the same hash
+    """
+    rules = [ROW_STORE_VERSION, list(compiledRules.suffixes.items()), compiledRules.extras,
+             list(compiledRules.shortStreets.items())]
+    return hashlib.sha256(json.dumps(rules, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+def rulesChanged():
+    """
+    Must be called whenever the suffix or external info rules change, so nothing computed from the old rules is reused.
+    The rules loaded last are used as they were compiled if they have not changed since
+    """
+    global rulesVersion, compiledRules, suffixIndex
+    if loadedRules is not None and loadedRules.matches(suffixes, extras, shortStreets):
+        compiledRules = loadedRules
+    else:
+        compiledRules = CompiledRules(suffixes, extras, shortStreets)
+    suffixIndex = compiledRules.suffixIndex
+    rulesVersion += 1
+    extCache.clear() # entries of older versions can no longer be hit
+    tokenCache.clear()
+
+
+def write(fileName, addresses, stats=None, results=None, fastXlsx=False):
+    """
+    Writes new addresses and its flag to a new excel spreadsheet, with the flag counts and time of each stage
+    in a "Summary" sheet
+    :param fileName: File Name to be used
+    :param addresses: List of addresses, or a generator such as scanRows to write each row as it is cleaned
+    :param stats: FlagStats to count in, made before the sheet was loaded so the summary includes loading
+    :param results: ResultIndex or ResultStore to add the addresses written to, a list of them, or None
+    :param fastXlsx: Write the excel file straight as XML with XlsxWriter instead of with openpyxl
+    :return: Number of addresses written and the file name used
+    """
+    name, extension = os.path.splitext(fileName)
+    csvFile = extension.lower() in CSV_DELIMITERS
+    while os.path.isfile(fileName) or (csvFile and os.path.isfile(summaryName(fileName))): # nothing is replaced
+        name += " - Copy"
+        fileName = name + extension
+    if stats is None:
+        stats = FlagStats()
+    if csvFile:
+        return writeCsv(fileName, addresses, CSV_DELIMITERS[extension.lower()], stats, results)
+    if extension.lower() in RESULT_STORE_EXTENSIONS:
+        return writeStore(fileName, addresses, stats, results)
+    if fastXlsx:
+        writeWb = XlsxWriter(fileName)
+    else:
+        from openpyxl import Workbook
+
+        writeWb = Workbook(write_only=True)
+    sheet = writeWb.create_sheet("Flags", 0)
+    sheet.append(["AddressLine1", "AddressLine2", "Flags for Program"])
+    start = stats.rows
+    try:
+        for row in countedRows(addresses, stats, results):
+            sheet.append(row)
+    except BaseException: # scan cancelled or failed, nothing is saved
+        sheet.close()
+        writeWb.close()
+        raise
+
+    summary = writeWb.create_sheet("Summary")
+    for row in stats.summaryRows():
+        summary.append(row)
+    writeWb.save(filename=fileName)
+
+    writeWb.close()
+    stats.lap("Saving")
+    return stats.rows - start, fileName
+
+
+def writeCsv(fileName, addresses, delimiter=",", stats=None, results=None):
+    """
+    Writes new addresses to a CSV or TSV file with the same columns as write, the summary sheet of write is
+    written beside it to the file of summaryName. Both are written to temporary files first, so a file is only there
+    once it is complete
+    :param fileName: File Name to be used
+    :param addresses: List of addresses, or a generator such as scanRows to write each row as it is cleaned
+    :param delimiter: "," for CSV, tab for TSV
+    :param stats: FlagStats to count in
+    :param results: ResultIndex or ResultStore to add the addresses written to, a list of them, or None
+    :return: Number of addresses written and the file name used
+    """
+    if stats is None:
+        stats = FlagStats()
+    start = stats.rows
+    summaryFile = summaryName(fileName)
+    try:
+        # utf-8-sig so excel shows french accents when the file is opened
+        with open(fileName + ".tmp", "w", newline="", encoding="utf-8-sig") as file:
+            writer = csv.writer(file, delimiter=delimiter)
+            writer.writerow(["AddressLine1", "AddressLine2", "Flags for Program"])
+            for row in countedRows(addresses, stats, results):
+                writer.writerow(row)
+        with open(summaryFile + ".tmp", "w", newline="", encoding="utf-8-sig") as file:
+            csv.writer(file, delimiter=delimiter).writerows(stats.summaryRows())
+        os.replace(fileName + ".tmp", fileName)
+        os.replace(summaryFile + ".tmp", summaryFile)
+    except BaseException: # scan cancelled or failed, nothing is saved
+        for temporary in (fileName + ".tmp", summaryFile + ".tmp"):
+            if os.path.isfile(temporary):
+                os.remove(temporary)
+        raise
+    stats.lap("Saving")
+    return stats.rows - start, fileName
+
+
+def summaryName(fileName):
+    """
+    File writeCsv writes the summary of a CSV or TSV file to
+    :param fileName: CSV or TSV file of the addresses
+    :return: The file name ending in "Summary"
+    """
+    name, extension = os.path.splitext(fileName)
+    return name + "Summary" + extension
+
+
+def writeStore(fileName, addresses, stats=None, results=None):
+    """
+    Writes new addresses to a SQLite database with ResultStore in place of a sheet, for more rows than excel opens,
+    the flag counts and time of each stage are saved to its summary table
+    :param fileName: File Name to be used
+    :param addresses: List of addresses, or a generator such as scanRows to write each row as it is cleaned
+    :param stats: FlagStats to count in
+    :param results: ResultIndex or ResultStore to add the addresses written to as well, a list of them, or None
+    :return: Number of addresses written and the file name used
+    """
+    if stats is None:
+        stats = FlagStats()
+    start = stats.rows
+    store = ResultStore(fileName)
+    try:
+        for row in countedRows(addresses, stats, [store] + listed(results)):
+            pass
+    except BaseException: # scan cancelled or failed, nothing is saved
+        store.discard()
+        raise
+    store.save(stats)
+    stats.lap("Saving")
+    return stats.rows - start, fileName
+
+
+def countedRows(addresses, stats, results=None):
+    """
+    Gives the row to write for each address, counting its flags and the time spent cleaning and writing
+    :param addresses: Addresses being written
+    :param stats: FlagStats to count in
+    :param results: ResultIndex or ResultStore to add each address to, a list of them, or None
+    :return: generator of the rows
+    """
+    results = listed(results)
+    stats.lap("Cleaning") # such as a scan of every row before writing
+    cleaning = writing = 0
+    last = timer()
+    try:
+        for address in addresses:
+            now = timer()
+            cleaning += now - last # reading and cleaning the address when it is given by a generator
+            row = cleanedRow(address)
+            stats.add(address.flag, len(row) == 3)
+            for result in results:
+                result.add(address)
+            yield row
+            last = timer()
+            writing += last - now
+    finally:
+        stats.addTime("Cleaning", cleaning)
+        stats.addTime("Writing", writing)
+
+
+def listed(results):
+    """
+    :param results: A ResultIndex or ResultStore, a list of them, or None
+    :return: list of them
+    """
+    if results is None:
+        return []
+    return results if isinstance(results, list) else [results]
+
+
+def cleanedRow(address):
+    """
+    Row written for an address, invalid addresses are written as they were given
+    :param address: Address object
+    :return: AddressLine1, AddressLine2 and the flag column when the address is left unchanged
+    """
+    if "INVALID" in address.flag.address or (
+            "UNDEFINED" in address.flag.number and "UNDEFINED" in address.flag.street and "UNDEFINED" in address.flag.suffix):
+        return [" ".join(address.original), address.extra, "Invalid, Thus Unchanged"]
+    return [str(address), address.extra]
+
+
+def debugWrite(addresses, fileName="testclean.xlsx", stats=None, fastXlsx=False):
+    """
+    Writes new addresses with their flags and the address they were cleaned from, replacing the file
+    :param addresses: List of addresses, or a generator such as ResultStore.read
+    :param fileName: File Name to be used
+    :param stats: FlagStats to count in, or None
+    :param fastXlsx: Write the file straight as XML with XlsxWriter instead of with openpyxl
+    :return: Number of addresses written and the file name used
+    """
+    if fastXlsx:
+        writeWb = XlsxWriter(fileName)
+    else:
+        from openpyxl import Workbook
+
+        writeWb = Workbook(write_only=True)
+    sheet = writeWb.create_sheet("Flags", 0)
+
+    sheet.append(["AddressLine1", "AddressLine2", "Flags for Program"])
+    count = 0
+    try:
+        for address in addresses:
+            count += 1
+            if stats is not None:
+                stats.add(address.flag, len(cleanedRow(address)) == 3)
+            if "INVALID" in address.flag.address or (
+                    "UNDEFINED" in address.flag.number and "UNDEFINED" in address.flag.street and "UNDEFINED" in address.flag.suffix):
+                sheet.append([" ".join(address.original), address.extra, "Invalid, Thus Unchanged"])
+            else:
+                sheet.append([str(address), address.extra, str(address.flag), " ".join(address.original)])
+    except BaseException: # scan cancelled or failed, nothing is saved
+        sheet.close()
+        writeWb.close()
+        raise
+
+    writeWb.save(filename=fileName)
+
+    writeWb.close()
+    return count, fileName
+
+
+# inner class for a value read without its openpyxl cell, structureAddress only needs the value
+class ValueCell:
+    def __init__(self, value):
+        self.value = value
+
+
+# inner class for reading a CSV or TSV file in place of a worksheet, scan, scanRows and scanParallel only need the
+# header row, iter_rows and max_row. Rows are read as they are scanned and are never built into openpyxl cells
+class CsvSheet:
+    def __init__(self, fileName, delimiter=None, encoding="utf-8-sig"):
+        if delimiter is None: # from the extension, commas if it is not known
+            delimiter = CSV_DELIMITERS.get(os.path.splitext(fileName)[1].lower(), ",")
+        self._file = open(fileName, newline="", encoding=encoding)
+        self._reader = csv.reader(self._file, delimiter=delimiter)
+        self._header = tuple(ValueCell(name) for name in next(self._reader, []))
+        self.max_row = None # not known without reading the whole file
+
+    def __getitem__(self, row):
+        if str(row) != "1":
+            raise KeyError("Only the header row of a CSV file can be read by its number")
+        return self._header
+
+    def iter_rows(self, min_row=2, max_row=None, values_only=False):
+        """
+        Reads the rows below the header, a CSV file can only be read once
+        :param min_row: First row, the header is row 1
+        :param max_row: Last row, to the end of the file if None
+        :param values_only: Give the values instead of cells
+        :return: generator of the rows, each as long as the header
+        """
+        width = len(self._header)
+        for number, values in enumerate(self._reader, 2):
+            if max_row is not None and number > max_row:
+                break
+            if number < min_row:
+                continue
+            if len(values) < width: # excel leaves out trailing empty columns
+                values += [""] * (width - len(values))
+            if values_only:
+                yield tuple(values)
+            else:
+                yield tuple(ValueCell(value) for value in values)
+
+    def close(self):
+        self._file.close()
+
+
+# inner class for a part of a workbook XlsxSheet does not read itself, the rest of the sheet is read with openpyxl
+class XlsxUnsupported(Exception):
+    pass
+
+
+# inner class for reading columns of an xlsx worksheet straight from its XML in place of an openpyxl worksheet. The
+# header is found by name like findCol does, then only the selected columns of each row are read, no cell objects are
+# made for the others. Sheets with shared or array formulas or cells without references are read with openpyxl instead
+class XlsxSheet:
+    def __init__(self, fileName, sheetName=None, columns=None, headerRow=1):
+        self.fileName = fileName
+        self.sheetName = sheetName # the first sheet if None
+        self.headerRow = headerRow
+        self.max_row = None # from the dimension of the sheet, like openpyxl
+        self._width = 0 # columns of the dimension
+        self._zip = None
+        self._workbook = None # openpyxl workbook once something is not supported
+        self._strings = []
+        self._dateStyles = set() # styles showing a number as a date or a time
+        self._timeStyles = set() # styles showing a number as a length of time
+        self._date1904 = False # dates counted from 1904 instead of 1900
+        self._epoch = None # date numbers are counted from
+        self._fromExcel = None # openpyxl function making dates of numbers
+        self._letters = {} # column of each column letter
+        try:
+            self._open()
+            header = self._readHeader()
+        except (XlsxUnsupported, KeyError, ValueError, StopIteration, zipfile.BadZipFile, ParseError):
+            header = self._openWorkbook() # openpyxl raises its own error if the file cannot be read at all
+        self._header = header
+        self.select(columns)
+
+    def select(self, columns=None):
+        """
+        Chooses the columns read from each row
+        :param columns: Column names or numbers from 0 as findCol gives them, every column if None
+        """
+        if columns is None:
+            columns = range(max(self._width, max(self._header, default=-1) + 1))
+        names = {}
+        for column in sorted(self._header): # the first column of a name, like findCol
+            names.setdefault(self._header[column], column)
+        self._columns = [column if isinstance(column, int) else names.get(column) for column in columns]
+        self._positions = {} # positions of each column in the rows read, a column can be selected more than once
+        for position, column in enumerate(self._columns):
+            if column is not None:
+                self._positions.setdefault(column, []).append(position)
+
+    def __getitem__(self, row):
+        if str(row) != str(self.headerRow):
+            raise KeyError("Only the header row of an XlsxSheet can be read by its number")
+        return tuple(ValueCell(self._header.get(column)) for column in self._columns)
+
+    def iter_rows(self, min_row=None, max_row=None, values_only=False):
+        """
+        Reads the selected columns of the rows, rows missing from the file are given empty like openpyxl does
+        :param min_row: First row, the row below the header if None
+        :param max_row: Last row, the last row of the dimension if None
+        :param values_only: Give the values instead of cells
+        :return: generator of the rows, each as long as the columns selected
+        """
+        if min_row is None:
+            min_row = self.headerRow + 1
+        if max_row is None:
+            max_row = self.max_row
+        empty = (None if values_only else ValueCell(None),) * len(self._columns)
+        expected = min_row
+        for number, values in self._rows(min_row, max_row):
+            while expected < number and (max_row is None or expected <= max_row):
+                expected += 1
+                yield empty
+            if max_row is not None and number > max_row:
+                break
+            expected += 1
+            yield tuple(values) if values_only else tuple(ValueCell(value) for value in values)
+
+    def close(self):
+        if self._zip is not None:
+            self._zip.close()
+        if self._workbook is not None:
+            self._workbook.close()
+
+    def _open(self):
+        """
+        Finds the sheet, the shared strings and the date styles of the workbook
+        """
+        self._zip = zipfile.ZipFile(self.fileName)
+        package = self._relations("_rels/.rels")
+        book = next(target for kind, target in package.values() if kind == XLSX_DOCUMENT)
+        parts = self._relations(posixpath.join(posixpath.dirname(book), "_rels", posixpath.basename(book) + ".rels"),
+                                posixpath.dirname(book))
+        self._path = None
+        with self._zip.open(book) as source:
+            for event, element in iterparse(source):
+                if element.tag == XLSX_MAIN + "workbookPr":
+                    self._date1904 = element.get("date1904") in ("1", "true")
+                if element.tag == XLSX_MAIN + "sheet" and self._path is None:
+                    kind, target = parts[element.get(XLSX_RELATION + "id")]
+                    if (self.sheetName is None and kind == XLSX_WORKSHEET) or element.get("name") == self.sheetName:
+                        self._path = target
+        if self._path is None:
+            raise KeyError("Worksheet " + str(self.sheetName) + " does not exist")
+        for kind, target in parts.values():
+            if kind == XLSX_STRINGS:
+                self._strings = self._readStrings(target)
+            elif kind == XLSX_STYLES:
+                self._readDateStyles(target)
+
+    def _relations(self, name, folder=""):
+        """
+        Reads the parts a part of the package refers to
+        :param name: Relationships part
+        :param folder: Folder the targets are relative to
+        :return: dictionary of the type and the part of each relationship id
+        """
+        parts = {}
+        with self._zip.open(name) as source:
+            for event, element in iterparse(source):
+                if element.tag == XLSX_PACKAGE + "Relationship" and element.get("TargetMode") != "External":
+                    target = element.get("Target")
+                    target = target[1:] if target.startswith("/") else posixpath.normpath(posixpath.join(folder, target))
+                    parts[element.get("Id")] = (element.get("Type").rsplit("/", 1)[-1], target)
+        return parts
+
+    def _readStrings(self, name):
+        """
+        Reads the shared strings, formatted runs are joined and phonetic runs left out like openpyxl does
+        :param name: Shared strings part
+        :return: list of the strings
+        """
+        strings = []
+        for opening, prefix, text in self._blocks(name, "sst", "si"):
+            strings.extend(xmlText(element).replace("x005F_", "") for element in XML(opening + text + b"</blocks>"))
+        return strings
+
+    def _readDateStyles(self, name):
+        """
+        Finds the styles showing numbers as dates or times with the stylesheet of openpyxl, so they are read as the
+        same dates
+        :param name: Styles part
+        """
+        from openpyxl.styles.stylesheet import Stylesheet
+        from openpyxl.utils.datetime import from_excel, CALENDAR_WINDOWS_1900, CALENDAR_MAC_1904
+
+        try:
+            with self._zip.open(name) as source:
+                stylesheet = Stylesheet.from_tree(XML(source.read()))
+        except (TypeError, ValueError): # openpyxl reads the workbook without its styles
+            raise XlsxUnsupported("Stylesheet openpyxl can not read")
+        self._dateStyles = stylesheet.date_formats
+        self._timeStyles = stylesheet.timedelta_formats
+        self._epoch = CALENDAR_MAC_1904 if self._date1904 else CALENDAR_WINDOWS_1900
+        self._fromExcel = from_excel
+
+    def _readHeader(self):
+        """
+        Reads the dimension and the header row
+        :return: dictionary of the value of each column of the header
+        """
+        header = {}
+        with self._zip.open(self._path) as source:
+            for event, element in iterparse(source):
+                if element.tag == XLSX_MAIN + "dimension":
+                    width, self.max_row = cellIndex(element.get("ref").split(":")[-1])
+                    self._width = width + 1
+                elif element.tag == XLSX_MAIN + "row":
+                    if element.get("r") is None:
+                        raise XlsxUnsupported("Rows without numbers")
+                    number = int(element.get("r"))
+                    if number == self.headerRow:
+                        column = -1
+                        for cell in element:
+                            column = self._column(cell, column)
+                            header[column] = self._value(cell)
+                    if number >= self.headerRow:
+                        break
+                    element.clear()
+        return header
+
+    def _openWorkbook(self):
+        """
+        Opens the workbook with openpyxl, everything after is read from it
+        :return: dictionary of the value of each column of the header
+        """
+        from openpyxl import load_workbook
+
+        if self._zip is not None:
+            self._zip.close()
+            self._zip = None
+        self._workbook = load_workbook(filename=self.fileName, read_only=True)
+        try:
+            self._sheet = self._workbook.worksheets[0] if self.sheetName is None else self._workbook[self.sheetName]
+        except KeyError:
+            self._workbook.close()
+            raise
+        self.max_row = self._sheet.max_row
+        self._width = self._sheet.max_column or 0
+        for row in self._sheet.iter_rows(min_row=self.headerRow, max_row=self.headerRow, values_only=True):
+            return {column: value for column, value in enumerate(row)}
+        return {}
+
+    def _rows(self, min_row, max_row):
+        """
+        Reads the rows from the XML, or from openpyxl from the first row with something XlsxSheet does not read
+        :param min_row: First row
+        :param max_row: Last row, the row after it is given too if it is in the file
+        :return: generator of the number and the selected values of each row in the file
+        """
+        done = min_row - 1
+        if self._workbook is None:
+            try:
+                for number, values in self._parse(min_row):
+                    yield number, values
+                    done = number
+                    if max_row is not None and number > max_row:
+                        return
+                return
+            except (XlsxUnsupported, ParseError): # a block cut inside a comment can not be parsed either
+                self._openWorkbook()
+        columns = self._columns
+        for number, row in enumerate(self._sheet.iter_rows(min_row=done + 1, max_row=max_row, values_only=True),
+                                     done + 1):
+            yield number, [row[column] if column is not None and column < len(row) else None for column in columns]
+
+    def _parse(self, min_row):
+        """
+        Streams the rows of the sheet XML a block at a time. Only the starts of the rows and the cells of the selected
+        columns are found in the text, the cells of the other columns are never parsed
+        :param min_row: First row
+        :return: generator of the number and the selected values of each row
+        """
+        positions = {columnName(column).encode(): places for column, places in self._positions.items()}
+        width = len(self._columns)
+        patterns = None
+        number = 0
+        for opening, prefix, text in self._blocks(self._path, "sheetData", "row"):
+            if patterns is None:
+                patterns = xlsxPatterns(prefix, sorted(positions, key=len, reverse=True))
+            cells = b"<" + prefix + b"c"
+            if text.count(cells) == text.count(cells + b' r="'): # every cell starts with its reference, as usual
+                pattern = patterns[0]
+            elif XLSX_UNNAMED_CELL.search(text) is None:
+                pattern = patterns[1]
+            else:
+                raise XlsxUnsupported("Cells without references")
+            values = None # of the row being read, None before the first row
+            for found in pattern.finditer(text):
+                if found.group(2) is None: # the start of a row, the row before it is done
+                    if values is not None:
+                        yield number, values
+                    row = XLSX_ROW_NUMBER.search(found.group(1))
+                    if row is None:
+                        raise XlsxUnsupported("Rows without numbers")
+                    number = int(row.group(1))
+                    values = [None] * width if number >= min_row else None
+                elif values is not None:
+                    value = self._cellValue(found, patterns[2], opening)
+                    for position in positions[found.group(2)]:
+                        values[position] = value
+            if values is not None:
+                yield number, values
+
+    def _cellValue(self, found, simplePattern, opening):
+        """
+        Reads the value of a cell found in the text, cells that are not a plain value or plain inline text are parsed
+        :param found: Match of the cell, its attributes and content are the groups 3 and 4
+        :param simplePattern: Pattern of a plain value or plain inline text
+        :param opening: Element declaring the namespaces of the sheet
+        :return: Value of the cell
+        """
+        content = found.group(4)
+        if content is None:
+            return None
+        simple = simplePattern.fullmatch(content)
+        if simple is None: # a formula, entities or formatted text
+            return self._value(XML(opening + found.group(0) + b"</blocks>")[0])
+        kind = XLSX_CELL_TYPE.search(found.group(3))
+        kind = "n" if kind is None else kind.group(1).decode("ascii")
+        if simple.group(1) is None:
+            return simple.group(2).decode("utf-8") if kind == "inlineStr" else None
+        style = XLSX_CELL_STYLE.search(found.group(3))
+        return self._convert(kind, simple.group(1).decode("utf-8"), None if style is None else style.group(1))
+
+    def _blocks(self, name, parent, child):
+        """
+        Cuts the children of an element of a part into blocks of XML, read a block at a time instead of an element at
+        a time like iterparse does. The namespaces of the part are declared again on the element opening each block
+        :param name: Part of the workbook
+        :param parent: Name of the element, sheetData or sst
+        :param child: Name of its children, row or si
+        :return: generator of the element opening a block, the prefix of the names and the text of each block
+        """
+        start = re.compile(rb"<([\w.-]+:)?" + parent.encode() + rb"\b[^>]*?(/?)>")
+        with self._zip.open(name) as source:
+            text = source.read(XLSX_BLOCK)
+            found = start.search(text)
+            while found is None:
+                block = source.read(XLSX_BLOCK)
+                if len(block) == 0:
+                    return # nothing to read, an empty part
+                text += block
+                found = start.search(text)
+            head = text[:found.end()]
+            encoding = XLSX_ENCODING.search(head[:100])
+            if encoding is not None and encoding.group(1).lower() not in (b"utf-8", b"utf8"):
+                raise XlsxUnsupported("XML encoded in " + encoding.group(1).decode("ascii"))
+            if found.group(2) == b"/":
+                return # an element without children
+            declarations = {}
+            for declaration in XLSX_NAMESPACE.finditer(head):
+                declarations.setdefault(declaration.group(2), declaration.group(1)) # the outermost one
+            opening = b"<blocks " + b" ".join(declarations.values()) + b">"
+            prefix = found.group(1) or b""
+            close = b"</" + prefix + child.encode() + b">"
+            end = b"</" + prefix + parent.encode() + b">"
+            text = text[found.end():]
+            while True:
+                done = text.find(end)
+                if done >= 0:
+                    yield opening, prefix, text[:done]
+                    return
+                cut = text.rfind(close)
+                if cut >= 0:
+                    cut += len(close)
+                    yield opening, prefix, text[:cut]
+                    text = text[cut:]
+                block = source.read(XLSX_BLOCK)
+                if len(block) == 0:
+                    raise XlsxUnsupported("Part ends before " + end.decode("ascii"))
+                text += block
+
+    def _column(self, cell, last):
+        """
+        Finds the column of a cell from its reference
+        :param cell: Cell element
+        :param last: Column of the cell before it, for cells without a reference
+        :return: Column from 0
+        """
+        ref = cell.get("r")
+        if ref is None:
+            return last + 1
+        letters = ref.rstrip("0123456789")
+        column = self._letters.get(letters)
+        if column is None:
+            column = self._letters[letters] = cellIndex(letters + "1")[0]
+        return column
+
+    def _value(self, cell):
+        """
+        Reads the value of a cell the way openpyxl does without data_only
+        :param cell: Cell element
+        :return: Value of the cell
+        """
+        kind = cell.get("t", "n")
+        formula = cell.find(XLSX_MAIN + "f")
+        if formula is not None:
+            if formula.get("t") is not None: # shared formulas are moved to each cell, array formulas are objects
+                raise XlsxUnsupported("Formula of type " + formula.get("t"))
+            return "=" + (formula.text or "")
+        if kind == "inlineStr":
+            text = cell.find(XLSX_MAIN + "is")
+            return None if text is None else xmlText(text)
+        return self._convert(kind, cell.findtext(XLSX_MAIN + "v"), cell.get("s"))
+
+    def _convert(self, kind, value, style):
+        """
+        Converts the text of a value the way openpyxl does
+        :param kind: Type of the cell, its t attribute
+        :param value: Text of the value
+        :param style: Style of the cell, its s attribute
+        :return: Value of the cell
+        """
+        if not value or kind == "inlineStr": # inline strings are only read from their text
+            return None
+        if kind == "n":
+            value = float(value) if "." in value or "E" in value or "e" in value else int(value)
+            if style is not None and int(style) in self._dateStyles:
+                try:
+                    return self._fromExcel(value, self._epoch, timedelta=int(style) in self._timeStyles)
+                except (OverflowError, ValueError): # openpyxl warns and reads it as an error
+                    raise XlsxUnsupported("Number too large for a date")
+            return value
+        if kind == "s":
+            return self._strings[int(value)]
+        if kind == "b":
+            return bool(int(value))
+        if kind == "str" or kind == "e":
+            return value
+        raise XlsxUnsupported("Cell of type " + kind)
+
+
+def cellIndex(ref):
+    """
+    Finds the column and row of a cell reference such as AB12
+    :param ref: Cell reference
+    :return: Column from 0, row from 1
+    """
+    letters = ref.rstrip("0123456789")
+    column = 0
+    for letter in letters.upper():
+        column = column * 26 + ord(letter) - ord("A") + 1
+    return column - 1, int(ref[len(letters):])
+
+
+def columnName(column):
+    """
+    Finds the letters of a column
+    :param column: Column from 0
+    :return: Letters of the column, such as AB
+    """
+    name = ""
+    column += 1
+    while column > 0:
+        column, letter = divmod(column - 1, 26)
+        name = chr(ord("A") + letter) + name
+    return name
+
+
+def xlsxPatterns(prefix, names):
+    """
+    Makes the patterns XlsxSheet finds the starts of rows and the cells of columns with in the sheet XML
+    :param prefix: Prefix of the element names, b"" for the default namespace
+    :param names: Letters of the columns to find, longest first
+    :return: Pattern for cells starting with their reference, for cells with it anywhere, and for plain content
+    """
+    row = rb"<" + prefix + rb"row\b([^>]*)>"
+    content = rb"([^>]*?)(?:/>|>([^<]*(?:<(?!/" + prefix + rb"c>)[^<]*)*)</" + prefix + rb"c>)"
+    if len(names) == 0:
+        patterns = [re.compile(row + rb"()"), re.compile(row + rb"()")] # no cells to find
+    else:
+        columns = rb"(" + b"|".join(names) + rb")\d+"
+        patterns = [re.compile(row + rb"|<" + prefix + rb'c r="' + columns + b'"' + content),
+                    re.compile(row + rb"|<" + prefix + rb"c(?=[^>]*?\sr\s*=\s*[\"']" + columns + rb"[\"'])" + content)]
+    patterns.append(re.compile(rb"<" + prefix + rb"v>([^<&]*)</" + prefix + rb"v>|<" + prefix + rb"is><" + prefix +
+                               rb"t(?:\s[^>]*)?>([^<&]*)</" + prefix + rb"t></" + prefix + rb"is>"))
+    return patterns
+
+
+def xmlText(element):
+    """
+    Joins the text of a string element, its plain text then the text of its formatted runs, phonetic runs are left out
+    :param element: Element of a shared or inline string
+    :return: Text of the string
+    """
+    parts = []
+    for child in element:
+        if child.tag == XLSX_MAIN + "t":
+            parts.append(child.text or "")
+        elif child.tag == XLSX_MAIN + "r":
+            parts.append(child.findtext(XLSX_MAIN + "t") or "")
+    return "".join(parts)
+
+def xmlEscape(text, attribute=False):
+    """
+    Escapes text to be written in XML, characters XML cannot hold (control characters) are left out
+    :param text: Text to write
+    :param attribute: Escape quotes as well, for the value of an attribute
+    :return: Escaped text
+    """
+    if XML_SPECIAL.search(text) is None: # most text has nothing to escape
+        return text
+    text = XML_ILLEGAL.sub("", text).replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+    return text.replace('"', "&quot;") if attribute else text
+
+
+# inner class for writing an xlsx workbook straight as XML in place of an openpyxl write-only workbook, write and
+# debugWrite only need create_sheet, append, save and close. Each sheet is written into the zip as its rows are appended,
+# strings inline in their cells like openpyxl writes them, so only the rows not written yet are kept in memory. The
+# workbook is written to a temporary file that replaces the file once saved
+class XlsxWriter:
+    def __init__(self, fileName):
+        self._fileName = fileName
+        self._zip = zipfile.ZipFile(fileName + ".tmp", "w", zipfile.ZIP_DEFLATED, compresslevel=XLSX_COMPRESSION)
+        self._sheets = [] # title and part of each sheet, in the order of the workbook
+        self._sheet = None # XlsxSheetWriter being written, only one part of a zip can be written at a time
+
+    def create_sheet(self, title, index=None):
+        """
+        Starts a new sheet, the sheet written before it can no longer be appended to
+        :param title: Name of the sheet
+        :param index: Position of the sheet in the workbook, the last if None
+        :return: XlsxSheetWriter
+        """
+        if self._sheet is not None:
+            self._sheet.close()
+        part = "xl/worksheets/sheet" + str(len(self._sheets) + 1) + ".xml"
+        self._sheets.insert(len(self._sheets) if index is None else index, (title, part))
+        self._sheet = XlsxSheetWriter(self._zip.open(part, "w", force_zip64=True))
+        return self._sheet
+
+    def save(self, filename=None):
+        """
+        Writes the parts of the workbook around its sheets and replaces the file
+        :param filename: Ignored, the file is the one given when the workbook was made
+        """
+        if self._sheet is not None:
+            self._sheet.close()
+        sheets = ""
+        relations = ""
+        types = ""
+        for number, (title, part) in enumerate(self._sheets, 1):
+            sheets += '<sheet name="%s" sheetId="%d" r:id="rId%d"/>' % (xmlEscape(title, True), number, number)
+            relations += '<Relationship Id="rId%d" Type="%s" Target="%s"/>' % (
+                number, XLSX_RELATION[1:-1] + "/worksheet", part[len("xl/"):])
+            types += '<Override PartName="/%s" ContentType="%s"/>' % (part, XLSX_SHEET_TYPE)
+        relations += '<Relationship Id="rId%d" Type="%s" Target="styles.xml"/>' % (
+            len(self._sheets) + 1, XLSX_RELATION[1:-1] + "/styles")
+        for name, text in XLSX_PARTS.items():
+            self._zip.writestr(name, text.format(sheets=sheets, relations=relations, types=types))
+        self._zip.close()
+        os.replace(self._fileName + ".tmp", self._fileName)
+
+    def close(self):
+        """
+        Removes the temporary file of a workbook that was not saved, such as a scan cancelled
+        """
+        if self._zip.fp is not None:
+            if self._sheet is not None:
+                self._sheet.close()
+            self._zip.close()
+            os.remove(self._fileName + ".tmp")
+
+
+# inner class for a sheet of an XlsxWriter, rows are kept until XLSX_WRITE_ROWS of them are written at once
+class XlsxSheetWriter:
+    def __init__(self, stream):
+        self._stream = stream
+        self._rows = 0
+        self._pending = [] # XML of the rows not written yet
+        self._refs = [] # letters of each column
+        stream.write(XLSX_SHEET_START)
+
+    def append(self, values):
+        """
+        Adds a row below the last, cells of None are left out and empty strings have no value like openpyxl writes
+        :param values: Values of the row, strings, numbers or booleans
+        """
+        self._rows += 1
+        number = str(self._rows)
+        while len(self._refs) < len(values):
+            self._refs.append(columnName(len(self._refs)))
+        cells = []
+        for letters, value in zip(self._refs, values):
+            if value is None:
+                continue
+            if value == "":
+                cells.append('<c r="%s%s" t="inlineStr"/>' % (letters, number))
+            elif isinstance(value, str):
+                cells.append('<c r="%s%s" t="inlineStr"><is><t xml:space="preserve">%s</t></is></c>' % (
+                    letters, number, xmlEscape(value)))
+            elif isinstance(value, bool):
+                cells.append('<c r="%s%s" t="b"><v>%d</v></c>' % (letters, number, value))
+            else:
+                cells.append('<c r="%s%s"><v>%r</v></c>' % (letters, number, value))
+        self._pending.append('<row r="%s">%s</row>' % (number, "".join(cells)))
+        if len(self._pending) >= XLSX_WRITE_ROWS:
+            self._write()
+
+    def _write(self):
+        # a character that cannot be written (a lone surrogate from a broken file) is written as ?
+        self._stream.write("".join(self._pending).encode("utf-8", "replace"))
+        self._pending = []
+
+    def close(self):
+        if self._stream is None:
+            return
+        self._write()
+        self._stream.write(XLSX_SHEET_END)
+        self._stream.close()
+        self._stream = None
+
+
+# inner class for counting the flags of the addresses written and the time of each stage, flags are counted by
+# bitmask so each row only adds to the categories it has flags in, names are found once per bitmask
+class FlagStats:
+    def __init__(self):
+        self._rows = 0
+        self._valid = 0 # rows without flags
+        self._unchanged = 0 # written as "Invalid, Thus Unchanged"
+        self._masks = [{}, {}, {}, {}, {}] # rows with each bitmask, in the order of FLAG_CATEGORIES
+        self._times = OrderedDict() # seconds of each stage
+        self._mark = timer() # end of the last stage
+
+    def add(self, flag, unchanged=False):
+        """
+        Counts the flags of an address
+        :param flag: Flag of the address
+        :param unchanged: The address was written unchanged
+        """
+        self._rows += 1
+        if unchanged:
+            self._unchanged += 1
+        flagged = False
+        i = 0
+        for mask in flag.masks:
+            if mask:
+                counts = self._masks[i]
+                counts[mask] = counts.get(mask, 0) + 1
+                flagged = True
+            i += 1
+        if not flagged:
+            self._valid += 1
+
+    def addTime(self, stage, seconds):
+        """
+        Adds time measured by the caller to a stage, the next stage starts now
+        :param stage: Name of the stage
+        :param seconds: Time to add
+        """
+        self._times[stage] = self._times.get(stage, 0) + seconds
+        self._mark = timer()
+
+    def lap(self, stage):
+        """
+        Adds the time since the end of the last stage to a stage
+        :param stage: Name of the stage that just ended
+        """
+        now = timer()
+        self._times[stage] = self._times.get(stage, 0) + now - self._mark
+        self._mark = now
+
+    @property
+    def rows(self):
+        return self._rows
+
+    @property
+    def unchanged(self):
+        return self._unchanged
+
+    @property
+    def times(self):
+        return self._times
+
+    @property
+    def valid(self):
+        return self._valid
+
+    def counts(self):
+        """
+        Counts the rows with each flag
+        :return: list of (category, flag, rows) in the order of the categories then of the flag codes
+        """
+        found = []
+        for category, masks in zip(FLAG_CATEGORIES, self._masks):
+            rows = {}
+            for mask, count in masks.items():
+                for flag in flagNames(mask):
+                    rows[flag] = rows.get(flag, 0) + count
+            for flag in FLAG_NAMES:
+                if flag in rows:
+                    found.append((category, flag, rows[flag]))
+        return found
+
+    def summaryRows(self):
+        """
+        Rows of the summary sheet
+        :return: list of rows
+        """
+        rows = [["Rows", self._rows], ["Valid", self._valid], ["Invalid, Thus Unchanged", self._unchanged], [],
+                ["Category", "Flag", "Rows"]]
+        for category, flag, count in self.counts():
+            rows.append([category, flag, count])
+        rows += [[], ["Stage", "Seconds"]]
+        for stage, seconds in self._times.items():
+            rows.append([stage, round(seconds, 3)])
+        rows.append(["Total", round(sum(self._times.values()), 3)])
+        return rows
+
+
+# inner class for the time and calls of each stage of cleaning while profiling, the time of a stage does not include
+# the stages it calls, so assignment is the time structureAddress spends outside of tokenizing and factor scoring
+class StageTimer:
+    def __init__(self):
+        self._seconds = OrderedDict() # seconds of each stage, in the order of PROFILED_STAGES
+        self._calls = OrderedDict()
+        for stage, names in PROFILED_STAGES:
+            self._seconds[stage] = 0
+            self._calls[stage] = 0
+        self._inner = [] # seconds of the stages called by each stage still running
+        self._parallel = False # stages of cleaning were timed in several processes and added together
+        self._cProfile = None
+        self._profileFile = None
+
+    def __getstate__(self): # sent back by processes of scanParallel, without their cProfile
+        return {"_seconds": self._seconds, "_calls": self._calls}
+
+    def __setstate__(self, state):
+        self.__init__()
+        self.__dict__.update(state)
+
+    def timed(self, stage, function):
+        """
+        Makes a version of a function that adds its time and calls to a stage
+        :param stage: Name of the stage
+        :param function: Function to time
+        :return: The timed function
+        """
+        seconds = self._seconds
+        calls = self._calls
+        inner = self._inner
+
+        def timedFunction(*args, **kwargs):
+            inner.append(0)
+            start = timer()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                took = timer() - start
+                seconds[stage] += took - inner.pop()
+                calls[stage] += 1
+                if len(inner) > 0:
+                    inner[-1] += took
+        timedFunction.__wrapped__ = function
+        return timedFunction
+
+    def reset(self):
+        for stage in self._seconds:
+            self._seconds[stage] = 0
+            self._calls[stage] = 0
+
+    def merge(self, chunk):
+        """
+        Adds the stages of a chunk cleaned by another process
+        :param chunk: Addresses of the chunk, StageTimer of the chunk
+        :return: Addresses of the chunk
+        """
+        addresses, stages = chunk
+        for stage, seconds in stages._seconds.items():
+            self._seconds[stage] += seconds
+            self._calls[stage] += stages._calls[stage]
+        self._parallel = True
+        return addresses
+
+    def startCProfile(self, profileFile):
+        """
+        Profiles every function called by this thread until stopCProfile
+        :param profileFile: File to save the stats to
+        """
+        import cProfile
+
+        self._cProfile = cProfile.Profile()
+        self._profileFile = profileFile
+        self._cProfile.enable()
+
+    def stopCProfile(self, save=True):
+        """
+        Stops cProfile if it was started
+        :param save: Save the stats to the file given to startCProfile
+        """
+        if self._cProfile is not None:
+            self._cProfile.disable()
+            if save:
+                self._cProfile.dump_stats(self._profileFile)
+            self._cProfile = None
+
+    @property
+    def profileFile(self):
+        return self._profileFile
+
+    def breakdown(self, stats):
+        """
+        Time and calls of every stage of a run, the stages of the run followed by the stages of cleaning
+        :param stats: FlagStats of the run
+        :return: list of (stage, seconds, calls), calls is None for the stages of the run
+        """
+        stages = [(stage, seconds, None) for stage, seconds in stats.times.items()]
+        for stage, seconds in self._seconds.items():
+            stages.append((stage, seconds, self._calls[stage]))
+        return stages
+
+    def text(self, stats):
+        """
+        Lines showing the breakdown of a run
+        :param stats: FlagStats of the run
+        :return: The lines joined
+        """
+        lines = ["{:<23} {:>10} {:>10}".format("Stage", "Seconds", "Calls")]
+        for stage, seconds, calls in self.breakdown(stats):
+            if calls is None:
+                lines.append("{:<23} {:>10.2f}".format(stage, seconds))
+            else:
+                lines.append("  {:<21} {:>10.2f} {:>10}".format(stage, seconds, calls))
+        if self._parallel:
+            lines.append("(stages of cleaning are added together over the processes)")
+        return "\n".join(lines)
+
+    def save(self, fileName, stats):
+        """
+        Saves the breakdown of a run as JSON, to compare runs across releases
+        :param fileName: JSON file
+        :param stats: FlagStats of the run
+        """
+        with open(fileName, "w") as jsonFile:
+            json.dump({"rows": stats.rows, "seconds": sum(stats.times.values()), "parallel": self._parallel,
+                       "profile": self._profileFile,
+                       "stages": [{"stage": stage, "seconds": seconds, "calls": calls}
+                                  for stage, seconds, calls in self.breakdown(stats)]}, jsonFile, indent=2)
+
+
+# inner class for the cleaned addresses of a run, saved beside its output so the next run of the same file only cleans
+# the rows that changed. Rows are found by a fingerprint of AddressLine1, AddressLine2 and Province, and nothing is
+# reused when the rules were different
+class RowStore:
+    def __init__(self, fileName):
+        self._fileName = fileName
+        self._rulesHash = rulesFingerprint()
+        self._previous = {} # state of the address of each fingerprint saved by the last run, see Address.__getstate__
+        self._rows = {} # state of the address of each fingerprint of this run, saved for the next run
+        self._reused = 0
+        self._cleaned = 0
+        self._cleanTime = 0
+        self._lastRowTime = 0 # seconds to clean a row in the last run that cleaned most of its rows
+        self._rulesChanged = False
+
+        try: # only plain values, unlike pickle loading a file put beside the sheet cannot run anything
+            with open(fileName, "rb") as storeFile:
+                saved = marshal.loads(storeFile.read())
+        except Exception: # missing, or written by another version of the program
+            return
+        if not isinstance(saved, dict) or not isinstance(saved.get("rows"), dict):
+            return
+        if saved.get("version") != ROW_STORE_VERSION or saved.get("rules") != self._rulesHash:
+            self._rulesChanged = True
+            return
+        self._previous = saved["rows"]
+        self._lastRowTime = saved["rowTime"]
+
+    @staticmethod
+    def fingerprint(line1, line2, prov):
+        """
+        Fingerprint of a row, from the same values structureAddress reads
+        :return: 16 byte digest
+        """
+        text = "\x1f".join([str(line1), str(line2), str(prov)])
+        return hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+
+    def get(self, key):
+        """
+        Finds the address of a row that was cleaned in the last run
+        :param key: Fingerprint of the row
+        :return: Address object, or None if the row is new or changed
+        """
+        state = self._previous.get(key)
+        if state is None:
+            return None
+        self._reused += 1
+        self._rows[key] = state
+        address = Address.__new__(Address)
+        address.__setstate__(state)
+        return address
+
+    def put(self, key, address):
+        self._rows[key] = address.__getstate__() # addresses are changed after scanning, the state is not
+
+    def cleanRow(self, scanCol, scanColB, provCol, row):
+        """
+        Same as cleanRow, but the address is taken from the last run if the row did not change
+        :return: Address object
+        """
+        key = self.fingerprint(row[scanCol].value, row[scanColB].value, row[provCol].value)
+        address = self.get(key)
+        if address is None:
+            start = timer()
+            address = cleanRow(scanCol, scanColB, provCol, row)
+            self._cleanTime += timer() - start
+            self._cleaned += 1
+            self.put(key, address)
+        return address
+
+    def cleanValues(self, values, workers=None, chunkSize=2000, dedup=False, progress=None):
+        """
+        Same as cleanValues, but only the rows that are new or changed are sent to the processes
+        :return: all addresses, in the order of the rows
+        """
+        keys = []
+        found = []
+        changed = []
+        for line1, line2, prov in values:
+            key = self.fingerprint(line1, line2, prov)
+            address = self.get(key)
+            keys.append(key)
+            found.append(address)
+            if address is None:
+                changed.append((line1, line2, prov))
+
+        reused = len(found) - len(changed)
+        start = timer()
+        cleaned = iter(cleanValues(changed, workers, chunkSize, dedup,
+                                   None if progress is None else lambda done: progress(reused + done)))
+        self._cleanTime += timer() - start
+        self._cleaned += len(changed)
+
+        addresses = []
+        for key, address in zip(keys, found):
+            if address is None:
+                address = next(cleaned)
+                self.put(key, address)
+            addresses.append(address)
+        return addresses
+
+    def save(self):
+        """
+        Saves the addresses of this run for the next run, rows that are no longer in the file are dropped
+        """
+        try:
+            with open(self._fileName + ".tmp", "wb") as storeFile:
+                storeFile.write(marshal.dumps({"version": ROW_STORE_VERSION, "rules": self._rulesHash,
+                                               "rowTime": self.rowTime, "rows": self._rows}))
+            os.replace(self._fileName + ".tmp", self._fileName) # the last store is kept if saving fails
+        except OSError: # the folder can be read only, every row is cleaned again next time
+            pass
+
+    @property
+    def fileName(self):
+        return self._fileName
+
+    @property
+    def reused(self):
+        return self._reused
+
+    @property
+    def cleaned(self):
+        return self._cleaned
+
+    @property
+    def rowTime(self):
+        # the few rows cleaned in a run that reuses most rows are slower than usual, their words are not cached yet
+        if self._cleaned > 0 and (self._cleaned >= self._reused or self._lastRowTime == 0):
+            return self._cleanTime / self._cleaned
+        return self._lastRowTime
+
+    @property
+    def savedTime(self):
+        return self._reused * self.rowTime
+
+    def summary(self):
+        """
+        Describes what was reused
+        :return: A sentence for the user
+        """
+        if self._rulesChanged:
+            return "The rules changed since the last run, all {} rows were cleaned again".format(self._cleaned)
+        return "{} of {} rows were reused from the last run, {} were new or changed, saved about {:.2f} seconds".format(
+            self._reused, self._reused + self._cleaned, self._cleaned, self.savedTime)
+
+
+# inner class for the rows of the last file scanned, found by the words given profiles while cleaning them. A change to
+# the rules only changes rows with words whose factors change, so a preview only cleans those rows again
+class RuleIndex:
+    def __init__(self):
+        self._rules = compiledRules # rules the rows were cleaned with
+        self._rowIds = {} # row id of each distinct AddressLine1, AddressLine2 and Province
+        self._values = [] # values of each row id
+        self._before = [] # row written and flags of each row id, with the rules the rows were cleaned with
+        self._words = {} # row ids of each word
+        self._unindexed = [] # row ids cleaned without their words recorded, found by the first preview
+
+    def watch(self, clean, store=None):
+        """
+        Makes a version of a cleaning function that adds each row it cleans to the index
+        :param clean: cleanRow, or the cleanRow of a RowStore
+        :param store: RowStore of clean, rows it reuses are cleaned without recording their words
+        :return: Function with the arguments of cleanRow
+        """
+        def indexedRow(scanCol, scanColB, provCol, row):
+            reused = 0 if store is None else store.reused
+            address, words = recordWords(clean, scanCol, scanColB, provCol, row)
+            self._add((row[scanCol].value, row[scanColB].value, row[provCol].value), address,
+                      None if store is not None and store.reused != reused else words)
+            return address
+        return indexedRow
+
+    def addRows(self, values, addresses):
+        """
+        Adds rows cleaned by other processes, their words are found by the first preview
+        :param values: (AddressLine1, AddressLine2, Province) of each row
+        :param addresses: Address object of each row
+        """
+        for rowValues, address in zip(values, addresses):
+            self._add(rowValues, address, None)
+
+    def _add(self, values, address, words):
+        key = (str(values[0]), str(values[1]), values[2]) # the same values structureAddress reads from the row
+        if key in self._rowIds:
+            return
+        rowId = len(self._values)
+        self._rowIds[key] = rowId
+        self._values.append(tuple(values))
+        self._before.append(self.written(address))
+        if words is None:
+            self._unindexed.append(rowId)
+        else:
+            self._addWords(rowId, words)
+
+    def _addWords(self, rowId, words):
+        for word in words:
+            rowIds = self._words.get(word)
+            if rowIds is None:
+                self._words[word] = rowIds = []
+            rowIds.append(rowId)
+
+    @staticmethod
+    def written(address):
+        return tuple(cleanedRow(address)) + (str(address.flag),)
+
+    def __len__(self):
+        return len(self._values)
+
+    def affectedWords(self):
+        """
+        Finds the words that are given other factors by the rules in use than by the rules the rows were cleaned with.
+        Words are only scored when they have letters of a suffix rule that changed, or are made of the letters of an
+        external info rule that changed and start with its first letter, as other words score the same
+        :return: list of the words
+        """
+        before = self._rules
+        after = compiledRules
+        changedSuffixes = {suffix for suffix in set(before.suffixes) | set(after.suffixes)
+                           if before.suffixes.get(suffix) != after.suffixes.get(suffix)}
+        changedShort = {suffix for suffix in set(before.shortStreets) | set(after.shortStreets)
+                        if before.shortStreets.get(suffix) != after.shortStreets.get(suffix)}
+        changedExtras = set(before.extras) ^ set(after.extras)
+        suffixLetters = set("".join(changedSuffixes | changedShort))
+        extraLetters = [(extra, frozenset(extra)) for extra in changedExtras if len(extra) > 0]
+
+        # every word is scored when ties between the suffixes are broken in another order, when a suffix that changed
+        # can score without sharing letters with a word, or when there were or are no external info rules
+        kept = [suffix for suffix in before.suffixes if suffix in after.suffixes]
+        everySuffix = kept != [suffix for suffix in after.suffixes if suffix in before.suffixes] or any(
+            max(rules.suffixes[suffix], default=0) <= 0 for rules in (before, after) for suffix in changedSuffixes
+            if suffix in rules.suffixes)
+        everyExtra = len(changedExtras) > 0 and (len(before.extras) == 0 or len(after.extras) == 0)
+
+        affected = []
+        for word in self._words:
+            plain = removeSymbols(word)
+            if len(changedSuffixes) + len(changedShort) > 0 and (everySuffix or not suffixLetters.isdisjoint(plain)):
+                old = calcSuffixFactor(word, before.suffixIndex)
+                new = calcSuffixFactor(word, after.suffixIndex)
+                if old != new or old[1] in changedShort or new[1] in changedShort:
+                    affected.append(word)
+                    continue
+            if len(changedExtras) > 0 and len(plain) > 0 and (everyExtra or any(
+                    plain[0] == extra[0] and letters.issuperset(plain) for extra, letters in extraLetters)):
+                if scoreExtFactor(word, before) != scoreExtFactor(word, after):
+                    affected.append(word)
+        return affected
+
+    def preview(self):
+        """
+        Cleans the rows with words affected by the changes to the rules since the rows were cleaned
+        :return: list of (values, row written before, row written now) of the rows that change, number of rows
+        cleaned again, seconds taken
+        """
+        start = timer()
+        for rowId in self._unindexed:
+            line1, line2, prov = self._values[rowId]
+            address, words = recordWords(cleanRow, 0, 1, 2, (ValueCell(line1), ValueCell(line2), ValueCell(prov)))
+            self._addWords(rowId, words)
+        self._unindexed = []
+
+        rowIds = set()
+        for word in self.affectedWords():
+            rowIds.update(self._words[word])
+        changes = []
+        for rowId in sorted(rowIds):
+            line1, line2, prov = self._values[rowId]
+            after = self.written(cleanRow(0, 1, 2, (ValueCell(line1), ValueCell(line2), ValueCell(prov))))
+            if after != self._before[rowId]:
+                changes.append((self._values[rowId], self._before[rowId], after))
+        return changes, len(rowIds), timer() - start
+
+
+# inner class for the results of a scan kept in memory to be browsed, each key (a flag of a category, the province, the
+# language or the suffix) has a bitmap of the rows with it, so a filter is an AND of a few bitmaps however many rows
+class ResultIndex:
+    def __init__(self):
+        self._addresses = [] # Address of each row, in the order written
+        self._bits = {} # bitmap of the rows of each key as a bytearray, grown as rows are added
+        self._keys = {} # keys of each (flag masks, province, french, altSuffix) seen
+        self._bitmaps = {} # bitmap of each key as an int, made when first queried
+        self._bitmapRows = 0 # rows when the int bitmaps were made
+        self._queries = LRUCache(32) # QueryResult of each filter
+
+    def add(self, address):
+        """
+        Adds an address as the next row
+        :param address: Address object
+        """
+        masks = address.flag.masks
+        signature = (masks, address.province, address.french, address.altSuffix)
+        keys = self._keys.get(signature)
+        if keys is None:
+            keys = self.rowKeys(*signature)
+            self._keys[signature] = keys
+        rowId = len(self._addresses)
+        self._addresses.append(address)
+        byte = rowId >> 3
+        bit = 1 << (rowId & 7)
+        for key in keys:
+            bits = self._bits.get(key)
+            if bits is None:
+                self._bits[key] = bits = bytearray()
+            if len(bits) <= byte: # doubled, so growing is not done for every row
+                bits.extend(bytes(max(byte + 1 - len(bits), len(bits), 64)))
+            bits[byte] |= bit
+
+    @staticmethod
+    def rowKeys(masks, province, french, altSuffix):
+        """
+        Keys of a row
+        :param masks: Flag bitmasks of the address, in the order of FLAG_CATEGORIES
+        :return: tuple of keys
+        """
+        keys = []
+        for category, mask in zip(FLAG_CATEGORIES, masks):
+            if mask:
+                keys.append(("category", category))
+                for flag in flagNames(mask):
+                    keys.append(("flag", category, flag))
+        if len(keys) == 0:
+            keys.append(("valid",))
+        keys += [("province", province), ("french", french), ("suffix", altSuffix)]
+        return tuple(keys)
+
+    def __len__(self):
+        return len(self._addresses)
+
+    def choices(self, kind):
+        """
+        Values found of a kind of key, to choose from in a filter
+        :param kind: "flag", "province" or "suffix"
+        :return: Sorted list of the values
+        """
+        return sorted({key[-1] for key in self._bits if key[0] == kind})
+
+    def _bitmap(self, key):
+        bitmap = self._bitmaps.get(key)
+        if bitmap is None:
+            bits = self._bits.get(key)
+            bitmap = 0 if bits is None else int.from_bytes(bits, "little")
+            self._bitmaps[key] = bitmap
+        return bitmap
+
+    def query(self, category=None, flag=None, province=None, french=None, suffix=None):
+        """
+        Finds the rows matching a filter, a value of None matches every row
+        :param category: Category of FLAG_CATEGORIES, for the rows with a flag in it
+        :param flag: Flag name, flagged in the category if one is given, or "VALID" for the rows without flags
+        :param province: Province of the row
+        :param french: True for french addresses, False for english
+        :param suffix: Suffix assigned (altSuffix), "" for none
+        :return: QueryResult
+        """
+        if self._bitmapRows != len(self._addresses): # rows were added since the bitmaps were made
+            self._bitmaps.clear()
+            self._queries.clear()
+            self._bitmapRows = len(self._addresses)
+        filters = (category, flag, province, french, suffix)
+        found = self._queries.get(filters)
+        if found is None:
+            bitmap = (1 << len(self._addresses)) - 1
+            if flag == "VALID":
+                bitmap &= self._bitmap(("valid",)) if category is None else ~self._bitmap(("category", category))
+            elif flag is not None and category is not None:
+                bitmap &= self._bitmap(("flag", category, flag))
+            elif flag is not None:
+                flagged = 0
+                for name in FLAG_CATEGORIES:
+                    flagged |= self._bitmap(("flag", name, flag))
+                bitmap &= flagged
+            elif category is not None:
+                bitmap &= self._bitmap(("category", category))
+            for kind, value in (("province", province), ("french", french), ("suffix", suffix)):
+                if value is not None:
+                    bitmap &= self._bitmap((kind, value))
+            found = QueryResult(bitmap)
+            self._queries.put(filters, found)
+        return found
+
+    def page(self, found, number, size=None):
+        """
+        Rows shown for a page of a query, only the addresses of the page are written out
+        :param found: QueryResult of the query
+        :param number: Page number, from 0
+        :param size: Rows of a page, RESULT_PAGE_ROWS if not given
+        :return: list of [row in the cleaned file, province, AddressLine1, AddressLine2, suffix, flags]
+        """
+        if size is None:
+            size = RESULT_PAGE_ROWS
+        rows = []
+        for rowId in found.rowIds(number * size, (number + 1) * size):
+            address = self._addresses[rowId]
+            written = cleanedRow(address)
+            rows.append([rowId + 2, address.province, written[0], written[1], address.altSuffix, str(address.flag)])
+        return rows
+
+
+# inner class for the rows found by ResultIndex.query as a bitmap, the rows in each block of the bitmap are counted
+# once so a page is found by skipping whole blocks, then only reading the bytes of the block it starts in
+class QueryResult:
+    def __init__(self, bitmap):
+        self._data = bitmap.to_bytes((bitmap.bit_length() + 7) // 8, "little")
+        self._starts = [] # rows found before each block of RESULT_BLOCK bytes
+        count = 0
+        for i in range(0, len(self._data), RESULT_BLOCK):
+            self._starts.append(count)
+            count += bin(int.from_bytes(self._data[i:i + RESULT_BLOCK], "little")).count("1")
+        self._count = count
+
+    def __len__(self):
+        return self._count
+
+    def rowIds(self, start, stop):
+        """
+        Finds the rows from one position in the results to another
+        :param start: Position of the first row
+        :param stop: Position after the last row
+        :return: list of row ids
+        """
+        rowIds = []
+        start = max(start, 0)
+        if start >= min(stop, self._count):
+            return rowIds
+        block = bisect_right(self._starts, start) - 1
+        found = self._starts[block]
+        data = self._data
+        for byte in range(block * RESULT_BLOCK, len(data)):
+            value = data[byte]
+            if found + BYTE_BITS[value] <= start: # every row of the byte is before the start
+                found += BYTE_BITS[value]
+                continue
+            while value:
+                low = value & -value
+                if found >= start:
+                    rowIds.append(byte * 8 + low.bit_length() - 1)
+                    if found + 1 == stop:
+                        return rowIds
+                found += 1
+                value ^= low
+        return rowIds
+
+
+# inner class for the cleaned addresses of a run saved to a SQLite database, for sheets too big for excel and for other
+# programs to query. Rows are inserted in batches of RESULT_STORE_ROWS, one transaction each, into a temporary file that
+# replaces the database once every row is in, and the indexes are only made then, faster than updating them every row
+class ResultStore:
+    def __init__(self, fileName):
+        import sqlite3
+
+        self._fileName = fileName
+        self._rows = 0
+        self._pending = [] # values of the addresses not inserted yet
+        self._pendingFlags = [] # (row, category, flag) of each flag of the addresses not inserted yet
+        self._flags = {} # flag columns and flags of each set of flag masks
+        self._encode = json.JSONEncoder(ensure_ascii=False).encode # the original words, as a JSON list
+        if os.path.isfile(fileName + ".tmp"): # left by a run that was stopped
+            os.remove(fileName + ".tmp")
+        self._db = sqlite3.connect(fileName + ".tmp")
+        self._db.execute("PRAGMA journal_mode = OFF") # nothing to roll back to, the file is only used once complete
+        self._db.execute("PRAGMA synchronous = OFF")
+        self._db.execute("PRAGMA user_version = " + str(RESULT_STORE_VERSION))
+        self._db.execute("CREATE TABLE addresses (rowNumber INTEGER PRIMARY KEY, " + ", ".join(
+            name + " " + kind for name, kind in RESULT_STORE_COLUMNS[1:]) + ")")
+        self._db.execute("CREATE TABLE flags (rowNumber INTEGER, category TEXT, flag TEXT)")
+        self._db.execute("CREATE TABLE summary (name TEXT, value)")
+        self._insertAddress = "INSERT INTO addresses VALUES (" + ", ".join("?" * len(RESULT_STORE_COLUMNS)) + ")"
+
+    def add(self, address):
+        """
+        Adds an address as the next row, like ResultIndex.add
+        :param address: Address object
+        """
+        masks = address.flag.masks
+        flags = self._flags.get(masks)
+        if flags is None:
+            flags = (tuple(" ".join(flagState(mask)) for mask in masks),
+                     tuple((category, flag) for category, mask in zip(FLAG_CATEGORIES, masks) for flag in flagState(mask)))
+            self._flags[masks] = flags
+        rowNumber = self._rows + 2 # row of the cleaned file, below its header
+        self._rows += 1
+        written = cleanedRow(address)
+        self._pending.append((rowNumber, written[0], written[1], len(written) == 3,
+                              self._encode(address.original), address.number, address.street,
+                              address.suffix, address.altSuffix, address.direction, address.suffixNumber,
+                              address.extra, address.french, address.external, address.ordinal, address.po,
+                              address.province) + flags[0])
+        for category, flag in flags[1]:
+            self._pendingFlags.append((rowNumber, category, flag))
+        if len(self._pending) >= RESULT_STORE_ROWS:
+            self._insert()
+
+    def _insert(self):
+        with self._db: # one transaction for the batch
+            self._db.executemany(self._insertAddress, self._pending)
+            self._db.executemany("INSERT INTO flags VALUES (?, ?, ?)", self._pendingFlags)
+        self._pending = []
+        self._pendingFlags = []
+
+    def save(self, stats=None):
+        """
+        Inserts the last rows, makes the indexes and replaces the database with the rows of this run
+        :param stats: FlagStats of the run, saved to the summary table, or None
+        """
+        self._insert()
+        with self._db:
+            if stats is not None:
+                self._db.executemany("INSERT INTO summary VALUES (?, ?)", [
+                    ("Rows", stats.rows), ("Valid", stats.valid), ("Invalid, Thus Unchanged", stats.unchanged)] + [
+                    (stage + " seconds", seconds) for stage, seconds in stats.times.items()])
+            for statement in RESULT_STORE_INDEXES:
+                self._db.execute(statement)
+        self._db.close()
+        os.replace(self._fileName + ".tmp", self._fileName)
+
+    def discard(self):
+        """
+        Leaves the database as it was, for a scan cancelled or failed
+        """
+        self._db.close()
+        os.remove(self._fileName + ".tmp")
+
+    @property
+    def fileName(self):
+        return self._fileName
+
+    def __len__(self):
+        return self._rows
+
+    @staticmethod
+    def read(fileName, category=None, flag=None, province=None):
+        """
+        Reads the addresses saved to a database, in the order of their rows, so they can be written again without
+        cleaning them. The filters are those of ResultIndex.query and are found with the indexes
+        :param fileName: Database saved by ResultStore
+        :param category: Category of FLAG_CATEGORIES, for the rows with a flag in it
+        :param flag: Flag name, flagged in the category if one is given, or "VALID" for the rows without flags
+        :param province: Province of the row
+        :return: generator of Address objects
+        """
+        import sqlite3
+
+        if not os.path.isfile(fileName): # connect would make an empty database
+            raise FileNotFoundError(fileName + " does not exist")
+        db = sqlite3.connect(fileName)
+        try:
+            if db.execute("PRAGMA user_version").fetchone()[0] != RESULT_STORE_VERSION:
+                raise ValueError(fileName + " was not saved by this version of the program")
+            conditions = []
+            values = []
+            if flag == "VALID":
+                for name in FLAG_CATEGORIES if category is None else [category]:
+                    conditions.append(name.lower() + "Flags = ''")
+            elif flag is not None or category is not None:
+                categories = FLAG_CATEGORIES if category is None else [category]
+                found = "SELECT rowNumber FROM flags WHERE category IN (" + ", ".join("?" * len(categories)) + ")"
+                values += categories
+                if flag is not None:
+                    found += " AND flag = ?"
+                    values.append(flag)
+                conditions.append("rowNumber IN (" + found + ")")
+            if province is not None:
+                conditions.append("province = ?")
+                values.append(province)
+            query = "SELECT " + ", ".join(name for name, kind in RESULT_STORE_COLUMNS[4:]) + " FROM addresses"
+            if len(conditions) > 0:
+                query += " WHERE " + " AND ".join(conditions)
+
+            states = {} # state of the flag of each set of flag columns
+            for row in db.execute(query + " ORDER BY rowNumber", values):
+                original, number, street, suffix, altSuffix, direction, suffixNumber, extra, french, external,\
+                    ordinal, po, prov = row[:13]
+                state = states.get(row[13:])
+                if state is None: # in the order of Flag.__getstate__
+                    names = [tuple(column.split()) for column in row[13:]]
+                    state = states[row[13:]] = (names[0], names[2], names[1], names[3], names[4])
+                address = Address.__new__(Address)
+                address.__setstate__((number, json.loads(original), street, suffix, altSuffix, direction,
+                                      bool(french), state, extra, bool(external), bool(ordinal), bool(po),
+                                      suffixNumber, prov))
+                yield address
+        finally:
+            db.close()
+
+
+# inner class for a snapshot of the rules with what the factors compute from them, the rules are copied so changes made
+# to the rules after compiling are only used after rulesChanged
+class CompiledRules:
+    def __init__(self, suffixes, extras, shortStreets, rulesHash=None):
+        self.formatVersion = COMPILED_VERSION
+        self.rulesHash = rulesHash # sha256 of the rules file compiled, None if not compiled from a file
+        self.suffixes = dict(suffixes)
+        self.extras = list(extras)
+        self.shortStreets = dict(shortStreets)
+        self.suffixIndex = SuffixIndex(self.suffixes) # best suffix of a word, with the maximum factor of each suffix
+        self.extraLetters = [(extra, frozenset(extra)) for extra in self.extras] # letters of each external info rule
+
+    def matches(self, suffixes, extras, shortStreets):
+        """
+        Checks if rules are the same as the rules compiled
+        :return: Boolean value if they are the same, in the same order
+        """
+        return list(self.suffixes.items()) == list(suffixes.items()) and self.extras == extras and\
+            self.shortStreets == shortStreets
+
+    def __getstate__(self): # plain lists and dictionaries, saved with marshal beside the rules file by compileRules
+        return {"formatVersion": self.formatVersion, "rulesHash": self.rulesHash,
+                "suffixes": list(self.suffixes.items()), "extras": self.extras, "shortStreets": self.shortStreets,
+                "suffixIndex": self.suffixIndex.__getstate__()}
+
+    def __setstate__(self, state):
+        self.formatVersion = state["formatVersion"]
+        self.rulesHash = state["rulesHash"]
+        self.suffixes = {suffix: factors for suffix, factors in state["suffixes"]} # in rule order
+        self.extras = state["extras"]
+        self.shortStreets = state["shortStreets"]
+        self.suffixIndex = SuffixIndex.__new__(SuffixIndex)
+        self.suffixIndex.__setstate__(state["suffixIndex"])
+        self.extraLetters = [(extra, frozenset(extra)) for extra in self.extras]
+
+
+# inner class for the translate table of removeSymbols, each character is sorted into kept or removed the first time it
+# is seen, as the characters of a word can be any unicode character
+class SymbolTable(dict):
+    def __init__(self, exception, remove):
+        super().__init__()
+        self._exception = exception # characters kept
+        self._remove = remove # characters removed, all other characters are kept if given
+
+    def __missing__(self, code):
+        letter = chr(code)
+        if len(self._remove) > 0:
+            keep = letter.isalnum() or letter not in self._remove
+        else:
+            keep = letter.isalnum() or letter in "- '" or letter in self._exception
+        self[code] = code if keep else None
+        return self[code]
+
+
+# inner class for remembering results of the rule factors
+class LRUCache:
+    def __init__(self, maxSize):
+        self._maxSize = maxSize # most entries kept, the least recently used entry is dropped first
+        self._entries = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get(self, key):
+        """
+        Finds a remembered value
+        :param key: Key of the value
+        :return: The value, or None if it is not remembered
+        """
+        value = self._entries.get(key)
+        if value is None:
+            self._misses += 1
+        else:
+            self._hits += 1
+            self._entries.move_to_end(key)
+        return value
+
+    def put(self, key, value):
+        self._entries[key] = value
+        if len(self._entries) > self._maxSize:
+            self._entries.popitem(last=False)
+            self._evictions += 1
+
+    def clear(self):
+        self._entries.clear()
+
+    def __contains__(self, key): # not counted as a hit or a miss
+        return key in self._entries
+
+    @property
+    def maxSize(self):
+        return self._maxSize
+
+    @maxSize.setter
+    def maxSize(self, maxSize):
+        self._maxSize = maxSize
+        while len(self._entries) > self._maxSize:
+            self._entries.popitem(last=False)
+            self._evictions += 1
+
+    @property
+    def hits(self):
+        return self._hits
+
+    @property
+    def misses(self):
+        return self._misses
+
+    @property
+    def evictions(self):
+        return self._evictions
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __str__(self):
+        lookups = self._hits + self._misses
+        hitRate = self._hits / lookups * 100 if lookups > 0 else 0
+        return "{} hits, {} misses, {} evictions ({:.1f}% hit rate, {}/{} entries)".format(
+            self._hits, self._misses, self._evictions, hitRate, len(self._entries), self._maxSize)
+
+
+# inner class for the properties of a single word of an address, shared by structureAddress and validate
+class TokenProfile:
+    def __init__(self, word, suffixPair=None, extFactor=None):
+        self.word = word
+        self.numerics = sum(c.isnumeric() for c in word) # numeric characters
+        self.digits = sum(c.isdigit() for c in word) # digits only, superscripts and fractions are not counted
+        self.letters = sum(c.isalpha() for c in word)
+        self.alphas = "".join(letter for letter in word if letter.isalpha()) # the word with only its letters
+        self.noSymbols = removeSymbols(word)
+        self.ordinal = checkOrdinal(word)
+        self.direction = directionFactor(word)
+        self._suffixPair = suffixPair # factors that depend on the rules are only found when asked for, unless they
+        self._extFactor = extFactor # were scored in a batch
+
+    @property
+    def suffixPair(self):
+        if self._suffixPair is None:
+            self._suffixPair = calcSuffixFactor(self.word)
+        return self._suffixPair
+
+    @property
+    def extFactor(self):
+        if self._extFactor is None:
+            self._extFactor = calcExtFactor(self.word)
+        return self._extFactor
+
+
+# inner class for scoring words against the suffix rules
+class SuffixIndex:
+    def __init__(self, suffixes):
+        self._order = list(suffixes) # suffixes in rule order, ties go to the earliest suffix
+        self._weights = [] # factors of each suffix
+        self._penalty = [] # amount taken off for a letter that is not in the suffix
+        self._scores = {} # letter -> {suffix position: most that letter can add to the suffix}
+        self._unbounded = [] # suffixes with no positive factors, these cannot be ruled out early
+
+        for k in range(len(self._order)):
+            suffix = self._order[k]
+            weights = suffixes[suffix]
+            self._weights.append(weights)
+            if len(weights) == 0 or max(weights) <= 0:
+                self._penalty.append(max(weights) * 2 if len(weights) > 0 else 0)
+                self._unbounded.append(k)
+                continue
+            self._penalty.append(max(weights) * 2)
+
+            for j in range(min(len(suffix), len(weights))):
+                if weights[j] > 0:
+                    letterScores = self._scores.setdefault(suffix[j], {})
+                    letterScores[k] = letterScores.get(k, 0) + weights[j]
+
+    def __len__(self):
+        return len(self._order)
+
+    def __getstate__(self):
+        return [self._order, self._weights, self._penalty, self._scores, self._unbounded]
+
+    def __setstate__(self, state):
+        self._order, self._weights, self._penalty, self._scores, self._unbounded = state
+
+    def match(self, word):
+        """
+        Finds the suffix most similar to a word, same result as scoring the word against every suffix in order
+        :param word: Word without symbols
+        :return: Highest factor with the suffix that has the highest factor
+        """
+        # upper bound of each suffix: every letter of the word that is in the suffix matches its best position,
+        # and the first letter is always penalized if it is not in the suffix
+        bounds = {}
+        for letter in set(word):
+            for k, score in self._scores.get(letter, {}).items():
+                bounds[k] = bounds.get(k, 0) + score
+        for k in bounds:
+            if word[0] not in self._order[k]:
+                bounds[k] -= self._penalty[k]
+        for k in self._unbounded:
+            bounds[k] = float("inf")
+
+        # suffixes with no letters in common with the word can only score 0 or less, so they are never checked
+        suffixFactor = 0
+        best = -1
+        for k in sorted(bounds, key=lambda pos: (-bounds[pos], pos)):
+            if bounds[k] + 1e-9 < suffixFactor:
+                break # no suffix left can reach the highest factor
+
+            suffix = self._order[k]
+            weights = self._weights[k]
+            i = j = 0
+            simFactor = 0
+            while i < len(word) and j < len(suffix):
+                if word[i] == suffix[j]:
+                    simFactor += weights[j]
+                    i += 1
+                elif word[i] not in suffix:
+                    simFactor -= self._penalty[k]
+                    i += 1
+                j += 1
+
+            if simFactor > suffixFactor or (simFactor == suffixFactor and best != -1 and k < best):
+                suffixFactor = simFactor
+                best = k
+
+        if best == -1:
+            return (0, "")
+        return (suffixFactor, self._order[best])
+
+
+# inner class for scoring many words at once against the rules with NumPy, the rules are encoded as arrays once: the
+# suffixes as a matrix of letter codes with a matrix of their factors, the external info rules as a matrix of letter
+# codes, and the letters in each rule. Only the pairs of a word and a rule that can score are kept, then they are
+# walked together one letter at a time, the same walk SuffixIndex.match and scoreExtFactor make for one word and one
+# rule, so the factors are exactly the same
+class BatchScorer:
+    def __init__(self, rules):
+        import numpy
+
+        self._numpy = numpy
+        self.rules = rules # CompiledRules encoded
+        self._order = list(rules.suffixes) # suffixes in rule order, ties go to the earliest suffix
+        self._hasExtras = len(rules.extraLetters) > 0 # without rules, no external factor is found from symbols
+        self._extras = [extra for extra in rules.extras if len(extra) > 0] # empty rules score nothing
+
+        # letters of the rules are given codes from 0, any other letter is given the code after them as it never
+        # matches a rule, and the code after that pads words
+        self._points = numpy.array(sorted({ord(letter) for rule in self._order + self._extras for letter in rule}),
+                                   numpy.uint32)
+        self._other = len(self._points)
+
+        suffixWeights = [rules.suffixes[suffix] for suffix in self._order]
+        self._suffixCodes, self._suffixLengths, self._inSuffix = self._encode(self._order)
+        self._weights = numpy.zeros(self._suffixCodes.shape)
+        self._bounds = numpy.zeros((self._other + 2, len(self._order))) # most each letter can add to each suffix
+        for k, weights in enumerate(suffixWeights):
+            count = min(len(weights), self._suffixCodes.shape[1])
+            self._weights[k, :count] = weights[:count]
+            for j in range(min(len(self._order[k]), len(weights))):
+                if weights[j] > 0:
+                    self._bounds[self._suffixCodes[k, j], k] += weights[j]
+        self._penalty = numpy.array([max(weights) * 2 if len(weights) > 0 else 0 for weights in suffixWeights],
+                                    numpy.float64)
+
+        self._extraCodes, self._extraLengths, self._inExtra = self._encode(self._extras)
+        # letter a word needs for these rules to score, -1 if none
+        required = {"SECTION": "C", "MEZZANINE": "Z", "PORTE": "T", "PORT": "T"}
+        self._required = numpy.array([self._codes(required[extra])[0] if extra in required else -1
+                                      for extra in self._extras], numpy.int64)
+
+    def _codes(self, text):
+        """
+        Codes of the letters of a text
+        :param text: The text
+        :return: int64 array of the codes
+        """
+        numpy = self._numpy
+        points = numpy.frombuffer(text.encode("utf-32-le", "surrogatepass"), numpy.uint32)
+        if len(self._points) == 0:
+            return numpy.full(len(points), self._other, numpy.int64)
+        found = numpy.minimum(numpy.searchsorted(self._points, points), len(self._points) - 1)
+        return numpy.where(self._points[found] == points, found, self._other).astype(numpy.int64)
+
+    def _encode(self, words, width=None):
+        """
+        Encodes words as a matrix of letter codes
+        :param words: list of words, none of them empty
+        :param width: Letters of each word kept in the matrix, all of them if not given
+        :return: Matrix of the codes padded with -1, length of each word, matrix of the letters each word has
+        """
+        numpy = self._numpy
+        lengths = numpy.fromiter((len(word) for word in words), numpy.int64, len(words))
+        if width is None:
+            width = int(lengths.max()) if len(words) > 0 else 1
+        codes = self._codes("".join(words))
+        starts = numpy.cumsum(lengths) - lengths
+        matrix = numpy.full((len(words), max(width, 1)), -1, numpy.int64)
+        for position in range(width):
+            long = lengths > position
+            matrix[long, position] = codes[starts[long] + position]
+        letters = numpy.zeros((len(words), self._other + 2), bool) # the padding column of -1 is never set
+        letters[numpy.repeat(numpy.arange(len(words)), lengths), codes] = True
+        return matrix, lengths, letters
+
+    def score(self, words):
+        """
+        Scores words against the rules
+        :param words: list of words
+        :return: list of the calcSuffixFactor of each word, list of the calcExtFactor of each word
+        """
+        suffixPairs = [(0, "")] * len(words)
+        extFactors = [0] * len(words)
+        suffixWords = {} # positions of each word matched against the suffix rules
+        extWords = {} # positions of each word matched against the external info rules, with its symbol factor
+        for position, word in enumerate(words):
+            matched = suffixWord(word)
+            if matched is not None and len(self._order) > 0:
+                suffixWords.setdefault(matched, []).append(position)
+            factor, cleaned, symFactor = extSymbols(word)
+            if factor is not None:
+                extFactors[position] = factor
+            elif self._hasExtras:
+                extWords.setdefault((cleaned, symFactor), []).append(position)
+
+        matched = list(suffixWords)
+        size = max(64, BATCH_CELLS // max(len(self._order), 1)) # words scored together
+        for start in range(0, len(matched), size):
+            for word, pair in zip(matched[start:start + size], self._matchSuffixes(matched[start:start + size])):
+                for position in suffixWords[word]:
+                    suffixPairs[position] = pair
+
+        matched = list(extWords)
+        size = max(64, BATCH_CELLS // max(len(self._extras), 1))
+        for start in range(0, len(matched), size):
+            chunk = matched[start:start + size]
+            for (word, symFactor), score in zip(chunk, self._matchExtras([word for word, symFactor in chunk])):
+                for position in extWords[(word, symFactor)]:
+                    extFactors[position] = max(score, symFactor, 0)
+        return suffixPairs, extFactors
+
+    def _matchSuffixes(self, words):
+        """
+        Finds the suffix most similar to each word, as SuffixIndex.match
+        :param words: Words without symbols
+        :return: list of (highest factor, suffix) of each word
+        """
+        numpy = self._numpy
+        width = self._suffixCodes.shape[1]
+        codes, lengths, letters = self._encode(words, width)
+        # a suffix sharing no letter of a positive factor with a word scores 0 or less, which is never kept
+        wordIds, suffixIds = numpy.nonzero(letters.astype(numpy.float64) @ self._bounds > 0)
+
+        at = numpy.zeros(len(wordIds), numpy.int64) # letter of the word each pair is at
+        simFactors = numpy.zeros(len(wordIds))
+        wordLengths = lengths[wordIds]
+        suffixLengths = self._suffixLengths[suffixIds]
+        penalty = self._penalty[suffixIds]
+        for j in range(width):
+            letter = codes[wordIds, numpy.minimum(at, width - 1)]
+            active = (at < wordLengths) & (j < suffixLengths)
+            same = active & (letter == self._suffixCodes[suffixIds, j])
+            foreign = active & ~same & ~self._inSuffix[suffixIds, letter] # letter of the word not in the suffix
+            simFactors = simFactors + numpy.where(same, self._weights[suffixIds, j], 0.0) - numpy.where(foreign,
+                                                                                                       penalty, 0.0)
+            at += same | foreign
+
+        scores = numpy.zeros((len(words), len(self._order)))
+        scores[wordIds, suffixIds] = simFactors
+        best = scores.argmax(axis=1) # the earliest of the highest
+        highest = scores[numpy.arange(len(words)), best]
+        return [(factor, self._order[k]) if factor > 0 else (0, "") for factor, k in
+                zip(highest.tolist(), best.tolist())]
+
+    def _matchExtras(self, words):
+        """
+        Finds the highest factor of each word against the external info rules, as scoreExtFactor
+        :param words: Words without symbols, none of them empty
+        :return: list of the highest factor of each word
+        """
+        numpy = self._numpy
+        if len(self._extras) == 0:
+            return [0] * len(words)
+        width = self._extraCodes.shape[1]
+        codes, lengths, letters = self._encode(words)
+        # only rules starting with the first letter of the word, with every letter of the word and the letter the
+        # rule needs score
+        wordIds, extraIds = numpy.nonzero(codes[:, :1] == self._extraCodes[:, 0])
+        scored = ~(letters[wordIds] & ~self._inExtra[extraIds]).any(axis=1)
+        required = self._required[extraIds]
+        scored &= (required < 0) | letters[wordIds, required]
+        wordIds = wordIds[scored]
+        extraIds = extraIds[scored]
+
+        at = numpy.zeros(len(wordIds), numpy.int64) # letter of the word each pair is at
+        simFactors = numpy.zeros(len(wordIds))
+        consecFactors = numpy.zeros(len(wordIds))
+        wordLengths = lengths[wordIds]
+        extraLengths = self._extraLengths[extraIds]
+        similar = 0.8 / wordLengths + 1 / (2 * extraLengths)
+        consecutive = 1.3 / wordLengths
+        long = wordLengths >= 3
+        for k in range(width):
+            letter = codes[wordIds, numpy.minimum(at, codes.shape[1] - 1)]
+            active = (at < wordLengths) & (k < extraLengths)
+            same = active & (letter == self._extraCodes[extraIds, k])
+            consecFactors = consecFactors + numpy.where(same & (at == k) & long, consecutive, 0.0)
+            simFactors = simFactors + numpy.where(same, similar, 0.0)
+            at += same
+
+        highest = numpy.zeros(len(words))
+        numpy.maximum.at(highest, wordIds, numpy.maximum(simFactors, consecFactors))
+        return highest.tolist()
+
+
+# inner class for storing flags, each category is a bitmask of flag codes from flagCode
+class Flag:
+    __slots__ = ("_number", "_suffix", "_street", "_direction", "_address")
+
+    def __init__(self):
+        self._number = 0 # errors with number
+        self._suffix = 0 # errors with suffix
+        self._street = 0 # errors with street
+        self._direction = 0 # errors with direction
+        self._address = 0 # errors with overall address
+
+    def addNumFlag(self, flag):
+        self._number |= flagCode(flag)
+
+    def addDirFlag(self, flag):
+        self._direction |= flagCode(flag)
+
+    def addStrFlag(self, flag):
+        self._street |= flagCode(flag)
+
+    def addSufFlag(self, flag):
+        self._suffix |= flagCode(flag)
+
+    def addAddrFlag(self, flag):
+        self._address |= flagCode(flag)
+
+    # each category is given as a frozenset of flag names, shared by every flag with the same bitmask
+    @property
+    def number(self):
+        return flagNames(self._number)
+
+    @property
+    def suffix(self):
+        return flagNames(self._suffix)
+
+    @property
+    def street(self):
+        return flagNames(self._street)
+
+    @property
+    def direction(self):
+        return flagNames(self._direction)
+
+    @property
+    def address(self):
+        return flagNames(self._address)
+
+    @number.setter
+    def number(self, number):
+        pass
+
+    @suffix.setter
+    def suffix(self, suffix):
+        pass
+
+    @street.setter
+    def street(self, street):
+        pass
+
+    @direction.setter
+    def direction(self, direct):
+        pass
+
+    @address.setter
+    def address(self, address):
+        pass
+
+    @property
+    def masks(self): # in the order of FLAG_CATEGORIES
+        return self._number, self._street, self._suffix, self._direction, self._address
+
+    def copy(self):
+        """
+        Copies the flags, so changing the copy does not change these flags
+        :return: New Flag object
+        """
+        flag = Flag()
+        flag._number = self._number
+        flag._suffix = self._suffix
+        flag._street = self._street
+        flag._direction = self._direction
+        flag._address = self._address
+        return flag
+
+    def isValid(self):
+        return self._number == self._direction == self._suffix == self._street == self._address == 0
+
+    # codes are only known to the process that made them, so flags are sent to other processes and saved by name.
+    # The names of a bitmask are always the same tuple, which pickle and marshal only write once per file or chunk
+    def __getstate__(self):
+        return (flagState(self._number), flagState(self._suffix), flagState(self._street),
+                flagState(self._direction), flagState(self._address))
+
+    def __setstate__(self, state):
+        number, suffix, street, direction, address = state
+        self._number = stateMask(number)
+        self._suffix = stateMask(suffix)
+        self._street = stateMask(street)
+        self._direction = stateMask(direction)
+        self._address = stateMask(address)
+
+    def __str__(self):
+        if self.isValid():
+            return "VALID"
+        else:
+            message = ""
+            for word, mask in [("N", self._number), ("ST", self._street), ("SF", self._suffix),
+                               ("D", self._direction), ("A", self._address)]:
+                message += word + "["
+                for flag in FLAG_NAMES: # in the order of the codes
+                    if mask & FLAG_CODES[flag]:
+                        message += flag + "/"
+                message += "]"
+            return message
+
+
+def flagCode(flag):
+    """
+    Finds the bit of a flag name, names that are new (such as the suffix names of suffix flags) are given the next bit
+    :param flag: Flag name
+    :return: Bit of the flag
+    """
+    code = FLAG_CODES.get(flag)
+    if code is None:
+        code = 1 << len(FLAG_NAMES)
+        FLAG_CODES[flag] = code
+        FLAG_NAMES.append(flag)
+    return code
+
+
+def flagNames(mask):
+    """
+    Finds the names of the flags in a bitmask
+    :param mask: Bitmask of flag codes
+    :return: frozenset of the flag names
+    """
+    names = flagSets.get(mask)
+    if names is None:
+        names = frozenset(flag for flag in FLAG_NAMES if mask & FLAG_CODES[flag])
+        flagSets[mask] = names
+    return names
+
+
+def flagState(mask):
+    """
+    Finds the names of the flags in a bitmask, to be sent to another process
+    :param mask: Bitmask of flag codes
+    :return: Sorted tuple of the flag names, the same tuple for the same bitmask
+    """
+    state = flagStates.get(mask)
+    if state is None:
+        state = tuple(sorted(flagNames(mask)))
+        flagStates[mask] = state
+    return state
+
+
+def stateMask(state):
+    """
+    Finds the bitmask of flag names from flagState, names made by another process are given codes in this one
+    :param state: Tuple of flag names
+    :return: Bitmask of flag codes
+    """
+    mask = stateMasks.get(state)
+    if mask is None:
+        mask = 0
+        for flag in state:
+            mask |= flagCode(flag)
+        stateMasks[state] = mask
+    return mask
+
+
+# inner class for addresses
+class Address:
+    __slots__ = ("_number", "_original", "_street", "_suffix", "_altSuffix", "_direction", "_french", "_flag", "_extra",
+                 "_external", "_ordinal", "_po", "_suffixNumber", "_province")
+
+    def __init__(self, original):
+        self._number = "" # number of address
+        self._original = original # original address before any simplifying
+        self._street = "" # street name
+        self._suffix = "" # street suffix
+        self._altSuffix = "" # full version of suffix if the suffix itself is short
+        self._direction = "" # cardinal direction
+        self._french = False # french address
+        self._flag = Flag() # any errors with the address
+        self._extra = "" # external info
+        self._external = False  # if the external info is an address
+        self._ordinal = False  # if ordinal numbers exist in the street
+        self._po = False # if the address is a po box
+        self._suffixNumber = "" # usually with rural roads, can have number attached with the suffix
+        self._province = "" # province of the row, set by cleanRow
+
+    # GETTERS AND SETTERS
+    @property
+    def number(self):
+        return self._number
+
+    @number.setter
+    def number(self, number):
+        self._number = number
+
+    @property
+    def street(self):
+        return self._street
+
+    @street.setter
+    def street(self, street):
+        self._street = street
+
+    @property
+    def suffix(self):
+        return self._suffix
+
+    @suffix.setter
+    def suffix(self, suffix):
+        self._suffix = suffix
+
+    @property
+    def direction(self):
+        return self._direction
+
+    @direction.setter
+    def direction(self, direction):
+        self._direction = direction
+
+    @property
+    def flag(self):
+        return self._flag
+
+    @flag.setter
+    def flag(self, flag):
+        self._flag = flag
+
+    def isValid(self):
+        return self._flag.isValid()
+
+    def copy(self):
+        """
+        Copies the address, so changing the copy does not change this address
+        :return: New Address object
+        """
+        address = Address.__new__(Address)
+        for name in Address.__slots__:
+            setattr(address, name, getattr(self, name))
+        address._original = list(self._original)
+        address._flag = self._flag.copy()
+        return address
+
+    @property
+    def original(self):
+        return self._original
+
+    @original.setter
+    def original(self, original):
+        self._original = original
+
+    @property
+    def french(self):
+        return self._french
+
+    @french.setter
+    def french(self, value):
+        self._french = value
+
+    @property
+    def external(self):
+        return self._external
+
+    @external.setter
+    def external(self, external):
+        self._external = external
+
+    @property
+    def altSuffix(self):
+        return self._altSuffix
+
+    @altSuffix.setter
+    def altSuffix(self, altSuffix):
+        self._altSuffix = altSuffix
+
+    @property
+    def extra(self):
+        return self._extra
+
+    @extra.setter
+    def extra(self, extra):
+        self._extra = extra
+
+    @property
+    def ordinal(self):
+        return self._ordinal
+
+    @ordinal.setter
+    def ordinal(self, ordinal):
+        self._ordinal = ordinal
+
+    @property
+    def po(self):
+        return self._po
+
+    @po.setter
+    def po(self, po):
+        self._po = po
+
+    @property
+    def suffixNumber(self):
+        return self._suffixNumber
+
+    @suffixNumber.setter
+    def suffixNumber(self, num):
+        self._suffixNumber = num
+
+    @property
+    def province(self):
+        return self._province
+
+    @province.setter
+    def province(self, province):
+        self._province = province
+
+    # pickled as a tuple of values, much smaller and faster to load than the slots by name, for scanParallel. The
+    # tuple is never changed, so RowStore keeps it in place of a copy of the address
+    def __getstate__(self):
+        return (self._number, tuple(self._original), self._street, self._suffix, self._altSuffix, self._direction,
+                self._french, self._flag.__getstate__(), self._extra, self._external, self._ordinal, self._po,
+                self._suffixNumber, self._province)
+
+    def __setstate__(self, state):
+        self._number, original, self._street, self._suffix, self._altSuffix, self._direction, self._french, flag,\
+            self._extra, self._external, self._ordinal, self._po, self._suffixNumber, self._province = state
+        self._original = list(original)
+        self._flag = Flag.__new__(Flag)
+        self._flag.__setstate__(flag)
+
+    def __str__(self):
+        if self._french and not self._ordinal:  # add ordinal later
+            return " ".join(" ".join([self._number, self._suffix.strip(), self._street.strip().rstrip("-"),
+                                      self._suffixNumber, self._direction]).split()).strip().rstrip(",")
+        return " ".join(" ".join(
+            [self._number, self._street.strip().rstrip("-"), self._suffix, self._direction,
+             self._suffixNumber]).split()).strip().rstrip(
+            ",")
+
+
+# ****************************************************** GLOBALS ******************************************************
+
+PROGRESS_ROWS = 500 # rows between calls to the progress of a scan
+symbolTables = {} # SymbolTable of each exception and remove given to removeSymbols
+profiler = None # StageTimer while profiling is on, see startProfiling
+profiledFunctions = {} # functions replaced by timed versions while profiling
+# stages timed while profiling with the functions of each, in the order they are shown
+PROFILED_STAGES = [("Tokenizing", ["splitTokens"]),
+                   ("Factor scoring", ["getProfile", "calcSuffixFactor", "calcExtFactor", "directionFactor",
+                                       "findPOFactor"]),
+                   ("Assignment", ["structureAddress"]),
+                   ("validate", ["validate"]),
+                   ("trimExtInfo", ["trimExtInfo"])]
+CSV_DELIMITERS = {".csv": ",", ".tsv": "\t", ".tab": "\t"} # files read with CsvSheet and written with writeCsv
+SCAN_COLUMNS = ["AddressLine1", "AddressLine2", "Province"] # the only columns scans read from an XlsxSheet
+XLSX_MAIN = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}" # namespace of the sheet XML
+XLSX_PACKAGE = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+XLSX_RELATION = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+XLSX_DOCUMENT, XLSX_WORKSHEET, XLSX_STRINGS, XLSX_STYLES = "officeDocument", "worksheet", "sharedStrings", "styles"
+XLSX_BLOCK = 1 << 20 # bytes of sheet XML read at once by XlsxSheet
+XLSX_ROW_NUMBER = re.compile(rb"""\sr\s*=\s*["'](\d+)["']""")
+XLSX_CELL_TYPE = re.compile(rb"""\st\s*=\s*["'](\w+)["']""")
+XLSX_CELL_STYLE = re.compile(rb"""\ss\s*=\s*["'](\d+)["']""")
+XLSX_UNNAMED_CELL = re.compile(rb"<([\w.-]+:)?c(?=[\s/>])(?![^>]*\sr\s*=)") # cells without a reference
+XLSX_ENCODING = re.compile(rb"""encoding\s*=\s*["']([\w.-]+)""")
+XLSX_NAMESPACE = re.compile(rb"""\s(xmlns(:[\w.-]+)?\s*=\s*("[^"]*"|'[^']*'))""")
+XLSX_WRITE_ROWS = 1000 # rows an XlsxSheetWriter writes into the zip at once
+XLSX_COMPRESSION = 6 # zlib level of XlsxWriter, the level openpyxl saves with
+XLSX_SHEET_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"
+XLSX_SHEET_START = (b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+                    b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>')
+XLSX_SHEET_END = b"</sheetData></worksheet>"
+# parts of a workbook XlsxWriter writes around its sheets, {sheets}, {relations} and {types} are the parts of the sheets
+XLSX_PARTS = {
+    "[Content_Types].xml": '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/styles.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>{types}</Types>',
+    "_rels/.rels": '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Target="xl/workbook.xml" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument"/></Relationships>',
+    "xl/workbook.xml": '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<bookViews><workbookView/></bookViews><sheets>{sheets}</sheets></workbook>',
+    "xl/_rels/workbook.xml.rels": '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">{relations}</Relationships>',
+    "xl/styles.xml": '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+    '<fonts count="1"><font><sz val="11"/><name val="Calibri"/><family val="2"/></font></fonts>'
+    '<fills count="2"><fill><patternFill patternType="none"/></fill><fill><patternFill patternType="gray125"/></fill>'
+    '</fills><borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+    '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+    '<cellXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/></cellXfs>'
+    '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles></styleSheet>'
+}
+XML_SPECIAL = re.compile('[&<>"\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]') # characters xmlEscape changes
+XML_ILLEGAL = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]") # characters XML cannot hold
+BATCH_ROWS = 2000 # rows whose words are scored together by scoreWords
+BATCH_CELLS = 1000000 # words times rules walked together by BatchScorer, bounds the memory of its arrays
+batchScoring = False # words are scored in batches with NumPy before rows are cleaned, see useBatchScoring
+batchScorer = None # BatchScorer of the rules in use, made by scoreWords
+RESULT_PAGE_ROWS = 25 # rows of a page of ResultIndex
+RESULT_BLOCK = 4096 # bytes of a QueryResult bitmap counted together, 32768 rows
+BYTE_BITS = [bin(i).count("1") for i in range(256)] # rows in each byte of a bitmap
+RESULT_STORE_ROWS = 10000 # addresses inserted into a ResultStore in each transaction
+RESULT_STORE_EXTENSIONS = [".db", ".sqlite", ".sqlite3"] # files written and read with ResultStore
+
+# rules are empty until load_rules is called, followed by rulesChanged
+extras = []
+suffixes = {}
+shortStreets = {}
+rulesVersion = 0 # increases every time the rules change
+COMPILED_VERSION = 2 # changes whenever CompiledRules changes, so files compiled by older versions are compiled again
+ROW_STORE_VERSION = 2 # changes whenever the cleaning of a row changes, so rows saved by older versions are not reused
+RESULT_STORE_VERSION = 1 # changes whenever the tables of ResultStore change, saved as the user_version of the database
+loadedRules = None # CompiledRules of the last rules file loaded
+compiledRules = CompiledRules(suffixes, extras, shortStreets) # rules used by the factors, set by rulesChanged
+extCache = LRUCache(100000) # external factors of words seen, keyed by rule version and word
+tokenCache = LRUCache(200000) # profiles of words seen, keyed by rule version and word
+suffixIndex = compiledRules.suffixIndex
+
+# flags always given the same codes, suffix names of suffix flags are added when they are first flagged
+FLAG_NAMES = ["INVALID", "EXCESS", "FORMAT", "LEN", "SYM", "UNDEFINED", "ST/STE", "STRUCT"]
+FLAG_CODES = {flag: 1 << i for i, flag in enumerate(FLAG_NAMES)}
+flagSets = {0: frozenset()} # flag names of each bitmask seen
+flagStates = {} # sorted flag names of each bitmask sent to another process
+stateMasks = {} # bitmask of each tuple of flag names received from another process
+FLAG_CATEGORIES = ["Number", "Street", "Suffix", "Direction", "Address"]
+# columns of the addresses table of ResultStore, the written row, the parts of the address then its flags by category
+RESULT_STORE_COLUMNS = [("rowNumber", "INTEGER"), ("addressLine1", "TEXT"), ("addressLine2", "TEXT"),
+                        ("unchanged", "INTEGER"), ("original", "TEXT"), ("number", "TEXT"), ("street", "TEXT"),
+                        ("suffix", "TEXT"), ("altSuffix", "TEXT"), ("direction", "TEXT"), ("suffixNumber", "TEXT"),
+                        ("extra", "TEXT"), ("french", "INTEGER"), ("external", "INTEGER"), ("ordinal", "INTEGER"),
+                        ("po", "INTEGER"), ("province", "TEXT")] + [
+    (category.lower() + "Flags", "TEXT") for category in FLAG_CATEGORIES]
+RESULT_STORE_INDEXES = ["CREATE INDEX flagRows ON flags (category, flag, rowNumber)",
+                        "CREATE INDEX provinceRows ON addresses (province)"]
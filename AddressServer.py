@@ -0,0 +1,270 @@
+# AddressServer.py
+# Cleans addresses sent by other programs on this computer over HTTP, one at a time as they are entered, without
+# loading the rules for each address. The rules and the word caches stay loaded, and rows sent at the same time by
+# different programs are cleaned together in one batch
+# e.g. python AddressServer.py --port 8020, then POST JSON lines of {"line1": ..., "line2": ..., "province": ...} to
+# http://127.0.0.1:8020/clean, each line is answered by a line with the cleaned address and its flags
+
+# IMPORTS ###
+# I/O and DEBUGGING
+from timeit import default_timer as timer
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+import os.path
+import argparse
+import json
+import queue
+import threading
+import traceback
+import sys
+# ADDRESS CLEANING
+import AddressCleaner as cleaner
+
+MAX_REQUEST_BYTES = 16 * 1024 * 1024 # largest body of a request, larger requests are refused before reading them
+MAX_REQUEST_ROWS = 10000 # most rows in a request, more rows are sent in several requests
+
+
+def requestRow(request):
+    """
+    Finds the row to clean in a line of a request
+    :param request: Object of a JSON line, with line1 and optionally line2 and province
+    :return: (AddressLine1, AddressLine2, Province) like the columns of a sheet, empty when not sent
+    """
+    if not isinstance(request, dict) or "line1" not in request:
+        raise ValueError("Each line must be an object with line1, and optionally line2 and province")
+    return request["line1"], request.get("line2") or "", request.get("province") or ""
+
+
+def cleanedFields(address):
+    """
+    Answer to a row of a request
+    :param address: Address object
+    :return: dictionary of the written columns, the parts of the address and the flags of each category with any
+    """
+    written = cleaner.cleanedRow(address)
+    return {"line1": written[0], "line2": written[1], "unchanged": len(written) == 3, "number": address.number,
+            "street": address.street, "suffix": address.suffix, "altSuffix": address.altSuffix,
+            "direction": address.direction, "suffixNumber": address.suffixNumber, "extra": address.extra,
+            "french": address.french, "province": address.province, "valid": address.isValid(),
+            "flags": {category: list(cleaner.flagState(mask))
+                      for category, mask in zip(cleaner.FLAG_CATEGORIES, address.flag.masks) if mask}}
+
+
+# inner class for the rows of a request waiting to be cleaned
+class PendingRequest:
+    __slots__ = ("rows", "answers", "done")
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.answers = None # dictionary of each row once cleaned
+        self.done = threading.Event()
+
+
+# inner class for cleaning the rows of requests on one thread, so the rules and caches are only used by it. The rows of
+# every request waiting when a batch starts go in the same batch (up to maxRows), so nothing waits while the server is
+# idle and batches grow as more requests arrive at once. The rules are loaded again when the rules file changes
+class RequestBatcher:
+    def __init__(self, rulesFile, maxRows=500, wait=0):
+        self._rulesFile = rulesFile
+        self._rulesTime = None # modification time of the rules loaded
+        self._rulesChecked = 0 # time the rules file was last checked
+        self._maxRows = maxRows
+        self._wait = wait # seconds a batch waits for more requests after its first one
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._stats = {"requests": 0, "rows": 0, "batches": 0, "largestBatch": 0, "cleaningSeconds": 0,
+                       "rulesLoaded": 0}
+        self._loadRules()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def clean(self, rows):
+        """
+        Cleans the rows of a request with the rows of the other requests waiting, called by the thread of the request
+        :param rows: (AddressLine1, AddressLine2, Province) of each row
+        :return: dictionary of each row, see cleanedFields
+        """
+        request = PendingRequest(rows)
+        self._queue.put(request)
+        request.done.wait()
+        return request.answers
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+        stats["meanBatch"] = stats["rows"] / stats["batches"] if stats["batches"] > 0 else 0
+        stats["extCache"] = str(cleaner.extCache)
+        stats["tokenCache"] = str(cleaner.tokenCache)
+        return stats
+
+    def _loadRules(self):
+        """
+        Loads the rules when the rules file changed, checked at most once a second
+        """
+        now = timer()
+        if self._rulesTime is not None and now - self._rulesChecked < 1:
+            return
+        self._rulesChecked = now
+        try:
+            changed = os.path.getmtime(self._rulesFile)
+        except OSError: # being saved, the rules loaded are kept
+            return
+        if changed == self._rulesTime:
+            return
+        cleaner.suffixes.clear()
+        cleaner.extras.clear()
+        cleaner.shortStreets.clear()
+        cleaner.load_rules(cleaner.suffixes, cleaner.extras, cleaner.shortStreets, self._rulesFile)
+        cleaner.rulesChanged()
+        self._rulesTime = changed
+        self._stats["rulesLoaded"] += 1
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            rows = len(batch[0].rows)
+            deadline = timer() + self._wait
+            while rows < self._maxRows:
+                try: # the requests already waiting, then the ones arriving before the deadline
+                    request = self._queue.get(timeout=max(deadline - timer(), 0)) if self._wait > 0 else\
+                        self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                batch.append(request)
+                rows += len(request.rows)
+            self._cleanBatch(batch)
+
+    def _cleanBatch(self, batch):
+        """
+        Cleans the rows of requests together, a row that cannot be cleaned is answered with its error
+        :param batch: PendingRequest of each request
+        """
+        start = timer()
+        try:
+            self._loadRules()
+        except Exception: # a rules file being written can be read half way, the rules loaded are kept
+            traceback.print_exc()
+        rows = [row for request in batch for row in request.rows]
+        try:
+            answers = [cleanedFields(address) for address in cleaner.cleanChunk(rows)]
+        except Exception: # cleaned again one at a time, so only the row that failed is answered with an error
+            answers = []
+            for row in rows:
+                try:
+                    answers.append(cleanedFields(cleaner.cleanChunk([row])[0]))
+                except Exception as error:
+                    answers.append({"error": repr(error)})
+        position = 0
+        for request in batch:
+            request.answers = answers[position:position + len(request.rows)]
+            position += len(request.rows)
+            request.done.set()
+        with self._lock:
+            self._stats["requests"] += len(batch)
+            self._stats["rows"] += len(rows)
+            self._stats["batches"] += 1
+            self._stats["largestBatch"] = max(self._stats["largestBatch"], len(rows))
+            self._stats["cleaningSeconds"] += timer() - start
+
+
+# inner class for the requests of the server, POST /clean with JSON lines of rows, GET /stats for the batches so far
+class CleanHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1" # connections are kept open between requests
+    disable_nagle_algorithm = True # the body is written after the headers, otherwise held until they are acknowledged
+
+    def do_POST(self):
+        if self.path != "/clean":
+            self.reply(404, {"error": "POST rows to /clean"})
+            return
+        length = self.headers.get("Content-Length")
+        if length is None: # the body is not read, the connection cannot be used for another request
+            self.close_connection = True
+            self.reply(411, {"error": "Content-Length is required"})
+            return
+        if not (length.isascii() and length.isdigit()):
+            self.close_connection = True
+            self.reply(400, {"error": "Content-Length must be a number of bytes"})
+            return
+        if int(length) > MAX_REQUEST_BYTES:
+            self.close_connection = True
+            self.reply(413, {"error": "Requests can have at most {} bytes".format(MAX_REQUEST_BYTES)})
+            return
+        body = self.rfile.read(int(length))
+        try:
+            rows = [requestRow(json.loads(line)) for line in body.decode("utf-8").splitlines() if line.strip()]
+        except ValueError as error: # not JSON, or not a row
+            self.reply(400, {"error": str(error)})
+            return
+        if len(rows) > MAX_REQUEST_ROWS:
+            self.reply(413, {"error": "Requests can have at most {} rows".format(MAX_REQUEST_ROWS)})
+            return
+        answers = self.server.batcher.clean(rows) if len(rows) > 0 else []
+        self.send(200, "".join(json.dumps(answer, ensure_ascii=False) + "\n" for answer in answers),
+                  "application/x-ndjson")
+
+    def do_GET(self):
+        if self.path != "/stats":
+            self.reply(404, {"error": "GET /stats, or POST rows to /clean"})
+            return
+        self.reply(200, self.server.batcher.stats())
+
+    def reply(self, status, answer):
+        self.send(status, json.dumps(answer) + "\n", "application/json")
+
+    def send(self, status, text, contentType):
+        data = text.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", contentType + "; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        if self.close_connection:
+            self.send_header("Connection", "close")
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            BaseHTTPRequestHandler.log_message(self, format, *args)
+
+
+# inner class for the server, each connection has a thread that waits for the batcher to clean its rows
+class CleanServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128 # connections waiting to be accepted, many clients can connect at once
+
+    def __init__(self, address, batcher, verbose=False):
+        ThreadingHTTPServer.__init__(self, address, CleanHandler)
+        self.batcher = batcher
+        self.verbose = verbose
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description="Cleans addresses sent as JSON lines to POST /clean, the rules stay "
+                                                 "loaded between requests")
+    parser.add_argument("--host", default="127.0.0.1", help="address to listen on, defaults to this computer only")
+    parser.add_argument("--port", type=int, default=8020, help="port to listen on, defaults to 8020")
+    parser.add_argument("--rules", default="Rules.txt",
+                        help="rules file, defaults to Rules.txt, loaded again whenever it changes")
+    parser.add_argument("--max-batch", type=int, default=500, help="most rows cleaned together in a batch")
+    parser.add_argument("--wait", type=float, default=0,
+                        help="milliseconds a batch waits for more requests, by default only the requests already "
+                             "waiting are cleaned together")
+    parser.add_argument("--batch", action="store_true", help="score the words of each batch together with NumPy")
+    parser.add_argument("--verbose", action="store_true", help="print every request")
+    options = parser.parse_args(args)
+
+    if options.batch and not cleaner.useBatchScoring():
+        print("NumPy is not installed, words are scored one at a time")
+    batcher = RequestBatcher(options.rules, max(options.max_batch, 1), options.wait / 1000)
+    server = CleanServer((options.host, options.port), batcher, options.verbose)
+    print("Cleaning addresses POSTed to http://{}:{}/clean, press Ctrl+C to stop".format(*server.server_address[:2]))
+    sys.stdout.flush()
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,4 +1,5 @@
-from openpyxl import load_workbook, Workbook
+from openpyxl import Workbook
+from AddressCleaner import XlsxSheet
 #from openpyxl.cell import WriteOnlyCell
 #import openpyxl.cell
 from timeit import default_timer as timer
@@ -6,20 +7,23 @@ import os.path
 from datetime import datetime
 
 
-def initializeAssets():
+def initializeAssets(sheet):
     """
     Initialize the assets from the report
     :param sheet: The worksheet of the report
-    :param columns: Columns to scan through
     :return: List of all assets
     """
     assets = []
-    sheet = workbook["Combined Device List"]
+    columns = ["Found Device Name\n(workstations)", "Owner Name Full\n(from AD)", "Classification", "Type",
+               "Last Logon Date"]
+    # only these columns are read from each row, with the one 4 right of the owner saying if the user was verified
+    sheet.select(columns + [findCol(columns[1], sheet["5"]) + 4])
     assetCol = findCol("Found Device Name\n(workstations)", sheet["5"])
     userCol = findCol("Owner Name Full\n(from AD)", sheet["5"])
     statusCol = findCol("Classification", sheet["5"])
     typeCol = findCol("Type", sheet["5"])
     dateCol = findCol("Last Logon Date", sheet["5"])
+    verifiedCol = len(columns)
 
 
     for row in sheet.iter_rows(min_row=6):
@@ -59,7 +63,7 @@ def initializeAssets():
                 asset.flags["USER"] += "[User with inactive asset]"
             asset.report = True
 
-            asset.verified = "same" in str(row[userCol + 4].value).strip().lower()
+            asset.verified = "same" in str(row[verifiedCol].value).strip().lower()
 
             if asset.verified:
                 asset.specialNote += "[Verified user]"
@@ -92,9 +96,11 @@ def compareAndMerge(sheet, columns, assets, isEmerge):
     :param sheet: the spreadsheet
     """
 
+    sheet.select(list(columns) + [3, 4]) # only these columns are read from each row, D and E describe the device
     assetCol = findCol(columns[0], sheet["1"])
     userCol = findCol(columns[1], sheet["1"])
     statusCol = findCol(columns[2], sheet["1"])
+    descCol = len(columns)
 
     # DATA VALIDATION - check if the address is valid itself
     # if the address is valid, check if it is consistent
@@ -194,8 +200,8 @@ def compareAndMerge(sheet, columns, assets, isEmerge):
                             asset.valid = True
 
                 #if not isEmerge: # if in JDE, make sure it is not a monitor
-                descA = str(row[3].value).lower()
-                descB = str(row[4].value).lower()
+                descA = str(row[descCol].value).lower()
+                descB = str(row[descCol + 1].value).lower()
 
                 if any(word in descA for word in ["monitor", "lcd", '"', "scanner", "led", "phone"]) or any(word in descB for word in ["monitor", "lcd", '"', "scanner", "led", "phone"]):
                     asset.workstation = False
@@ -454,35 +460,37 @@ jdeFile = "redacted.xlsx"
 reportFile = "report.xlsx"
 
 print("Opening workbook")
-workbook = load_workbook(filename=reportFile, read_only=True)
+sheet = XlsxSheet(reportFile, "Combined Device List", headerRow=5) # the header is on row 5 of the report
 
 print("Workbook finished loading")
 print(timer() - start)
 print("Scanning sheets")
-assets = initializeAssets()
+assets = initializeAssets(sheet)
 print(len(assets))
 print("Workbook closed")
-workbook.close()
+sheet.close()
 
 print("Opening workbook")
-workbook = load_workbook(filename=jdeFile, read_only=True)
+columns = ("Name", "Device Owner Name", "Equipment Status")
+sheet = XlsxSheet(jdeFile, "Sheet1")
 print("Workbook finished loading")
 print(timer() - start)
 print("Scanning sheets")
-compareAndMerge(workbook["Sheet1"], ("Name", "Device Owner Name", "Equipment Status"), assets, False)
+compareAndMerge(sheet, columns, assets, False)
 print(len(assets))
 print("Workbook closed")
-workbook.close()
+sheet.close()
 
 print("Opening workbook")
-workbook = load_workbook(filename=emergeFile, read_only=True)
+columns = ("Asset Tag", "Employee Name", "Asset Status")
+sheet = XlsxSheet(emergeFile, "redacted")
 print("Workbook finished loading")
 print(timer() - start)
 print("Scanning sheets")
-compareAndMerge(workbook["redacted"], ("Asset Tag", "Employee Name", "Asset Status"), assets, True)
+compareAndMerge(sheet, columns, assets, True)
 print(len(assets))
 print("Workbook closed")
-workbook.close()
+sheet.close()
 
 flagIssues(assets)
 print("FINISHED WITH ASSETS")
@@ -0,0 +1,126 @@
+# AddressGenerator.py
+# Makes seeded rows of Canadian addresses in the template format for the benchmarks
+# The same seed always gives the same rows, so timings of different runs are of the same input
+
+import random
+
+PROVINCES = ["ON", "ON", "ON", "QC", "QC", "QC", "BC", "BC", "AB", "AB", "MB", "SK", "NS", "NB", "NL", "PE"]
+ENGLISH_SUFFIXES = ["STREET", "ST", "ST.", "AVENUE", "AVE", "AV", "ROAD", "RD", "DRIVE", "DR", "CRESCENT", "CRES",
+                    "COURT", "CRT", "WAY", "BOULEVARD", "BLVD", "PLACE", "PL", "LANE", "LN", "PARKWAY", "PKWY",
+                    "HIGHWAY", "HWY", "TERRACE", "CIRCLE", "TRAIL", "GATE"]
+FRENCH_SUFFIXES = ["RUE", "CHEMIN", "CH", "BOULEVARD", "BOUL", "BOUL.", "AVENUE", "AV", "ROUTE", "RANG", "MONTEE",
+                   "MONTÉE", "PLACE", "RUELLE", "TERRASSE", "COTE", "PROMENADE"]
+ENGLISH_NAMES = ["MAIN", "KING", "QUEEN", "BANK", "ELGIN", "MAPLE", "CHURCH", "VICTORIA", "LAKESHORE", "HUNT CLUB",
+                 "BAY", "YONGE", "DUNDAS", "WELLINGTON", "OAK", "PINE", "CEDAR", "BIRCH", "RIVERSIDE", "HILLCREST",
+                 "MOUNTAIN", "PRINCE OF WALES", "JOHN", "GEORGE", "ALBERT", "CARLING", "BRONSON", "RIDEAU"]
+FRENCH_NAMES = ["PRINCIPALE", "DU PARC", "NOTRE-DAME", "DES ERABLES", "DE L'EGLISE", "SHERBROOKE", "LAURIER",
+                "CHAMPLAIN", "DU LAC", "DES PINS", "MONT-ROYAL", "DE LA GAUCHETIERE", "BEAUBIEN", "JEAN-TALON",
+                "SAINT-DENIS", "HOCHELAGA", "DU FLEUVE", "DES PRAIRIES"]
+SAINT_NAMES = ["ST CLAIR", "ST-LAURENT", "STE-CATHERINE", "ST. GEORGE", "STE ANNE", "ST-JEAN", "SAINT-JOSEPH",
+               "SAINTE-FOY", "ST PAUL", "STE-THERESE", "ST-HUBERT", "ST. JOHNS"]
+ENGLISH_ORDINALS = ["1ST", "2ND", "3RD", "4TH", "5TH", "10TH", "11TH", "12TH", "21ST", "22ND", "23RD", "101ST"]
+FRENCH_ORDINALS = ["1RE", "1ERE", "1ER", "2E", "3E", "4E", "5IEME", "10E", "2EME", "3IEME"]
+DIRECTIONS = ["N", "S", "E", "W", "NORTH", "SOUTH", "EAST", "WEST", "NE", "SW"]
+FRENCH_DIRECTIONS = ["O", "E", "N", "S", "OUEST", "EST", "NORD", "SUD"]
+UNITS = ["SUITE {}", "UNIT {}", "APT {}", "# {}", "FLOOR {}", "RM {}", "BUREAU {}", "LOCAL {}", "{}E ETAGE"]
+BRACKETED = ["(REAR)", "(BACK DOOR)", "(SHIPPING)", "(C/O ACCOUNTS PAYABLE)", "(LOADING DOCK)", "(2ND FLOOR)",
+             "(BUREAU 300)", "(ENTREE ARRIERE)"]
+PO_BOXES = ["PO BOX {}", "P.O. BOX {}", "P O BOX {}", "BOX {}", "CP {}", "C.P. {}", "CASE POSTALE {}",
+            "PO BOX {} STN MAIN", "CP {} SUCC CENTRE-VILLE"]
+
+
+def generateRows(count, seed=2020):
+    """
+    Makes rows of English and French (QC) addresses with the cases the cleaner has rules for: PO boxes, junctions,
+    ordinals, bracketed external info, saint names, directions and units
+    :param count: Number of rows
+    :param seed: Seed of the random number generator
+    :return: (AddressLine1, AddressLine2, Province) of each row
+    """
+    rand = random.Random(seed)
+    rows = []
+    for i in range(count):
+        prov = rand.choice(PROVINCES)
+        french = prov == "QC"
+        kind = rand.random()
+        if kind < 0.06: # PO box, sometimes after the street address
+            line1 = rand.choice(PO_BOXES).format(rand.randint(1, 9999))
+            if rand.random() < 0.3:
+                line1 = streetAddress(rand, french) + " " + line1
+        elif kind < 0.10: # junction of two streets
+            line1 = "{} {} {} {}".format(streetName(rand, french), rand.choice(["&", "/", "AND"]),
+                                         streetName(rand, french), rand.choice(["", "CORNER"])).strip()
+        else:
+            line1 = streetAddress(rand, french)
+        if rand.random() < 0.08:
+            line1 += " " + rand.choice(BRACKETED)
+        if rand.random() < 0.05:
+            line1 = line1.replace(" ", ", ", 1) # "123, MAIN ST"
+        rows.append((line1, extraLine(rand), prov))
+    return rows
+
+
+def streetAddress(rand, french):
+    """
+    Makes a civic number, a street and sometimes a unit
+    :param rand: Random number generator
+    :param french: Make a QC address
+    :return: AddressLine1
+    """
+    number = str(rand.randint(1, 99999) if rand.random() < 0.2 else rand.randint(1, 3000))
+    if rand.random() < 0.05:
+        number += rand.choice(["A", "B", "-A", " 1/2"])
+    if rand.random() < 0.1: # unit before the number, "12-345 MAIN ST"
+        number = str(rand.randint(1, 2500)) + "-" + number
+    line = number + " " + streetName(rand, french)
+    if rand.random() < 0.1:
+        line += " " + rand.choice(UNITS).format(rand.randint(1, 1500))
+    return line
+
+
+def streetName(rand, french):
+    """
+    Makes a street with its suffix on the side its language puts it, sometimes with a direction
+    :param rand: Random number generator
+    :param french: Make a QC street
+    :return: The street
+    """
+    kind = rand.random()
+    if french:
+        if kind < 0.15:
+            name = rand.choice(FRENCH_ORDINALS)
+        elif kind < 0.35:
+            name = rand.choice(SAINT_NAMES)
+        else:
+            name = rand.choice(FRENCH_NAMES)
+        street = rand.choice(FRENCH_SUFFIXES) + " " + name
+        if rand.random() < 0.1:
+            street += " " + rand.choice(FRENCH_DIRECTIONS)
+        return street
+
+    if kind < 0.15:
+        name = rand.choice(ENGLISH_ORDINALS)
+    elif kind < 0.25:
+        name = rand.choice(SAINT_NAMES)
+    else:
+        name = rand.choice(ENGLISH_NAMES)
+    street = name + " " + rand.choice(ENGLISH_SUFFIXES)
+    if rand.random() < 0.15:
+        street += " " + rand.choice(DIRECTIONS)
+    return street
+
+
+def extraLine(rand):
+    """
+    Makes the AddressLine2 of a row, empty most of the time
+    :param rand: Random number generator
+    :return: AddressLine2 or None
+    """
+    kind = rand.random()
+    if kind < 0.6:
+        return None
+    if kind < 0.85:
+        return rand.choice(UNITS).format(rand.randint(1, 1500))
+    if kind < 0.92:
+        return rand.choice(BRACKETED)
+    return rand.choice(PO_BOXES).format(rand.randint(1, 9999))
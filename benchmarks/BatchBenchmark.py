@@ -0,0 +1,72 @@
+# BatchBenchmark.py
+# Checks BatchScorer gives exactly the factors of calcSuffixFactor and scoreExtFactor for the words of generated
+# addresses and for words of random symbols, with the shipped rules and with thousands of suffixes, then times scoring
+# the words each way and cleaning rows with batch scoring off and on
+# Needs NumPy. Run from a folder containing Rules.txt, e.g. "cd dist && python ../benchmarks/BatchBenchmark.py 20000"
+
+import os
+import sys
+import random
+from timeit import default_timer as timer
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import AddressCleaner
+from AddressGenerator import generateRows
+from ParallelBenchmark import summary
+from SuffixBenchmark import randomRule
+from SymbolBenchmark import randomWords
+
+
+def main():
+    AddressCleaner.load_rules(AddressCleaner.suffixes, AddressCleaner.extras, AddressCleaner.shortStreets)
+    AddressCleaner.rulesChanged()
+    if not AddressCleaner.useBatchScoring():
+        raise RuntimeError("NumPy is not installed")
+    AddressCleaner.useBatchScoring(False)
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    rows = generateRows(count)
+    words = sorted({word for line1, line2, prov in rows for word in (str(line1) + " " + str(line2)).split()})
+    # random words reach the symbol factors, and a lone surrogate can be read from a broken file
+    words += randomWords(count) + ["\ud800", "ST\ud800REET", ""]
+    rand = random.Random(2020)
+
+    print("%8s %7s %8s %14s %14s %8s %12s %12s" % ("suffixes", "extras", "words", "scalar (w/s)", "batch (w/s)",
+                                                   "speedup", "clean off", "clean on"))
+    for suffixCount in [len(AddressCleaner.suffixes), 1000, 4000, 16000]:
+        while len(AddressCleaner.suffixes) < suffixCount:
+            suffix, factors = randomRule(rand)
+            AddressCleaner.suffixes.setdefault(suffix, factors)
+        while len(AddressCleaner.extras) < suffixCount // 40: # more external info rules as well
+            AddressCleaner.extras.append("".join(rand.choice("ABCDEFGHILMNOPRSTUZ") for i in range(rand.randint(2, 9))))
+        AddressCleaner.rulesChanged()
+
+        start = timer()
+        scalar = ([AddressCleaner.calcSuffixFactor(word) for word in words],
+                  [AddressCleaner.scoreExtFactor(word) for word in words])
+        scalarTime = timer() - start
+        start = timer()
+        batch = AddressCleaner.BatchScorer(AddressCleaner.compiledRules).score(words)
+        batchTime = timer() - start
+        for name, expected, found in zip(["calcSuffixFactor", "scoreExtFactor"], scalar, batch):
+            wrong = [(word, old, new) for word, old, new in zip(words, expected, found) if old != new]
+            if len(wrong) > 0:
+                raise AssertionError("BatchScorer does not match " + name + " for " + str(len(wrong)) +
+                                     " words, such as " + str(wrong[:5]))
+
+        cleaned = []
+        for on in [False, True]:
+            AddressCleaner.useBatchScoring(on)
+            AddressCleaner.rulesChanged() # nothing remembered from the last run
+            start = timer()
+            cleaned.append(([summary(address) for address in AddressCleaner.cleanChunk(rows)], timer() - start))
+        AddressCleaner.useBatchScoring(False)
+        if cleaned[0][0] != cleaned[1][0]:
+            raise AssertionError("Rows are cleaned differently with batch scoring and " + str(suffixCount) +
+                                 " suffixes")
+        print("%8d %7d %8d %14.0f %14.0f %7.1fx %11.2fs %11.2fs" % (
+            len(AddressCleaner.suffixes), len(AddressCleaner.extras), len(words), len(words) / scalarTime,
+            len(words) / batchTime, scalarTime / batchTime, cleaned[0][1], cleaned[1][1]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+# BenchmarkSuite.py
+# Times the steps of cleaning on generated addresses at several sizes and saves the results to a JSON file,
+# a previous JSON file can be given to flag the steps that got slower
+# Run from a folder containing Rules.txt, e.g.
+# "cd dist && python ../benchmarks/BenchmarkSuite.py --output after.json --compare before.json --threshold 0.1"
+
+import os
+import sys
+import json
+import argparse
+import platform
+import tempfile
+from timeit import default_timer as timer
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from openpyxl import Workbook
+import AddressCleaner
+from AddressGenerator import generateRows
+
+
+def clearCaches():
+    AddressCleaner.tokenCache.clear()
+    AddressCleaner.extCache.clear()
+
+
+def best(run, repeat, setup=None):
+    """
+    Times a step, the caches are cleared before each run so every run does the same work
+    :param run: Function doing the step once
+    :param repeat: Number of runs
+    :param setup: Function called before each run without being timed
+    :return: Fastest time in seconds
+    """
+    fastest = None
+    for i in range(repeat):
+        clearCaches()
+        if setup is not None:
+            setup()
+        start = timer()
+        run()
+        took = timer() - start
+        if fastest is None or took < fastest:
+            fastest = took
+    return fastest
+
+
+def benchmarks(rows):
+    """
+    Makes the steps timed for a set of rows
+    :param rows: (AddressLine1, AddressLine2, Province) of each row
+    :return: list of (name, number of items, function doing the step once, setup of each run or None)
+    """
+    cells = [(AddressCleaner.ValueCell(line1), AddressCleaner.ValueCell(line2), AddressCleaner.ValueCell(prov))
+             for line1, line2, prov in rows]
+    words = [word for line1, line2, prov in rows for word in (str(line1) + " " + str(line2)).split()]
+    suffixWords = [AddressCleaner.removeSymbols(word) for word in words]
+    structured = []
+    sheets = []
+
+    def suffixFactor():
+        for word in suffixWords:
+            AddressCleaner.calcSuffixFactor(word)
+
+    def extFactor():
+        for word in words:
+            AddressCleaner.calcExtFactor(word)
+
+    def ordinal():
+        for word in words:
+            AddressCleaner.checkOrdinal(word)
+
+    def structure():
+        for row in cells:
+            AddressCleaner.structureAddress(0, 2, row)
+
+    def validate():
+        for address in structured:
+            if "INVALID" not in address.flag.address:
+                AddressCleaner.validate(address)
+
+    def scanWrite():
+        count, fileName = AddressCleaner.write(os.path.join(tempfile.mkdtemp(), "Cleaned.xlsx"),
+                                               AddressCleaner.scan(sheets[0]))
+        os.remove(fileName)
+
+    def restructure(): # validate changes the addresses, so each run is given new ones
+        structured[:] = [AddressCleaner.structureAddress(0, 2, row) for row in cells]
+
+    def makeSheet(): # in memory, so reading the rows is timed but not reading a file
+        workbook = Workbook()
+        sheet = workbook.active
+        sheet.append(["AddressLine1", "AddressLine2", "Province"])
+        for row in rows:
+            sheet.append(list(row))
+        sheets[:] = [sheet]
+
+    return [("calcSuffixFactor", len(suffixWords), suffixFactor, None),
+            ("calcExtFactor", len(words), extFactor, None),
+            ("checkOrdinal", len(words), ordinal, None),
+            ("structureAddress", len(rows), structure, None),
+            ("validate", len(rows), validate, restructure),
+            ("scan+write", len(rows), scanWrite, makeSheet)]
+
+
+def runSuite(sizes, repeat, seed):
+    """
+    Times each step at each size
+    :param sizes: Numbers of rows
+    :param repeat: Runs of each step, the fastest is kept
+    :param seed: Seed of the generated rows
+    :return: Results keyed by "step/rows"
+    """
+    results = {}
+    for size in sizes:
+        rows = generateRows(size, seed)
+        for name, items, run, setup in benchmarks(rows):
+            fastest = best(run, repeat, setup)
+            key = name + "/" + str(size)
+            results[key] = {"seconds": fastest, "items": items, "usPerItem": fastest / items * 1000000}
+            print("%-24s %10d %10.4f %12.2f" % (key, items, fastest, fastest / items * 1000000))
+    return results
+
+
+def compare(results, previous, threshold):
+    """
+    Finds the steps that are slower than in a previous run by more than the threshold
+    :param results: Results of this run
+    :param previous: Results of the previous run
+    :param threshold: Fraction slower to count as a regression, 0.1 is 10% slower
+    :return: list of (step, previous seconds, seconds)
+    """
+    regressions = []
+    print("%-24s %10s %10s %8s" % ("step/rows", "before", "after", "change"))
+    for key in sorted(results):
+        if key not in previous:
+            continue
+        before = previous[key]["seconds"]
+        after = results[key]["seconds"]
+        change = after / before - 1 if before > 0 else 0
+        regressed = change > threshold
+        if regressed:
+            regressions.append((key, before, after))
+        print("%-24s %10.4f %10.4f %+7.1f%%%s" % (key, before, after, change * 100, "  REGRESSION" if regressed else ""))
+    return regressions
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description="Times the steps of cleaning on generated addresses")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000], help="numbers of rows to time")
+    parser.add_argument("--repeat", type=int, default=3, help="runs of each step, the fastest is kept")
+    parser.add_argument("--seed", type=int, default=2020, help="seed of the generated addresses")
+    parser.add_argument("--output", default="benchmark.json", help="JSON file to save the results to")
+    parser.add_argument("--compare", help="JSON file of a previous run to compare with")
+    parser.add_argument("--threshold", type=float, default=0.1,
+                        help="fraction slower than the previous run to flag, defaults to 0.1 (10%%)")
+    options = parser.parse_args(args)
+
+    AddressCleaner.load_rules(AddressCleaner.suffixes, AddressCleaner.extras, AddressCleaner.shortStreets)
+    AddressCleaner.rulesChanged()
+
+    print("%-24s %10s %10s %12s" % ("step/rows", "items", "seconds", "us/item"))
+    results = runSuite(options.sizes, options.repeat, options.seed)
+    with open(options.output, "w") as file:
+        json.dump({"python": platform.python_version(), "platform": platform.platform(), "seed": options.seed,
+                   "repeat": options.repeat, "results": results}, file, indent=2)
+    print("Results saved to", os.path.abspath(options.output))
+
+    if options.compare is None:
+        return 0
+    with open(options.compare) as file:
+        previous = json.load(file)
+    if previous.get("seed") != options.seed:
+        print("Warning: the previous run used seed", previous.get("seed"), "so the inputs are not the same")
+    regressions = compare(results, previous["results"], options.threshold)
+    if len(regressions) > 0:
+        print(len(regressions), "steps are more than {:.0f}% slower".format(options.threshold * 100))
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,99 @@
+# CsvBenchmark.py
+# Times cleaning the same rows from an excel sheet and from a CSV file, and checks both give the same addresses
+# Run from a folder containing Rules.txt, e.g. "cd dist && python ../benchmarks/CsvBenchmark.py 100000"
+
+import os
+import sys
+import csv
+import tempfile
+from timeit import default_timer as timer
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from openpyxl import load_workbook
+import AddressCleaner
+from ParallelBenchmark import sampleRows
+from StreamingBenchmark import makeSheet
+
+
+def makeCsv(fileName, count):
+    """
+    Writes the rows of makeSheet to a CSV file
+    :param fileName: File to write
+    :param count: Number of rows
+    """
+    with open(fileName, "w", newline="", encoding="utf-8-sig") as file:
+        writer = csv.writer(file)
+        writer.writerow(["Unique ID", "AddressLine1", "AddressLine2", "Province"])
+        done = 0
+        while done < count:
+            for row in sampleRows(min(100000, count - done), seed=done):
+                done += 1
+                writer.writerow([done, row[0], row[1], row[2]])
+
+
+def clean(fileName, outFileName):
+    """
+    Reads, cleans and writes a file the way the command line does
+    :param fileName: Excel or CSV file to clean
+    :param outFileName: File to write
+    :return: Seconds taken
+    """
+    AddressCleaner.tokenCache.clear()
+    AddressCleaner.extCache.clear()
+    start = timer()
+    if fileName.endswith(".csv"):
+        workbook = sheet = AddressCleaner.CsvSheet(fileName)
+    else:
+        workbook = load_workbook(filename=fileName, read_only=True)
+        sheet = workbook["Sheet1"]
+    AddressCleaner.write(outFileName, AddressCleaner.scanRows(sheet))
+    workbook.close()
+    return timer() - start
+
+
+def readCleaned(fileName):
+    """
+    Reads the rows written by write or writeCsv, empty cells are read as "" and dropped from the end of a row
+    :param fileName: File written
+    :return: list of rows
+    """
+    if fileName.endswith(".csv"):
+        with open(fileName, newline="", encoding="utf-8-sig") as file:
+            rows = list(csv.reader(file))
+    else:
+        workbook = load_workbook(filename=fileName, read_only=True)
+        rows = [["" if value is None else str(value) for value in row] for row in workbook["Flags"].values]
+        workbook.close()
+    for row in rows:
+        while len(row) > 0 and row[-1] == "":
+            row.pop()
+    return rows
+
+
+def main():
+    AddressCleaner.load_rules(AddressCleaner.suffixes, AddressCleaner.extras, AddressCleaner.shortStreets)
+    AddressCleaner.rulesChanged()
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    folder = tempfile.mkdtemp()
+    xlsxName = os.path.join(tempfile.gettempdir(), "AddressStreaming" + str(count) + ".xlsx")
+    csvName = os.path.join(tempfile.gettempdir(), "AddressStreaming" + str(count) + ".csv")
+    if not os.path.isfile(xlsxName):
+        makeSheet(xlsxName, count)
+    if not os.path.isfile(csvName):
+        makeCsv(csvName, count)
+
+    print("%8s %10s %10s %10s" % ("format", "rows", "seconds", "rows/sec"))
+    results = {}
+    for name, inName in [("xlsx", xlsxName), ("csv", csvName)]:
+        outName = os.path.join(folder, "Cleaned." + name)
+        took = clean(inName, outName)
+        results[name] = (took, readCleaned(outName))
+        print("%8s %10d %10.2f %10.0f" % (name, count, took, count / took))
+
+    if results["csv"][1] != results["xlsx"][1]:
+        raise AssertionError("CSV and excel files were not cleaned the same")
+    print("csv is %.2fx the speed of xlsx" % (results["xlsx"][0] / results["csv"][0]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+# ImportBenchmark.py
+# Times importing the engine, the command line and the GUI in new interpreters, and checks which heavy modules each
+# import brings in, importing the engine must not load openpyxl or PySimpleGUI or read the rules
+# Run from a folder containing Rules.txt, e.g. "cd dist && python ../benchmarks/ImportBenchmark.py", a folder of other
+# versions of the program files can be given to compare with, e.g. "python ../benchmarks/ImportBenchmark.py before"
+
+import os
+import sys
+import json
+import subprocess
+
+HEAVY = ["openpyxl", "PySimpleGUI", "concurrent.futures.process", "tkinter"]
+MODULES = ["AddressCleaner", "AddressCLI", "Address"]
+CODE = """import sys
+from timeit import default_timer as timer
+sys.path.insert(0, {folder!r})
+start = timer()
+import {module}
+took = timer() - start
+print({json!r}.format(took, [name for name in {heavy!r} if name in sys.modules]))
+"""
+
+
+def coldImport(folder, module, repeat):
+    """
+    Imports a module in new interpreters, so nothing is already loaded
+    :param folder: Folder of the program files
+    :param module: Name of the module
+    :param repeat: Number of imports, the fastest is kept
+    :return: Fastest seconds, list of heavy modules loaded by the import
+    """
+    code = CODE.format(folder=folder, module=module, heavy=HEAVY, json='{{"seconds": {}, "loaded": {}}}')
+    fastest = None
+    loaded = []
+    for i in range(repeat):
+        output = subprocess.run([sys.executable, "-c", code], stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                universal_newlines=True)
+        if output.returncode != 0:
+            raise RuntimeError("Importing " + module + " failed\n" + output.stderr)
+        result = json.loads(output.stdout.strip().splitlines()[-1].replace("'", '"'))
+        if fastest is None or result["seconds"] < fastest:
+            fastest = result["seconds"]
+        loaded = result["loaded"]
+    return fastest, loaded
+
+
+def main():
+    folders = [os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")]
+    if len(sys.argv) > 1:
+        folders.insert(0, os.path.abspath(sys.argv[1]))
+
+    print("%-40s %-16s %10s  %s" % ("folder", "module", "ms", "heavy modules loaded"))
+    for folder in folders:
+        for module in MODULES:
+            took, loaded = coldImport(os.path.abspath(folder), module, 5)
+            print("%-40s %-16s %10.1f  %s" % (os.path.abspath(folder)[-40:], module, took * 1000,
+                                              ", ".join(loaded) or "-"))
+
+    took, loaded = coldImport(os.path.abspath(folders[-1]), "AddressCleaner", 1)
+    if "openpyxl" in loaded or "PySimpleGUI" in loaded:
+        raise AssertionError("Importing AddressCleaner loaded " + ", ".join(loaded))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+# IncrementalBenchmark.py
+# Cleans generated rows once to save a RowStore, changes a few percent of the rows, then checks the next run gives the
+# same addresses as cleaning every row again and times both, for scan and for scanParallel. Also checks that nothing is
+# reused once the rules change
+# Run from a folder containing Rules.txt, e.g. "cd dist && python ../benchmarks/IncrementalBenchmark.py 50000 0.03"
+
+import os
+import sys
+import csv
+import random
+import shutil
+import tempfile
+from timeit import default_timer as timer
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import AddressCleaner
+from AddressGenerator import generateRows
+from ParallelBenchmark import summary
+
+
+def writeRows(fileName, rows):
+    """
+    Writes rows to a CSV file in the template format
+    :param fileName: File to write
+    :param rows: (AddressLine1, AddressLine2, Province) of each row
+    """
+    with open(fileName, "w", newline="", encoding="utf-8-sig") as file:
+        writer = csv.writer(file)
+        writer.writerow(["AddressLine1", "AddressLine2", "Province"])
+        writer.writerows(rows)
+
+
+def run(fileName, storeName=None, workers=1):
+    """
+    Cleans a CSV file, the caches are cleared first so every word is cleaned again
+    :param fileName: CSV file
+    :param storeName: File of the RowStore, None to clean every row
+    :param workers: Number of processes
+    :return: Seconds taken, summary of each address, RowStore or None
+    """
+    AddressCleaner.tokenCache.clear()
+    AddressCleaner.extCache.clear()
+    start = timer()
+    store = None if storeName is None else AddressCleaner.RowStore(storeName)
+    sheet = AddressCleaner.CsvSheet(fileName)
+    if workers > 1:
+        addresses = AddressCleaner.scanParallel(sheet, workers, store=store)
+    else:
+        addresses = AddressCleaner.scan(sheet, store=store)
+    if store is not None:
+        store.save()
+    took = timer() - start
+    return took, [summary(address) for address in addresses], store
+
+
+def main():
+    AddressCleaner.load_rules(AddressCleaner.suffixes, AddressCleaner.extras, AddressCleaner.shortStreets)
+    AddressCleaner.rulesChanged()
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    changed = float(sys.argv[2]) if len(sys.argv) > 2 else 0.03
+    folder = tempfile.mkdtemp()
+    fileName = os.path.join(folder, "Addresses.csv")
+    storeName = os.path.join(folder, "AddressesCleaned.rows")
+
+    rows = generateRows(count)
+    writeRows(fileName, rows)
+    run(fileName, storeName)
+    rand = random.Random(2020)
+    newRows = generateRows(count, seed=2021)
+    for i in rand.sample(range(count), int(count * changed)): # the rows changed since the last run
+        rows[i] = newRows[i]
+    writeRows(fileName, rows)
+
+    print("%-10s %12s %12s %10s %12s" % ("scan", "all rows (s)", "changed (s)", "reused", "estimated (s)"))
+    for workers in [1, 2]:
+        shutil.copy(storeName, storeName + ".kept") # each run saves the store, both start from the first run
+        full, expected, store = run(fileName, None, workers)
+        incremental, cleaned, store = run(fileName, storeName, workers)
+        shutil.copy(storeName + ".kept", storeName)
+        if cleaned != expected:
+            raise AssertionError(str(sum(a != b for a, b in zip(cleaned, expected))) +
+                                 " reused rows are not the same as cleaning them again")
+        print("%-10s %12.2f %12.2f %10d %12.2f" % ("parallel" if workers > 1 else "serial", full, incremental,
+                                                   store.reused, store.savedTime))
+    print(store.summary())
+
+    AddressCleaner.shortStreets["STREET"] = "ST." # any change to the rules
+    AddressCleaner.rulesChanged()
+    took, cleaned, store = run(fileName, storeName)
+    if store.reused != 0:
+        raise AssertionError(str(store.reused) + " rows were reused after the rules changed")
+    print(store.summary())
+    shutil.rmtree(folder)
+
+
+if __name__ == "__main__":
+    main()
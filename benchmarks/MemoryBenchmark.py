@@ -0,0 +1,74 @@
+# MemoryBenchmark.py
+# Compares the memory of cleaned addresses kept as Address (slots, flags as bitmasks) with the memory they took when
+# Address kept its attributes in a __dict__ and Flag kept five sets of flag names
+# Run from a folder containing Rules.txt, e.g. "cd dist && python ../benchmarks/MemoryBenchmark.py 100000"
+
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import AddressCleaner
+from AddressGenerator import generateRows
+
+
+# inner class for flags as they were stored before bitmasks
+class SetFlag:
+    def __init__(self, flag):
+        self._number = set(flag.number)
+        self._suffix = set(flag.suffix)
+        self._street = set(flag.street)
+        self._direction = set(flag.direction)
+        self._address = set(flag.address)
+
+
+# inner class for addresses as they were stored before slots
+class DictAddress:
+    def __init__(self, address):
+        self._number = address.number
+        self._original = list(address.original)
+        self._street = address.street
+        self._suffix = address.suffix
+        self._altSuffix = address.altSuffix
+        self._direction = address.direction
+        self._french = address.french
+        self._flag = SetFlag(address.flag)
+        self._extra = address.extra
+        self._external = address.external
+        self._ordinal = address.ordinal
+        self._po = address.po
+        self._suffixNumber = address.suffixNumber
+
+
+def measure(make):
+    """
+    Finds the memory of the objects made, the strings of the addresses are shared so only the objects are counted
+    :param make: Function making the objects
+    :return: Bytes used while the objects are kept
+    """
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = make()
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del kept
+    return used
+
+
+def main():
+    AddressCleaner.load_rules(AddressCleaner.suffixes, AddressCleaner.extras, AddressCleaner.shortStreets)
+    AddressCleaner.rulesChanged()
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    cleaned = AddressCleaner.cleanChunk(generateRows(count))
+
+    old = measure(lambda: [DictAddress(address) for address in cleaned])
+    new = measure(lambda: [address.copy() for address in cleaned])
+    print("%-28s %12s %14s" % ("representation", "MB", "bytes/address"))
+    print("%-28s %12.1f %14.0f" % ("__dict__ and five sets", old / 1048576, old / count))
+    print("%-28s %12.1f %14.0f" % ("__slots__ and bitmasks", new / 1048576, new / count))
+    print("%.1fx less memory, about %.0f MB saved per million addresses" % (old / new,
+                                                                           (old - new) / count * 1000000 / 1048576))
+
+
+if __name__ == "__main__":
+    main()
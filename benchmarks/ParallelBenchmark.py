@@ -0,0 +1,68 @@
+# ParallelBenchmark.py
+# Times cleaning the same rows with 1, 2, 4, 8 and 16 processes, and checks the results match a single process scan
+# Run from a folder containing Rules.txt, e.g. "cd dist && python ../benchmarks/ParallelBenchmark.py 200000"
+
+import os
+import sys
+import random
+from timeit import default_timer as timer
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import AddressCleaner
+
+
+def sampleRows(count, seed=2020):
+    """
+    Makes rows of simple addresses
+    :param count: Number of rows
+    :param seed: Seed of the random number generator
+    :return: (AddressLine1, AddressLine2, Province) of each row
+    """
+    rand = random.Random(seed)
+    english = ["STREET", "ST", "AVENUE", "AVE", "ROAD", "RD", "DRIVE", "DR", "CRESCENT", "COURT", "WAY", "BLVD"]
+    french = ["RUE", "CHEMIN", "BOUL", "AVENUE", "ROUTE", "RANG", "MONTEE"]
+    names = ["MAIN", "KING", "QUEEN", "BANK", "ELGIN", "MAPLE", "CHURCH", "VICTORIA", "2ND", "1ST", "ST-LAURENT",
+             "NOTRE-DAME", "STE-CATHERINE", "PRINCIPALE", "DU PARC", "LAKESHORE", "HUNT CLUB"]
+    extra = [None, None, None, "SUITE 200", "UNIT 5", "BUREAU 101", "PO BOX 45", "2E ETAGE", "FLOOR 3"]
+    rows = []
+    for i in range(count):
+        prov = rand.choice(["ON", "QC", "BC", "AB", "NS"])
+        if prov == "QC":
+            line1 = "{} {} {}".format(rand.randint(1, 9999), rand.choice(french), rand.choice(names))
+        else:
+            line1 = "{} {} {}".format(rand.randint(1, 9999), rand.choice(names), rand.choice(english))
+        rows.append((line1, rand.choice(extra), prov))
+    return rows
+
+
+def summary(address):
+    return str(address), address.extra, [sorted(flags) for flags in [address.flag.number, address.flag.street,
+                                                                       address.flag.suffix, address.flag.direction,
+                                                                       address.flag.address]]
+
+
+def main():
+    AddressCleaner.load_rules(AddressCleaner.suffixes, AddressCleaner.extras, AddressCleaner.shortStreets)
+    AddressCleaner.rulesChanged()
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    rows = sampleRows(count)
+
+    start = timer()
+    expected = [summary(address) for address in AddressCleaner.cleanChunk(rows)]
+    single = timer() - start
+    print("%8s %10s %10s %9s" % ("workers", "seconds", "rows/sec", "speedup"))
+    print("%8s %10.2f %10.0f %8.2fx" % ("serial", single, count / single, 1))
+
+    for workers in [1, 2, 4, 8, 16]:
+        AddressCleaner.tokenCache.clear()
+        AddressCleaner.extCache.clear()
+        start = timer()
+        found = [summary(address) for address in AddressCleaner.cleanValues(rows, workers, chunkSize=2000)]
+        took = timer() - start
+        if found != expected:
+            raise AssertionError("Results with " + str(workers) + " processes do not match the serial scan")
+        print("%8d %10.2f %10.0f %8.2fx" % (workers, took, count / took, single / took))
+
+
+if __name__ == "__main__":
+    main()
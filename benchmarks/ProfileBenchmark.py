@@ -0,0 +1,66 @@
+# ProfileBenchmark.py
+# Checks rows are cleaned the same way with profiling on, and times cleaning with profiling off, with the stages
+# timed and with cProfile as well, profiling off must take the same time as before profiling was added
+# Run from a folder containing Rules.txt, e.g. "cd dist && python ../benchmarks/ProfileBenchmark.py 20000"
+
+import os
+import sys
+import tempfile
+from timeit import default_timer as timer
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import AddressCleaner
+from AddressGenerator import generateRows
+from ParallelBenchmark import summary
+
+
+def cleanTime(rows, profiling, profileFile=None):
+    """
+    Times cleaning rows, the caches are cleared first so every word is cleaned again
+    :param rows: (AddressLine1, AddressLine2, Province) of each row
+    :param profiling: Time the stages of cleaning
+    :param profileFile: File to save cProfile stats to, or None
+    :return: Seconds taken, summary of each address, StageTimer or None
+    """
+    AddressCleaner.tokenCache.clear()
+    AddressCleaner.extCache.clear()
+    if profiling:
+        AddressCleaner.startProfiling(profileFile)
+    start = timer()
+    try:
+        addresses = AddressCleaner.cleanChunk(rows)
+    finally:
+        took = timer() - start
+        stages = AddressCleaner.stopProfiling()
+    return took, [summary(address) for address in addresses], stages
+
+
+def main():
+    AddressCleaner.load_rules(AddressCleaner.suffixes, AddressCleaner.extras, AddressCleaner.shortStreets)
+    AddressCleaner.rulesChanged()
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    rows = generateRows(count)
+    profileFile = os.path.join(tempfile.mkdtemp(), "clean.pstats")
+
+    off, expected, stages = cleanTime(rows, False)
+    timed, cleaned, stages = cleanTime(rows, True)
+    if cleaned != expected:
+        raise AssertionError("Rows are not cleaned the same way while profiling")
+    profiled, cleaned, stages = cleanTime(rows, True, profileFile)
+    if cleaned != expected:
+        raise AssertionError("Rows are not cleaned the same way with cProfile")
+    if any(hasattr(getattr(AddressCleaner, name), "__wrapped__") for stage, names in AddressCleaner.PROFILED_STAGES
+           for name in names):
+        raise AssertionError("Timed functions were not put back after profiling")
+
+    print("%-24s %10s %10s" % ("profiling", "seconds", "overhead"))
+    print("%-24s %10.2f %10s" % ("off", off, "-"))
+    print("%-24s %10.2f %+9.1f%%" % ("stages", timed, (timed / off - 1) * 100))
+    print("%-24s %10.2f %+9.1f%%" % ("stages and cProfile", profiled, (profiled / off - 1) * 100))
+    print()
+    print(stages.text(AddressCleaner.FlagStats()))
+    os.remove(profileFile)
+
+
+if __name__ == "__main__":
+    main()
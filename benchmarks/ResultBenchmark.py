@@ -0,0 +1,90 @@
+# ResultBenchmark.py
+# Checks the rows ResultIndex finds for random filters against filtering every address, then times adding a million
+# rows, querying them and making a page of the results, as the results tab of the GUI does
+# Run from a folder containing Rules.txt, e.g. "cd dist && python ../benchmarks/ResultBenchmark.py 1000000"
+
+import os
+import sys
+import random
+from timeit import default_timer as timer
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import AddressCleaner
+from AddressCleaner import FLAG_CATEGORIES, flagNames
+from AddressGenerator import generateRows
+
+
+def matches(address, category, flag, province, french, suffix):
+    """
+    Checks an address against a filter the way ResultIndex.query should
+    :param address: Address object
+    :return: Boolean value if the address matches
+    """
+    masks = dict(zip(FLAG_CATEGORIES, address.flag.masks))
+    if flag == "VALID":
+        found = not masks[category] if category is not None else not any(masks.values())
+    elif flag is not None:
+        found = any(flag in flagNames(masks[name]) for name in ([category] if category is not None else masks))
+    else:
+        found = category is None or masks[category] != 0
+    return found and (province is None or address.province == province) and (
+        french is None or address.french == french) and (suffix is None or address.altSuffix == suffix)
+
+
+def randomFilter(results, rand):
+    """
+    Makes a filter of the values found in the results
+    :param results: ResultIndex
+    :param rand: Random number generator
+    :return: Arguments of ResultIndex.query
+    """
+    return (rand.choice([None] + FLAG_CATEGORIES), rand.choice([None, "VALID"] + results.choices("flag")),
+            rand.choice([None] + results.choices("province")), rand.choice([None, True, False]),
+            rand.choice([None, ""] + results.choices("suffix")))
+
+
+def main():
+    AddressCleaner.load_rules(AddressCleaner.suffixes, AddressCleaner.extras, AddressCleaner.shortStreets)
+    AddressCleaner.rulesChanged()
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    cleaned = AddressCleaner.cleanChunk(generateRows(min(count, 20000)))
+    rand = random.Random(2020)
+    pageRows = AddressCleaner.RESULT_PAGE_ROWS
+
+    results = AddressCleaner.ResultIndex()
+    for address in cleaned:
+        results.add(address)
+    for i in range(300):
+        filters = randomFilter(results, rand)
+        expected = [rowId for rowId, address in enumerate(cleaned) if matches(address, *filters)]
+        found = results.query(*filters)
+        for start in [0, pageRows, max(len(expected) - 1, 0), len(expected)]:
+            if len(found) != len(expected) or found.rowIds(start, start + pageRows) != expected[start:start + pageRows]:
+                raise AssertionError("ResultIndex finds other rows than the filter " + str(filters))
+    print("300 random filters found the same rows as filtering", len(cleaned), "addresses")
+
+    addresses = (cleaned * (count // len(cleaned) + 1))[:count] # the same addresses again, as many rows as asked
+    results = AddressCleaner.ResultIndex()
+    start = timer()
+    for address in addresses:
+        results.add(address)
+    print("added %d rows in %.2f s (%.2f us/row)" % (count, timer() - start, (timer() - start) / count * 1000000))
+
+    print("%-44s %10s %10s %10s %10s" % ("filter", "rows", "query (ms)", "page (ms)", "again (ms)"))
+    for filters in [(None, None, None, None, None), ("Suffix", "STRUCT", "QC", None, None),
+                    (None, "VALID", "ON", False, None), ("Street", None, None, True, "AVENUE"),
+                    (None, "SYM", None, None, "")]:
+        start = timer()
+        found = results.query(*filters)
+        query = timer() - start
+        start = timer()
+        results.page(found, len(found) // pageRows // 2) # a page in the middle, the furthest from either end
+        page = timer() - start
+        start = timer()
+        results.query(*filters)
+        again = timer() - start
+        print("%-44s %10d %10.2f %10.2f %10.3f" % (filters, len(found), query * 1000, page * 1000, again * 1000))
+
+
+if __name__ == "__main__":
+    main()
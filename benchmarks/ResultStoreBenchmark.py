@@ -0,0 +1,82 @@
+# ResultStoreBenchmark.py
+# Checks the addresses read back from a ResultStore are the addresses saved, and that its indexed filters find the same
+# rows as ResultIndex, then times inserting a million rows with transactions of different sizes, reading them back and
+# querying them by flag and by province
+# Run from a folder containing Rules.txt, e.g. "cd dist && python ../benchmarks/ResultStoreBenchmark.py 1000000"
+
+import os
+import sys
+import random
+import tempfile
+from timeit import default_timer as timer
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import AddressCleaner
+from AddressGenerator import generateRows
+from ResultBenchmark import randomFilter
+
+
+def saveRows(fileName, addresses, batchRows):
+    """
+    Saves addresses to a new ResultStore
+    :param fileName: Database to write
+    :param addresses: Address objects
+    :param batchRows: Rows inserted in each transaction
+    :return: Seconds adding the rows, seconds saving (the last rows and the indexes)
+    """
+    AddressCleaner.RESULT_STORE_ROWS = batchRows
+    start = timer()
+    store = AddressCleaner.ResultStore(fileName)
+    for address in addresses:
+        store.add(address)
+    added = timer() - start
+    start = timer()
+    store.save()
+    return added, timer() - start
+
+
+def main():
+    AddressCleaner.load_rules(AddressCleaner.suffixes, AddressCleaner.extras, AddressCleaner.shortStreets)
+    AddressCleaner.rulesChanged()
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    cleaned = AddressCleaner.cleanChunk(generateRows(min(count, 20000)))
+    fileName = os.path.join(tempfile.gettempdir(), "AddressResults.db")
+    rand = random.Random(2020)
+    batchRows = AddressCleaner.RESULT_STORE_ROWS
+
+    results = AddressCleaner.ResultIndex()
+    for address in cleaned:
+        results.add(address)
+    saveRows(fileName, cleaned, batchRows)
+    read = list(AddressCleaner.ResultStore.read(fileName))
+    if [address.__getstate__() for address in read] != [address.__getstate__() for address in cleaned]:
+        raise AssertionError("ResultStore read other addresses than were saved")
+    for i in range(100):
+        category, flag, province, french, suffix = randomFilter(results, rand)
+        found = results.query(category, flag, province)
+        expected = [cleaned[rowId].__getstate__() for rowId in found.rowIds(0, len(found))]
+        if [address.__getstate__() for address in AddressCleaner.ResultStore.read(
+                fileName, category, flag, province)] != expected:
+            raise AssertionError("ResultStore finds other rows than ResultIndex for " + str((category, flag, province)))
+    print("100 random filters found the same rows as ResultIndex in", len(cleaned), "addresses")
+
+    addresses = (cleaned * (count // len(cleaned) + 1))[:count] # the same addresses again, as many rows as asked
+    print("%10s %10s %12s %12s %12s" % ("batch rows", "rows", "insert (s)", "indexes (s)", "rows/sec"))
+    for rows in [100, 1000, batchRows, 100000]:
+        added, saved = saveRows(fileName, addresses, rows)
+        print("%10d %10d %12.2f %12.2f %12.0f" % (rows, count, added, saved, count / (added + saved)))
+    AddressCleaner.RESULT_STORE_ROWS = batchRows
+
+    start = timer()
+    read = sum(1 for address in AddressCleaner.ResultStore.read(fileName))
+    print("read %d addresses back in %.2f s" % (read, timer() - start))
+    print("%-36s %10s %10s" % ("filter", "rows", "read (s)"))
+    for filters in [("Street", "SYM", None), (None, "UNDEFINED", "QC"), (None, "VALID", None), (None, None, "ON")]:
+        start = timer()
+        found = sum(1 for address in AddressCleaner.ResultStore.read(fileName, *filters))
+        print("%-36s %10d %10.2f" % (filters, found, timer() - start))
+    os.remove(fileName)
+
+
+if __name__ == "__main__":
+    main()
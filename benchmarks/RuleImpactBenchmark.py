@@ -0,0 +1,123 @@
+# RuleImpactBenchmark.py
+# Scans generated rows into a RuleIndex, then makes the kinds of rule changes the GUI makes and checks the preview finds
+# exactly the rows that change when every row is cleaned again, and times both
+# Run from a folder containing Rules.txt, e.g. "cd dist && python ../benchmarks/RuleImpactBenchmark.py 50000"
+
+import os
+import sys
+from timeit import default_timer as timer
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import AddressCleaner
+from AddressCleaner import suffixes, extras, shortStreets
+from AddressGenerator import generateRows
+
+
+def suffixFactors(suffix, altSuffix=""):
+    """
+    Factors the GUI gives a suffix rule added by the user
+    :param suffix: Suffix
+    :param altSuffix: Preferred version of the suffix, or ""
+    :return: list of factors
+    """
+    if len(altSuffix) == 0:
+        factors = [1 / len(suffix) - 1 / len(suffix) % 0.01 for letter in suffix]
+        factors[-1] += 0.01
+        return factors
+    factors = []
+    j = 0
+    for letter in suffix:
+        if j < len(altSuffix) and letter == altSuffix[j]:
+            factors.append(1 / len(altSuffix) - 1 / len(altSuffix) % 0.01)
+            j += 1
+        else:
+            factors.append(0.07)
+    return factors
+
+
+def restore():
+    """
+    Puts back the rules loaded from the rules file
+    """
+    rules = AddressCleaner.loadedRules
+    suffixes.clear()
+    suffixes.update(rules.suffixes)
+    extras[:] = rules.extras
+    shortStreets.clear()
+    shortStreets.update(rules.shortStreets)
+    AddressCleaner.rulesChanged()
+
+
+def changes():
+    """
+    Rule changes the way the GUI makes them, the rules are restored after each
+    :return: list of (name, function making the change)
+    """
+    def addSuffix(suffix, altSuffix=""):
+        suffixes[suffix] = suffixFactors(suffix, altSuffix)
+        if len(altSuffix) > 0:
+            shortStreets[suffix] = altSuffix
+
+    def addExtra(extra):
+        extras.append(extra)
+        extras.sort()
+
+    firstSuffix = list(suffixes)[0]
+    lastSuffix = list(suffixes)[-1]
+    shortSuffix = list(shortStreets)[0]
+    return [("add suffix MONTEE", lambda: addSuffix("MONTEE")),
+            ("add suffix GROVE->GRV", lambda: addSuffix("GROVE", "GRV")),
+            ("add suffix ALLEY->ALY", lambda: addSuffix("ALLEY", "ALY")),
+            ("remove suffix " + firstSuffix, lambda: suffixes.pop(firstSuffix)),
+            ("remove suffix " + lastSuffix, lambda: suffixes.pop(lastSuffix)),
+            ("add external WING", lambda: addExtra("WING")),
+            ("add external LOBBY", lambda: addExtra("LOBBY")),
+            ("remove external " + extras[0], lambda: extras.remove(extras[0])),
+            ("prefer " + shortSuffix + "->" + shortSuffix[:2],
+             lambda: shortStreets.update({shortSuffix: shortSuffix[:2]}))]
+
+
+def main():
+    AddressCleaner.load_rules(suffixes, extras, shortStreets)
+    AddressCleaner.rulesChanged()
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    rows = generateRows(count)
+    cells = [(AddressCleaner.ValueCell(line1), AddressCleaner.ValueCell(line2), AddressCleaner.ValueCell(prov))
+             for line1, line2, prov in rows]
+
+    for mode in ["serial", "parallel"]:
+        index = AddressCleaner.RuleIndex()
+        start = timer()
+        if mode == "serial":
+            clean = index.watch(AddressCleaner.cleanRow)
+            before = [index.written(clean(0, 1, 2, row)) for row in cells]
+        else: # cleaned without recording the words, the first preview finds them
+            addresses = AddressCleaner.cleanChunk(rows)
+            index.addRows(rows, addresses)
+            before = [index.written(address) for address in addresses]
+        print("%s scan with the index: %.2f s, %d distinct rows" % (mode, timer() - start, len(index)))
+
+        print("%-28s %10s %10s %12s %12s" % ("change", "changed", "cleaned", "preview (s)", "all rows (s)"))
+        for name, change in changes():
+            change()
+            AddressCleaner.rulesChanged()
+            changed, cleaned, took = index.preview()
+
+            start = timer()
+            expected = {}
+            for row, written in zip(rows, before):
+                after = index.written(AddressCleaner.cleanRow(0, 1, 2, [AddressCleaner.ValueCell(v) for v in row]))
+                if after != written:
+                    expected[tuple(row)] = (written, after)
+            everyRow = timer() - start
+            found = {values: (written, after) for values, written, after in changed}
+            if found != expected:
+                raise AssertionError(name + ": the preview found " + str(len(found)) + " rows that change, cleaning "
+                                     "every row found " + str(len(expected)) + ", such as " +
+                                     str(list(set(found) ^ set(expected))[:3]))
+            print("%-28s %10d %10d %12.2f %12.2f" % (name, len(changed), cleaned, took, everyRow))
+            restore()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+# RulesBenchmark.py
+# Times loading rules and cleaning the first row with and without the compiled rules beside the rules file, for the
+# shipped rules and for rules files with thousands of suffixes, and checks both clean rows the same way
+# Run from a folder containing Rules.txt, e.g. "cd dist && python ../benchmarks/RulesBenchmark.py"
+
+import os
+import sys
+import json
+import random
+import shutil
+import tempfile
+from timeit import default_timer as timer
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import AddressCleaner
+from AddressGenerator import generateRows
+from ParallelBenchmark import summary
+from SuffixBenchmark import randomRule
+
+
+def start(fileName, row):
+    """
+    Loads rules the way the program starts, then cleans a row
+    :param fileName: Rules file
+    :param row: (AddressLine1, AddressLine2, Province)
+    :return: Seconds to load the rules, seconds to clean the row
+    """
+    AddressCleaner.suffixes.clear()
+    del AddressCleaner.extras[:]
+    AddressCleaner.shortStreets.clear()
+    began = timer()
+    AddressCleaner.load_rules(AddressCleaner.suffixes, AddressCleaner.extras, AddressCleaner.shortStreets, fileName)
+    AddressCleaner.rulesChanged()
+    loaded = timer()
+    AddressCleaner.cleanChunk([row])
+    return loaded - began, timer() - loaded
+
+
+def main():
+    folder = tempfile.mkdtemp()
+    with open("Rules.txt", "rb") as rulesFile:
+        text = rulesFile.read()
+    try:
+        shipped = json.loads(text.decode("utf-8"))
+    except UnicodeDecodeError:
+        shipped = json.loads(text.decode("cp1252"))
+    rows = generateRows(2000)
+    rand = random.Random(2020)
+
+    print("%8s %16s %16s %16s %16s" % ("suffixes", "load text (ms)", "load compiled", "1st row text", "1st row compiled"))
+    for count in [len(shipped["SUFFIXES"]), 1000, 4000, 16000]:
+        rules = dict(shipped)
+        rules["SUFFIXES"] = dict(shipped["SUFFIXES"])
+        while len(rules["SUFFIXES"]) < count:
+            suffix, factors = randomRule(rand)
+            rules["SUFFIXES"].setdefault(suffix, factors)
+        fileName = os.path.join(folder, "Rules" + str(count) + ".txt")
+        with open(fileName, "w", encoding="utf-8") as rulesFile:
+            json.dump(rules, rulesFile, indent=3, sort_keys=True, ensure_ascii=False)
+        compiledName = os.path.splitext(fileName)[0] + ".compiled"
+
+        if os.path.isfile(compiledName):
+            os.remove(compiledName)
+        AddressCleaner.compileRules(fileName) # made once, so the text is only timed being read and compiled below
+        text = []
+        for i in range(3):
+            shutil.move(compiledName, compiledName + ".kept")
+            text.append(start(fileName, rows[0]))
+            os.remove(compiledName) # compiled again by load_rules
+            shutil.move(compiledName + ".kept", compiledName)
+        expected = [summary(address) for address in AddressCleaner.cleanChunk(rows)]
+
+        written = os.path.getmtime(compiledName)
+        compiled = [start(fileName, rows[0]) for i in range(3)]
+        if os.path.getmtime(compiledName) != written:
+            raise AssertionError("The compiled rules of " + str(count) + " suffixes were not read, they were compiled "
+                                 "again")
+        if [summary(address) for address in AddressCleaner.cleanChunk(rows)] != expected:
+            raise AssertionError("Rows are not cleaned the same with the compiled rules of " + str(count) + " suffixes")
+        print("%8d %16.2f %16.2f %16.2f %16.2f" % (count, min(t[0] for t in text) * 1000,
+                                                   min(t[0] for t in compiled) * 1000,
+                                                   min(t[1] for t in text) * 1000,
+                                                   min(t[1] for t in compiled) * 1000))
+    shutil.rmtree(folder)
+
+
+if __name__ == "__main__":
+    main()
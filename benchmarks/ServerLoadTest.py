@@ -0,0 +1,153 @@
+# ServerLoadTest.py
+# Starts AddressServer.py, checks it answers the same as cleaning the rows in this process, then sends one address per
+# request from more and more clients at once, each on its own kept open connection, and reports the latency (p50 and
+# p99) and the requests per second of each, with batching and with every request cleaned alone (--max-batch 1). The
+# time to start a process that loads the rules and cleans one address is shown as well, what each address took before
+# Run from a folder containing Rules.txt, e.g. "cd dist && python ../benchmarks/ServerLoadTest.py 10", the number is the
+# seconds each number of clients sends requests for
+
+import os
+import sys
+import json
+import time
+import socket
+import threading
+import subprocess
+import http.client
+from timeit import default_timer as timer
+
+FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, FOLDER)
+import AddressCleaner
+from AddressServer import cleanedFields
+from AddressGenerator import generateRows
+
+CLIENTS = [1, 2, 4, 8, 16, 32]
+
+
+def freePort():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def startServer(*options):
+    """
+    Starts a server in a new process and waits until it answers
+    :param options: Options of AddressServer.py
+    :return: Process of the server, port
+    """
+    port = freePort()
+    server = subprocess.Popen([sys.executable, os.path.join(FOLDER, "AddressServer.py"), "--port", str(port)] +
+                              list(options), stdout=subprocess.DEVNULL)
+    for i in range(100):
+        try:
+            post(http.client.HTTPConnection("127.0.0.1", port), [])
+            return server, port
+        except OSError:
+            time.sleep(0.1)
+    server.kill()
+    raise RuntimeError("AddressServer.py did not start")
+
+
+def post(connection, rows):
+    """
+    Sends rows to clean on a connection
+    :param connection: HTTPConnection to the server
+    :param rows: (AddressLine1, AddressLine2, Province) of each row
+    :return: Answer of each row
+    """
+    body = "".join(json.dumps({"line1": line1, "line2": line2, "province": prov}) + "\n" for line1, line2, prov in rows)
+    connection.request("POST", "/clean", body.encode("utf-8"), {"Content-Type": "application/x-ndjson"})
+    response = connection.getresponse()
+    text = response.read().decode("utf-8")
+    if response.status != 200:
+        raise RuntimeError("The server answered " + str(response.status) + ": " + text)
+    return [json.loads(line) for line in text.splitlines()]
+
+
+def stats(port):
+    connection = http.client.HTTPConnection("127.0.0.1", port)
+    connection.request("GET", "/stats")
+    return json.loads(connection.getresponse().read().decode("utf-8"))
+
+
+def load(port, rows, clients, seconds):
+    """
+    Sends one row per request from clients at once, each client sends its next request once answered
+    :param port: Port of the server
+    :param rows: Rows to send, each client starts at a different row
+    :param clients: Number of clients
+    :param seconds: Time the clients send requests for
+    :return: Requests per second, sorted latencies in seconds, rows per batch of the server
+    """
+    latencies = [[] for client in range(clients)]
+    before = stats(port)
+    stop = timer() + seconds
+
+    def client(number):
+        connection = http.client.HTTPConnection("127.0.0.1", port)
+        found = latencies[number]
+        position = number * len(rows) // clients
+        while timer() < stop:
+            start = timer()
+            post(connection, [rows[position % len(rows)]])
+            found.append(timer() - start)
+            position += 1
+        connection.close()
+
+    threads = [threading.Thread(target=client, args=(number,)) for number in range(clients)]
+    start = timer()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    took = timer() - start
+    after = stats(port)
+    found = sorted(latency for client in latencies for latency in client)
+    batches = after["batches"] - before["batches"]
+    return len(found) / took, found, (after["rows"] - before["rows"]) / batches if batches > 0 else 0
+
+
+def percentile(latencies, fraction):
+    return latencies[min(int(fraction * len(latencies)), len(latencies) - 1)]
+
+
+def main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 10
+    AddressCleaner.load_rules(AddressCleaner.suffixes, AddressCleaner.extras, AddressCleaner.shortStreets)
+    AddressCleaner.rulesChanged()
+    rows = generateRows(5000)
+    expected = [cleanedFields(address) for address in AddressCleaner.cleanChunk(rows)]
+
+    code = ("import AddressCleaner as c; c.load_rules(c.suffixes, c.extras, c.shortStreets); c.rulesChanged(); "
+            "c.cleanChunk([{!r}])".format(tuple(rows[0])))
+    start = timer()
+    for i in range(5):
+        subprocess.run([sys.executable, "-c", code], cwd=os.getcwd(), env=dict(os.environ, PYTHONPATH=FOLDER),
+                       check=True)
+    print("a new process loading the rules and cleaning one address takes %.1f ms" % ((timer() - start) / 5 * 1000))
+
+    for name, options in [("batched", []), ("one at a time", ["--max-batch", "1"])]:
+        server, port = startServer(*options)
+        try:
+            connection = http.client.HTTPConnection("127.0.0.1", port)
+            if post(connection, rows) != expected or [post(connection, [row])[0] for row in rows[:200]] != \
+                    expected[:200]:
+                raise AssertionError("The server cleaned rows differently than cleanChunk")
+            print("\n%s: the server answered %d rows the same as cleanChunk" % (name, len(rows)))
+            print("%8s %12s %10s %10s %12s" % ("clients", "requests/s", "p50 (ms)", "p99 (ms)", "rows/batch"))
+            best = 0
+            for clients in CLIENTS:
+                rate, latencies, batch = load(port, rows, clients, seconds)
+                best = max(best, rate)
+                print("%8d %12.0f %10.2f %10.2f %12.1f" % (clients, rate, percentile(latencies, 0.5) * 1000,
+                                                           percentile(latencies, 0.99) * 1000, batch))
+            print("most requests per second:", round(best))
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
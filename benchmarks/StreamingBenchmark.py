@@ -0,0 +1,84 @@
+# StreamingBenchmark.py
+# Compares peak memory of scan (every address kept until written) and scanRows (each address written as it is cleaned)
+# Run from a folder containing Rules.txt, e.g. "cd dist && python ../benchmarks/StreamingBenchmark.py 2000000"
+# Peak memory is read with the resource module, so this only runs on Linux/macOS
+
+import os
+import sys
+import resource
+import subprocess
+import tempfile
+from timeit import default_timer as timer
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from openpyxl import load_workbook, Workbook
+
+
+def makeSheet(fileName, count):
+    """
+    Writes a sheet of synthetic addresses in the template format
+    :param fileName: File to write
+    :param count: Number of rows
+    """
+    from ParallelBenchmark import sampleRows
+
+    writeWb = Workbook(write_only=True)
+    sheet = writeWb.create_sheet("Sheet1")
+    sheet.append(["Unique ID", "AddressLine1", "AddressLine2", "Province"])
+    done = 0
+    while done < count: # made in parts so making the file does not use the memory being measured
+        rows = sampleRows(min(100000, count - done), seed=done)
+        for row in rows:
+            done += 1
+            sheet.append([done, row[0], row[1], row[2]])
+    writeWb.save(filename=fileName)
+    writeWb.close()
+
+
+def run(mode, fileName):
+    """
+    Cleans a sheet and prints the time taken and peak memory, meant to be run in its own process
+    :param mode: "list" to use scan, "stream" to use scanRows
+    :param fileName: Sheet to clean
+    """
+    import AddressCleaner
+    AddressCleaner.load_rules(AddressCleaner.suffixes, AddressCleaner.extras, AddressCleaner.shortStreets)
+    AddressCleaner.rulesChanged()
+
+    start = timer()
+    workbook = load_workbook(filename=fileName, read_only=True)
+    sheet = workbook["Sheet1"]
+    outFileName = os.path.join(tempfile.mkdtemp(), "Cleaned.xlsx")
+    if mode == "stream":
+        count, outFileName = AddressCleaner.write(outFileName, AddressCleaner.scanRows(sheet))
+    else:
+        count, outFileName = AddressCleaner.write(outFileName, AddressCleaner.scan(sheet))
+    workbook.close()
+    os.remove(outFileName)
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == "darwin":
+        peak //= 1024 # bytes on macOS, KB on Linux
+    print(mode, count, timer() - start, peak)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    fileName = os.path.join(tempfile.gettempdir(), "AddressStreaming" + str(count) + ".xlsx")
+    if not os.path.isfile(fileName):
+        print("Making", fileName)
+        makeSheet(fileName, count)
+
+    print("%8s %10s %10s %14s" % ("mode", "rows", "seconds", "peak RSS (MB)"))
+    for mode in ["list", "stream"]:
+        result = subprocess.run([sys.executable, os.path.abspath(__file__), "run", mode, fileName],
+                                stdout=subprocess.PIPE, universal_newlines=True, check=True)
+        mode, rows, took, peak = result.stdout.split()[-4:]
+        print("%8s %10s %10.1f %14.1f" % (mode, rows, float(took), int(peak) / 1024))
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "run":
+        run(sys.argv[2], sys.argv[3])
+    else:
+        main()
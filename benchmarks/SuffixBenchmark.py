@@ -0,0 +1,92 @@
+# SuffixBenchmark.py
+# Times calcSuffixFactor against a full scan of the suffix rules as the number of rules grows
+# Run from a folder containing Rules.txt, e.g. "cd dist && python ../benchmarks/SuffixBenchmark.py"
+
+import os
+import sys
+import random
+from timeit import default_timer as timer
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import AddressCleaner
+
+
+def linearSuffixFactor(word, suffixes):
+    """
+    The suffix factor as it was calculated before the suffix index, every suffix is scored
+    :param word: Word without symbols
+    :param suffixes: Suffix rules
+    :return: Highest factor with the suffix that has the highest factor
+    """
+    suffixFactor = 0
+    matchedSuffix = ""
+    for suffix in suffixes:
+        i = j = 0
+        simFactor = 0
+        while i < len(word) and j < len(suffix):
+            if word[i] == suffix[j] or word[i] not in suffix:
+                if word[i] == suffix[j]:
+                    simFactor += suffixes[suffix][j]
+                if word[i] not in suffix:
+                    simFactor -= max(suffixes[suffix]) * 2
+                i += 1
+            j += 1
+
+        prev = suffixFactor
+        suffixFactor = max(simFactor, suffixFactor)
+        if suffixFactor != prev:
+            matchedSuffix = suffix
+
+    return (suffixFactor, matchedSuffix)
+
+
+def randomRule(rand):
+    """
+    Makes a suffix rule the same way the "Submit Suffix Rule" tab does when no preferred version is given
+    :param rand: Random number generator
+    :return: Suffix and its factors
+    """
+    suffix = "".join(rand.choice("ABCDEFGHIJKLMNOPRSTUVWY") for i in range(rand.randint(3, 10)))
+    factors = []
+    for i in range(len(suffix)):
+        factors.append(1/len(suffix)-1/len(suffix)%0.01)
+    factors[-1] += 0.01
+    return suffix, factors
+
+
+def main():
+    AddressCleaner.load_rules(AddressCleaner.suffixes, AddressCleaner.extras, AddressCleaner.shortStreets)
+    AddressCleaner.rulesChanged()
+    rand = random.Random(2020)
+    words = ["STREET", "ST", "AVE", "AVENUE", "RD", "ROAD", "BLVD", "BOUL", "CHEMIN", "CH", "RUE", "DR", "DRIVE",
+             "CRES", "CRT", "MAIN", "KING", "QUEEN", "ELGIN", "RIDEAU", "MONTEE", "RANG", "PRINCIPALE", "SUITE",
+             "UNIT", "BUREAU", "HWY", "ROUTE", "PKWY", "TERRASSE", "LAKESHORE", "NOTRE-DAME", "SAINTE-CATHERINE"]
+    words = [AddressCleaner.removeSymbols(word) for word in words]
+    shipped = dict(AddressCleaner.suffixes)
+
+    print("%8s %12s %12s %8s" % ("rules", "full (ms)", "index (ms)", "speedup"))
+    for count in [len(shipped), 250, 500, 1000, 2000, 4000, 8000]:
+        rules = dict(shipped)
+        while len(rules) < count:
+            suffix, factors = randomRule(rand)
+            rules.setdefault(suffix, factors)
+        index = AddressCleaner.SuffixIndex(rules)
+
+        repeat = max(1, 2000 // count)
+        start = timer()
+        for i in range(repeat):
+            expected = [linearSuffixFactor(word, rules) for word in words]
+        full = (timer() - start) / repeat
+
+        start = timer()
+        for i in range(repeat):
+            found = [index.match(word) for word in words]
+        indexed = (timer() - start) / repeat
+
+        if found != expected:
+            raise AssertionError("Suffix index does not match the full scan with " + str(count) + " rules")
+        print("%8d %12.2f %12.2f %7.1fx" % (count, full * 1000, indexed * 1000, full / indexed))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+# SymbolBenchmark.py
+# Checks removeSymbols gives the same words as the character loop it replaced, times both on the words of generated
+# addresses, then times a full scan with each
+# Run from a folder containing Rules.txt, e.g. "cd dist && python ../benchmarks/SymbolBenchmark.py 20000"
+
+import os
+import sys
+import random
+import tempfile
+from timeit import default_timer as timer
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from openpyxl import Workbook
+import AddressCleaner
+from AddressGenerator import generateRows
+
+
+def loopRemoveSymbols(word, exception="", remove=""):
+    """
+    removeSymbols as it was before the translate tables, the word is built one character at a time
+    :param word: The word to be cleaned
+    :param exception: Any characters to be excepted
+    :param remove: Any characters that should be removed
+    :return: Cleaned word
+    """
+    newWord = ""
+    for letter in word:
+        if len(remove) > 0:
+            if letter.isalnum() or letter not in remove:
+                newWord += letter
+        elif letter.isalnum() or letter in "- '" or letter in exception:
+            newWord += letter
+    return newWord
+
+
+def randomWords(count, seed=2020):
+    """
+    Makes words of letters, digits, accents and symbols
+    :param count: Number of words
+    :param seed: Seed of the random number generator
+    :return: list of words
+    """
+    rand = random.Random(seed)
+    letters = "AEST19-' .,/\\\\#&()[]ÉÈÎÔàç½²\t_!?@*"
+    return ["".join(rand.choice(letters) for i in range(rand.randint(0, 12))) for j in range(count)]
+
+
+def scanTime(rows):
+    """
+    Times cleaning and writing rows, the caches are cleared first so every word is cleaned again
+    :param rows: (AddressLine1, AddressLine2, Province) of each row
+    :return: Seconds taken
+    """
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.append(["AddressLine1", "AddressLine2", "Province"])
+    for row in rows:
+        sheet.append(list(row))
+    AddressCleaner.tokenCache.clear()
+    AddressCleaner.extCache.clear()
+    fileName = os.path.join(tempfile.mkdtemp(), "Cleaned.xlsx")
+    start = timer()
+    count, fileName = AddressCleaner.write(fileName, AddressCleaner.scan(sheet))
+    took = timer() - start
+    os.remove(fileName)
+    return took
+
+
+def main():
+    AddressCleaner.load_rules(AddressCleaner.suffixes, AddressCleaner.extras, AddressCleaner.shortStreets)
+    AddressCleaner.rulesChanged()
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    rows = generateRows(count)
+    words = [word for line1, line2, prov in rows for word in (str(line1) + " " + str(line2)).split()]
+    # the ways removeSymbols is called in AddressCleaner, and an exception that is not
+    options = [("", ""), ("", "' -"), ("#", ""), ("", "'")]
+
+    for exception, remove in options:
+        for word in words + randomWords(count):
+            if AddressCleaner.removeSymbols(word, exception, remove) != loopRemoveSymbols(word, exception, remove):
+                raise AssertionError("removeSymbols(" + repr(word) + ", " + repr(exception) + ", " + repr(remove) +
+                                     ") does not match the character loop")
+    print(len(words) + count, "words cleaned the same way with each exception and remove")
+
+    print("%14s %12s %12s %8s" % ("remove", "loop (us)", "table (us)", "speedup"))
+    for exception, remove in options[:2]:
+        start = timer()
+        for word in words:
+            loopRemoveSymbols(word, exception, remove)
+        loop = (timer() - start) / len(words) * 1000000
+        start = timer()
+        for word in words:
+            AddressCleaner.removeSymbols(word, exception, remove)
+        table = (timer() - start) / len(words) * 1000000
+        print("%14r %12.3f %12.3f %7.1fx" % (remove, loop, table, loop / table))
+
+    tableScan = scanTime(rows)
+    translate = AddressCleaner.removeSymbols
+    AddressCleaner.removeSymbols = loopRemoveSymbols # used by every function that calls it until it is put back
+    try:
+        loopScan = scanTime(rows)
+    finally:
+        AddressCleaner.removeSymbols = translate
+    print("scan+write of %d rows: %.2f s with the loop, %.2f s with tables (%.1f%% faster)" % (
+        count, loopScan, tableScan, (loopScan / tableScan - 1) * 100))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+# TokenizerBenchmark.py
+# Checks splitTokens breaks words apart the same way as the loop of structureAddress did before it skipped the words
+# of only letters and digits, on generated addresses and on words made of random symbols, then times both per row
+# Run from a folder containing Rules.txt, e.g. "cd dist && python ../benchmarks/TokenizerBenchmark.py 200000"
+
+import os
+import sys
+import random
+from timeit import default_timer as timer
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import AddressCleaner
+from AddressCleaner import checkNumbers, checkOrdinal
+from AddressGenerator import generateRows
+
+
+def loopSplit(address):
+    """
+    The splitting of structureAddress as it was before splitTokens, the list is changed in place
+    :param address: Words of the address
+    :return: The same list
+    """
+    i = 0
+    length = len(address)
+
+    # address is cleaned of punctuation that can lead to misinterpretation of each section of the address
+    while i < length:
+        if "," in address[i] and len(address[i].split(",")) > 2 and len(address[i]) > 3 and not any(
+                len(w) <= 1 for w in address[i].split(",")):
+            array = address[i].split(",")
+            address.pop(i)
+            for j in range(len(array)):
+                address.insert(i + j, array[j])
+            length += len(array) - 1
+
+        if "." in address[i] and len(address[i].split(".")) > 1 and len(address[i]) > 3 and not any(
+                len(w) <= 1 for w in address[i].split(".")):
+            array = address[i].split(".")
+            address.pop(i)
+            for j in range(len(array)):
+                address.insert(i + j, array[j])
+            length += len(array) - 1
+
+        if "\\" in address[i] and len(address[i].split("\\")) > 1 and len(address[i]) > 3 and not any(
+                len(w) <= 1 and w.isalpha() for w in address[i].split("\\")):
+            array = address[i].split("\\")
+            address.pop(i)
+            for j in range(len(array)):
+                address.insert(i + j, array[j])
+            length += len(array) - 1
+
+        if "/" in address[i] and len(address[i].split("/")) > 1 and len(address[i]) > 3 and not any(
+                len(w) <= 1 and w.isalpha() for w in address[i].split("/")):
+            array = address[i].split("/")
+            address.pop(i)
+            for j in range(len(array)):
+                address.insert(i + j, array[j])
+            length += len(array) - 1
+
+        if "-" in address[i] and len(address[i].split('-')) == 2 and not\
+                any(not checkNumbers(w) for w in address[i].split('-')) and (
+                any(checkOrdinal(w) for w in address[i].split("-")) or i > 0):
+            array = address[i].split("-")
+            address.pop(i)
+            for j in range(len(array)):
+                address.insert(i + j, array[j])
+            length += len(array) - 1
+
+        if address[i] == "-" and len(address) - 1 > i > 0:
+            noSym = "".join(letter for letter in address[i - 1] + address[i + 1] if letter.isalnum())
+            if not noSym.isdigit() or not noSym.isalpha():
+                address.pop(i)
+            length -= 1
+
+        i += 1
+    return address
+
+
+def symbolWords(count, seed=2020):
+    """
+    Makes addresses of short words full of the symbols split on, to reach the cases generated addresses rarely have
+    :param count: Number of addresses
+    :param seed: Seed of the random number generator
+    :return: list of addresses, each a list of words
+    """
+    rand = random.Random(seed)
+    pieces = ["", "1", "12", "2E", "1ST", "3RD", "A", "AB", "MAIN", "ST", "E", "123", "-", ",", ".", "/", "\\"]
+    addresses = []
+    for i in range(count):
+        words = []
+        for j in range(rand.randint(1, 6)):
+            words.append("".join(rand.choice(pieces) for k in range(rand.randint(1, 5))) or "-")
+        addresses.append(words)
+    return addresses
+
+
+def best(split, addresses, runs=3):
+    """
+    Times splitting the words of each address
+    :param split: Function changing the list of words in place
+    :param addresses: Words of each address, copied before each run
+    :param runs: Runs timed, the fastest is kept
+    :return: Microseconds per address of the fastest run
+    """
+    fastest = None
+    for run in range(runs):
+        copies = [list(words) for words in addresses]
+        start = timer()
+        for words in copies:
+            split(words)
+        took = timer() - start
+        fastest = took if fastest is None else min(fastest, took)
+    return fastest / len(addresses) * 1000000
+
+
+def main():
+    AddressCleaner.load_rules(AddressCleaner.suffixes, AddressCleaner.extras, AddressCleaner.shortStreets)
+    AddressCleaner.rulesChanged()
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    generated = [str(line1).split() for line1, line2, prov in generateRows(count)]
+    symbols = symbolWords(count)
+    # words broken into hundreds of parts, where moving the rest of the list for each part adds up
+    long = [["12", ",".join("AB" + str(i) for i in range(parts)), ".".join("CD" + str(i) for i in range(parts))]
+            for parts in range(100, 1100, 10)]
+    corpora = [("generated", generated), ("symbols", symbols), ("long", long)]
+
+    for name, addresses in corpora:
+        mismatches = [words for words in addresses
+                      if loopSplit(list(words)) != AddressCleaner.splitTokens(list(words))]
+        if len(mismatches) > 0:
+            raise AssertionError("splitTokens does not match the loop on " + str(len(mismatches)) + " " + name +
+                                 " addresses, such as " + str(mismatches[:5]))
+        print(len(addresses), name, "addresses split the same way")
+
+    print("%10s %14s %14s %8s" % ("addresses", "loop (us/row)", "split (us/row)", "speedup"))
+    for name, addresses in corpora:
+        loop = best(loopSplit, addresses)
+        split = best(AddressCleaner.splitTokens, addresses)
+        print("%10s %14.2f %14.2f %7.1fx" % (name, loop, split, loop / split))
+
+
+if __name__ == "__main__":
+    main()
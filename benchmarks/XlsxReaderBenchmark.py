@@ -0,0 +1,202 @@
+# XlsxReaderBenchmark.py
+# Times reading the three columns a scan needs from wide sheets with openpyxl in read only mode and with XlsxSheet, for
+# sheets of shared strings as excel writes them and of inline strings as openpyxl writes them, and checks both read
+# the same values, also with every column selected twice. The sheets are kept in the temp folder so they are only written once
+# Run with the number of rows and of columns, e.g. "python benchmarks/XlsxReaderBenchmark.py 500000 40"
+
+import os
+import sys
+import random
+import hashlib
+import zipfile
+import tempfile
+from itertools import chain
+from xml.sax.saxutils import escape
+from timeit import default_timer as timer
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from openpyxl import load_workbook
+import AddressCleaner
+from ParallelBenchmark import sampleRows
+
+PARTS = {
+    "[Content_Types].xml": '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '<Override PartName="/xl/sharedStrings.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sharedStrings+xml"/></Types>',
+    "_rels/.rels": '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Target="xl/workbook.xml" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument"/></Relationships>',
+    "xl/workbook.xml": '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets><sheet name="Sheet1" sheetId="1" r:id="rId1"/></sheets></workbook>',
+    "xl/_rels/workbook.xml.rels": '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Target="worksheets/sheet1.xml" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet"/>'
+    '<Relationship Id="rId2" Target="sharedStrings.xml" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/sharedStrings"/></Relationships>'
+}
+
+
+def letters(column):
+    """
+    :param column: Column from 0
+    :return: Letters of the column, e.g. AB
+    """
+    name = ""
+    column += 1
+    while column > 0:
+        column, rest = divmod(column - 1, 26)
+        name = chr(ord("A") + rest) + name
+    return name
+
+
+def wideRows(count, width):
+    """
+    Makes rows of the addresses of sampleRows among other columns of numbers, text and empty cells
+    :param count: Number of rows
+    :param width: Number of columns
+    :return: header, generator of the rows
+    """
+    header = ["Column " + str(column) for column in range(width)]
+    places = {width // 3: "AddressLine1", 2 * width // 3: "AddressLine2", width - 1: "Province"}
+    for column, name in places.items():
+        header[column] = name
+    rand = random.Random(2020)
+    fillers = [rand.randint(0, 2) for column in range(width)] # a number, a word or nothing in each other column
+
+    def rows():
+        done = 0
+        while done < count:
+            for line1, line2, prov in sampleRows(min(100000, count - done), seed=done):
+                done += 1
+                row = [done * 7 % 1000 if kind == 0 else "ITEM " + str(done % 500) if kind == 1 else None
+                       for kind in fillers]
+                row[width // 3], row[2 * width // 3], row[width - 1] = line1, line2, prov
+                yield row
+    return header, rows()
+
+
+def makeSheet(fileName, count, width, shared):
+    """
+    Writes a sheet of wide rows straight as XML
+    :param fileName: File to write
+    :param count: Number of rows
+    :param width: Number of columns
+    :param shared: Keep the text in shared strings like excel does, or inline in the cells like openpyxl does
+    """
+    header, rows = wideRows(count, width)
+    names = [letters(column) for column in range(width)]
+    strings = {}
+    with zipfile.ZipFile(fileName, "w", zipfile.ZIP_DEFLATED) as book:
+        for name, text in PARTS.items():
+            book.writestr(name, text)
+        with book.open("xl/worksheets/sheet1.xml", "w", force_zip64=True) as sheet:
+            sheet.write(('<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n<worksheet xmlns='
+                         '"http://schemas.openxmlformats.org/spreadsheetml/2006/main"><dimension ref="A1:' +
+                         names[-1] + str(count + 1) + '"/><sheetData>').encode("utf-8"))
+            for number, row in enumerate(chain([header], rows), 1):
+                cells = []
+                for column, value in enumerate(row):
+                    ref = names[column] + str(number)
+                    if value is None:
+                        continue
+                    if isinstance(value, int):
+                        cells.append('<c r="%s"><v>%d</v></c>' % (ref, value))
+                    elif shared:
+                        cells.append('<c r="%s" t="s"><v>%d</v></c>' % (ref, strings.setdefault(value, len(strings))))
+                    else:
+                        cells.append('<c r="%s" t="inlineStr"><is><t>%s</t></is></c>' % (ref, escape(value)))
+                sheet.write(('<row r="%d">%s</row>' % (number, "".join(cells))).encode("utf-8"))
+            sheet.write(b"</sheetData></worksheet>")
+        book.writestr("xl/sharedStrings.xml", '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n<sst xmlns='
+                      '"http://schemas.openxmlformats.org/spreadsheetml/2006/main" uniqueCount="%d">%s</sst>' % (
+                          len(strings), "".join("<si><t>%s</t></si>" % escape(text) for text in strings)))
+
+
+def readOpenpyxl(fileName, repeat=1):
+    """
+    Reads the columns of a scan from openpyxl cells, the way scan did before XlsxSheet
+    :param fileName: Sheet to read
+    :param repeat: Times each column is read from a row
+    :return: Seconds taken, digest of the values read
+    """
+    digest = hashlib.sha1()
+    start = timer()
+    workbook = load_workbook(filename=fileName, read_only=True)
+    sheet = workbook["Sheet1"]
+    columns = [AddressCleaner.findCol(name, sheet["1"]) for name in AddressCleaner.SCAN_COLUMNS] * repeat
+    for row in sheet.iter_rows(min_row=2, max_row=sheet.max_row):
+        digest.update(repr([row[column].value for column in columns]).encode("utf-8"))
+    workbook.close()
+    return timer() - start, digest.hexdigest()
+
+
+def readXlsxSheet(fileName, columns=AddressCleaner.SCAN_COLUMNS):
+    """
+    Reads the columns of a scan with XlsxSheet
+    :param fileName: Sheet to read
+    :param columns: Columns to select, every column if None
+    :return: Seconds taken, digest of the values read
+    """
+    digest = hashlib.sha1()
+    start = timer()
+    sheet = AddressCleaner.XlsxSheet(fileName, "Sheet1", columns)
+    picked = [AddressCleaner.findCol(name, sheet["1"]) for name in AddressCleaner.SCAN_COLUMNS]
+    for row in sheet.iter_rows(min_row=2, max_row=sheet.max_row):
+        digest.update(repr([row[column].value for column in picked]).encode("utf-8"))
+    sheet.close()
+    if sheet._workbook is not None:
+        raise AssertionError("XlsxSheet read " + fileName + " with openpyxl")
+    return timer() - start, digest.hexdigest()
+
+
+def readRepeated(fileName):
+    """
+    Reads the columns of a scan with XlsxSheet, each selected twice like Hardware.py can when columns are at D or E
+    :param fileName: Sheet to read
+    :return: Seconds taken, digest of the values read
+    """
+    digest = hashlib.sha1()
+    start = timer()
+    sheet = AddressCleaner.XlsxSheet(fileName, "Sheet1", AddressCleaner.SCAN_COLUMNS * 2)
+    for row in sheet.iter_rows(min_row=2, max_row=sheet.max_row, values_only=True):
+        digest.update(repr(list(row)).encode("utf-8"))
+    sheet.close()
+    return timer() - start, digest.hexdigest()
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 500000
+    width = int(sys.argv[2]) if len(sys.argv) > 2 else 40
+
+    print("%8s %8s %8s %14s %14s %14s %8s" % ("strings", "rows", "columns", "openpyxl (s)", "XlsxSheet (s)",
+                                             "all columns", "speedup"))
+    for shared in [True, False]:
+        fileName = os.path.join(tempfile.gettempdir(), "AddressWide%d_%d%s.xlsx" % (count, width,
+                                                                                   "" if shared else "Inline"))
+        if not os.path.isfile(fileName):
+            makeSheet(fileName, count, width, shared)
+        old, expected = readOpenpyxl(fileName)
+        new, found = readXlsxSheet(fileName)
+        every, foundAll = readXlsxSheet(fileName, None)
+        if found != expected or foundAll != expected:
+            raise AssertionError("XlsxSheet read other values than openpyxl from " + fileName)
+        if readRepeated(fileName)[1] != readOpenpyxl(fileName, 2)[1]:
+            raise AssertionError("XlsxSheet read other values than openpyxl from " + fileName + " with every column "
+                                 "selected twice")
+        print("%8s %8d %8d %14.2f %14.2f %14.2f %7.1fx" % ("shared" if shared else "inline", count, width, old, new,
+                                                         every, old / new))
+
+
+if __name__ == "__main__":
+    main()
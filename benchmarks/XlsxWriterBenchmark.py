@@ -0,0 +1,103 @@
+# XlsxWriterBenchmark.py
+# Checks write gives the same sheets with XlsxWriter as with openpyxl, then times writing millions of cleaned addresses
+# each way in a new process, and finds the peak memory allocated while writing in another with tracemalloc (which slows
+# the writing down, so it is not timed). The addresses are the same few thousand again, given by a generator so they
+# take no more memory however many rows are written
+# Run from a folder containing Rules.txt, e.g. "cd dist && python ../benchmarks/XlsxWriterBenchmark.py 2000000"
+
+import os
+import sys
+import json
+import tempfile
+import subprocess
+import tracemalloc
+from itertools import islice, cycle
+from timeit import default_timer as timer
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import AddressCleaner
+from AddressGenerator import generateRows
+
+
+def cleanedAddresses(count):
+    """
+    :param count: Number of addresses
+    :return: generator of the cleaned addresses of generated rows, repeated to the number asked for
+    """
+    AddressCleaner.load_rules(AddressCleaner.suffixes, AddressCleaner.extras, AddressCleaner.shortStreets)
+    AddressCleaner.rulesChanged()
+    return islice(cycle(AddressCleaner.cleanChunk(generateRows(min(count, 20000)))), count)
+
+
+def sheets(fileName):
+    """
+    :param fileName: Workbook to read
+    :return: dictionary of the rows of each sheet, without the times of the summary
+    """
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(fileName, read_only=True)
+    found = {name: [row for row in workbook[name].values if len(row) != 2 or not isinstance(row[1], float)]
+             for name in workbook.sheetnames}
+    workbook.close()
+    return found
+
+
+def run(writer, count, fileName, traced):
+    """
+    Writes the addresses in this process, the way the parent process asked
+    :param writer: "openpyxl" or "XlsxWriter"
+    :param count: Number of rows
+    :param fileName: File to write, removed after
+    :param traced: Trace the memory allocated while writing
+    :return: Seconds taken, peak MB allocated while writing if traced, size of the file in MB
+    """
+    addresses = cleanedAddresses(count)
+    if traced:
+        tracemalloc.start()
+    start = timer()
+    AddressCleaner.write(fileName, addresses, fastXlsx=writer == "XlsxWriter")
+    took = timer() - start
+    peak = tracemalloc.get_traced_memory()[1] / 1e6 if traced else None
+    size = os.path.getsize(fileName) / 1e6
+    os.remove(fileName)
+    return took, peak, size
+
+
+def main():
+    if sys.argv[1:2] == ["--run"]: # in the new process
+        print(json.dumps(run(sys.argv[2], int(sys.argv[3]), sys.argv[4], sys.argv[5] == "traced")))
+        return
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000000
+    folder = tempfile.gettempdir()
+
+    names = [os.path.join(folder, "AddressWriter" + writer + ".xlsx") for writer in ["openpyxl", "XlsxWriter"]]
+    for name in names:
+        if os.path.isfile(name):
+            os.remove(name)
+    rows = list(cleanedAddresses(20000))
+    AddressCleaner.write(names[0], rows)
+    AddressCleaner.write(names[1], rows, fastXlsx=True)
+    if sheets(names[0]) != sheets(names[1]):
+        raise AssertionError("XlsxWriter wrote other sheets than openpyxl")
+    AddressCleaner.debugWrite(rows, names[0])
+    AddressCleaner.debugWrite(rows, names[1], fastXlsx=True)
+    if sheets(names[0]) != sheets(names[1]):
+        raise AssertionError("XlsxWriter wrote other debug sheets than openpyxl")
+    for name in names:
+        os.remove(name)
+    print("write and debugWrite gave the same sheets with XlsxWriter as with openpyxl for", len(rows), "addresses")
+
+    print("%-12s %10s %10s %12s %12s %10s" % ("writer", "rows", "seconds", "rows/sec", "memory (MB)", "file (MB)"))
+    for writer, name in zip(["openpyxl", "XlsxWriter"], names):
+        results = []
+        for mode in ["timed", "traced"]:
+            output = subprocess.run([sys.executable, os.path.abspath(__file__), "--run", writer, str(count), name, mode],
+                                    stdout=subprocess.PIPE, universal_newlines=True, check=True)
+            results.append(json.loads(output.stdout.strip().splitlines()[-1]))
+        took, peak, size = results[0][0], results[1][1], results[0][2]
+        print("%-12s %10d %10.2f %12.0f %12.1f %10.1f" % (writer, count, took, count / took, peak, size))
+
+
+if __name__ == "__main__":
+    main()